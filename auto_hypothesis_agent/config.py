@@ -39,6 +39,19 @@ MMGBSA_SCRIPT: str | None = os.getenv("MMGBSA_SCRIPT", "MMPBSA.py")
 # Pocket detection
 FPOCKET_BIN: str | None = os.getenv("FPOCKET_BIN", "fpocket")
 
+# Receptor PDBQT / fpocket 결과 캐시 (`simulation/receptor_cache.py`) – 구조 내용 해시 + 준비 옵션 키
+RECEPTOR_CACHE_DIR: str = os.getenv("RECEPTOR_CACHE_DIR", "outputs/cache/receptors")
+
+# Small-molecule parameterization (SMIRNOFF) – BindingEnergy/MDRunner 공용
+SMALL_MOLECULE_FORCEFIELD: str = os.getenv("SMALL_MOLECULE_FORCEFIELD", "openff-2.1.0")
+LIGAND_PARAM_CACHE_DIR: str = os.getenv("LIGAND_PARAM_CACHE_DIR", "outputs/cache/ligand_params")
+
+# ADMET gate profiles (`simulation/admet_gate.py`) – 프로젝트별 도킹 전 필터 규칙 JSON
+ADMET_GATE_PROFILE_DIR: str = os.getenv("ADMET_GATE_PROFILE_DIR", "outputs/profiles/admet_gate")
+
+# Screening campaign job store (`pipelines/campaign_store.py`) – SQLite, 여러 워커 프로세스가 공유
+CAMPAIGN_DB: str = os.getenv("CAMPAIGN_DB", "outputs/campaigns.sqlite")
+
 # Log configuration summary
 print("[auto_hypothesis_agent] Config loaded. Neo4j URI:", NEO4J_BOLT_URI)
 
@@ -6,7 +6,7 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, Iterator, List
 
 try:
     from neo4j import GraphDatabase, Driver, Session
@@ -50,5 +50,22 @@ class GraphClient:
             result = sess.run(cypher, params)
             return [r.data() for r in result]
 
+    def run_paged(self, cypher: str, page_size: int = 1000, cursor_key: str = "cursor", **params) -> Iterator[List[Dict[str, Any]]]:
+        """Execute keyset-paginated Cypher, yielding one list of dictionaries per page.
+
+        질의는 ``$cursor`` (첫 페이지는 null) 이후의 행을 *cursor_key* 오름차순으로 ``$limit`` 개
+        반환해야 한다. 한 번에 한 페이지만 메모리에 두고 페이지마다 짧은 트랜잭션을 쓴다.
+        커서 속성에 인덱스가 있어 플래너가 인덱스 범위 탐색으로 시작할 때만 앞 페이지를 다시
+        훑지 않는다. 그렇지 않으면 매 페이지가 전체 매칭·정렬을 반복한다 (총 O(N·pages)).
+        """
+        cursor = None
+        while True:
+            page = self.run(cypher, cursor=cursor, limit=page_size, **params)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            cursor = page[-1][cursor_key]
+
     def close(self):
         self._driver.close() 
\ No newline at end of file
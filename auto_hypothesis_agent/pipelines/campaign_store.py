@@ -0,0 +1,288 @@
+"""CampaignStore – 스크리닝 캠페인의 (수용체, 리간드, 단계) 작업 상태를 SQLite 에 기록.
+
+타임스탬프 CSV 리포트만으로는 캠페인의 어떤 화합물이 이미 처리됐는지 알 수 없다. 이 저장소는
+작업마다 상태(pending → running → done | failed), 결과 행(JSON), 시도 횟수, 시작/종료 시각과
+소요 시간을 남겨 중단된 캠페인을 이어서 실행할 수 있게 한다.
+
+• WAL 저널 + ``busy_timeout`` 으로 여러 워커 프로세스가 같은 DB 파일에 동시에 쓸 수 있다.
+  연결은 스레드마다 따로 열고, 상태 전이는 ``BEGIN IMMEDIATE`` 트랜잭션 하나로 처리한다.
+• `claim` 은 아직 끝나지 않은 작업만 원자적으로 running 으로 바꿔 돌려주므로 같은 캠페인을
+  여러 프로세스가 돌려도 한 작업은 한 워커만 처리하고, 끝난 작업은 저장된 결과를 재사용한다.
+• `requeue` 는 실패했거나 중단된(running 으로 남은) 작업만 다시 pending 으로 돌린다.
+
+사용 예시::
+
+    store = CampaignStore("outputs/campaigns.sqlite")
+    claimed, done = store.claim("kras_q4", receptor_id, "docking", ligand_ids)
+    store.complete("kras_q4", receptor_id, "docking", docked_df)   # ligand_id 열 기준
+
+    $ python -m auto_hypothesis_agent.pipelines.campaign_store status kras_q4
+    $ python -m auto_hypothesis_agent.pipelines.campaign_store resume kras_q4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import pandas as pd
+
+from auto_hypothesis_agent.config import CAMPAIGN_DB
+
+JOB_STATUSES = ("pending", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    name       TEXT PRIMARY KEY,
+    params     TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    campaign    TEXT NOT NULL,
+    receptor    TEXT NOT NULL,
+    stage       TEXT NOT NULL,
+    ligand_id   TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    worker      TEXT,
+    result      TEXT,
+    error       TEXT,
+    queued_at   REAL,
+    started_at  REAL,
+    finished_at REAL,
+    duration_s  REAL,
+    PRIMARY KEY (campaign, receptor, stage, ligand_id)
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (campaign, stage, status);
+"""
+
+_MAX_VARS = 500  # SQLite 바인딩 변수 한도보다 작게 IN (...) 목록을 나눈다.
+
+
+class CampaignStore:
+    """SQLite-backed job table for screening campaigns (safe for concurrent worker processes)."""
+
+    def __init__(self, path: str = CAMPAIGN_DB, timeout: float = 60.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None → 트랜잭션은 _tx() 에서 직접 연다.
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _tx(self):
+        """Write transaction taking the database write lock up front (no upgrade deadlocks)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Campaigns
+    # ------------------------------------------------------------------
+
+    def create_campaign(self, name: str, params: dict) -> dict:
+        """Register *name* with its run parameters; an existing campaign keeps its original ones."""
+
+        with self._tx() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO campaigns (name, params, created_at) VALUES (?, ?, ?)",
+                (name, json.dumps(params, sort_keys=True, default=str), time.time()),
+            )
+        stored = self.campaign(name)
+        if json.loads(json.dumps(params, default=str)) != stored:
+            print(f"[CampaignStore] Campaign '{name}' already exists with different parameters – keeping the stored ones.")
+        return stored
+
+    def campaign(self, name: str) -> dict:
+        row = self._conn().execute("SELECT params FROM campaigns WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise ValueError(f"Unknown campaign '{name}' in {self.path}")
+        return json.loads(row[0])
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def claim(
+        self,
+        campaign: str,
+        receptor: str,
+        stage: str,
+        ligand_ids: Sequence[str],
+        worker: str | None = None,
+    ) -> tuple[list[str], pd.DataFrame]:
+        """Queue *ligand_ids* and claim the unfinished ones for this worker.
+
+        Returns ``(claimed_ids, done_results)``: 새로 맡은 작업(pending/failed → running)과 이미 끝난
+        작업의 저장된 결과 행. 다른 워커가 처리 중인 작업은 어느 쪽에도 포함되지 않는다.
+        """
+
+        worker = worker or f"{os.getpid()}:{threading.current_thread().name}"
+        now = time.time()
+        claimed: list[str] = []
+        done: list[dict] = []
+        with self._tx() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (campaign, receptor, stage, ligand_id, queued_at) VALUES (?, ?, ?, ?, ?)",
+                [(campaign, receptor, stage, str(cid), now) for cid in ligand_ids],
+            )
+            for chunk in _chunks([str(cid) for cid in ligand_ids]):
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT ligand_id, status, result FROM jobs "
+                    f"WHERE campaign = ? AND receptor = ? AND stage = ? AND ligand_id IN ({marks})",
+                    (campaign, receptor, stage, *chunk),
+                ).fetchall()
+                for cid, status, result in rows:
+                    if status == "done":
+                        done.append(json.loads(result) if result else {"ligand_id": cid})
+                    elif status in ("pending", "failed"):
+                        claimed.append(cid)
+            conn.executemany(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, started_at = ?, error = NULL "
+                "WHERE campaign = ? AND receptor = ? AND stage = ? AND ligand_id = ?",
+                [(worker, now, campaign, receptor, stage, cid) for cid in claimed],
+            )
+        return claimed, pd.DataFrame(done)
+
+    def complete(self, campaign: str, receptor: str, stage: str, results: pd.DataFrame) -> int:
+        """Mark the jobs in *results* (one row per ``ligand_id``) done and store each row as JSON."""
+
+        if results is None or results.empty:
+            return 0
+        now = time.time()
+        records = json.loads(results.to_json(orient="records"))  # NumPy/NaN → JSON 기본 타입
+        with self._tx() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (campaign, receptor, stage, ligand_id, status, attempts, result, queued_at, started_at, finished_at, duration_s) "
+                "VALUES (?, ?, ?, ?, 'done', 1, ?, ?, ?, ?, 0.0) "
+                "ON CONFLICT (campaign, receptor, stage, ligand_id) DO UPDATE SET "
+                "status = 'done', result = excluded.result, error = NULL, finished_at = excluded.finished_at, "
+                "duration_s = excluded.finished_at - COALESCE(jobs.started_at, excluded.finished_at)",
+                [(campaign, receptor, stage, str(r["ligand_id"]), json.dumps(r), now, now, now) for r in records],
+            )
+        return len(records)
+
+    def fail(self, campaign: str, receptor: str, stage: str, ligand_ids: Iterable[str], error: str) -> None:
+        now = time.time()
+        with self._tx() as conn:
+            conn.executemany(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, duration_s = ? - COALESCE(started_at, ?) "
+                "WHERE campaign = ? AND receptor = ? AND stage = ? AND ligand_id = ? AND status != 'done'",
+                [(error[:2000], now, now, now, campaign, receptor, stage, str(cid)) for cid in ligand_ids],
+            )
+
+    def requeue(self, campaign: str, stale_after_s: float | None = None) -> int:
+        """Reset failed jobs, and running jobs (older than *stale_after_s*, if given), to pending."""
+
+        cutoff = time.time() - stale_after_s if stale_after_s is not None else float("inf")
+        with self._tx() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'pending', worker = NULL "
+                "WHERE campaign = ? AND (status = 'failed' OR (status = 'running' AND started_at < ?))",
+                (campaign, cutoff),
+            )
+            return cur.rowcount
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def status(self, campaign: str) -> pd.DataFrame:
+        """Job counts and mean duration per (receptor, stage, status)."""
+
+        return pd.read_sql_query(
+            "SELECT receptor, stage, status, COUNT(*) AS jobs, AVG(duration_s) AS mean_duration_s, MAX(attempts) AS max_attempts "
+            "FROM jobs WHERE campaign = ? GROUP BY receptor, stage, status ORDER BY receptor, stage, status",
+            self._conn(),
+            params=(campaign,),
+        )
+
+    def results(self, campaign: str, stage: str, receptor: str | None = None) -> pd.DataFrame:
+        """Stored result rows of the finished *stage* jobs."""
+
+        sql = "SELECT receptor, result FROM jobs WHERE campaign = ? AND stage = ? AND status = 'done'"
+        params: tuple = (campaign, stage)
+        if receptor is not None:
+            sql += " AND receptor = ?"
+            params += (receptor,)
+        rows = self._conn().execute(sql, params).fetchall()
+        return pd.DataFrame([{**json.loads(result), "receptor": rec} for rec, result in rows if result])
+
+    def failures(self, campaign: str) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT receptor, stage, ligand_id, attempts, error FROM jobs WHERE campaign = ? AND status = 'failed'",
+            self._conn(),
+            params=(campaign,),
+        )
+
+
+def _chunks(items: list[str], size: int = _MAX_VARS) -> Iterable[list[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Screening campaign job store")
+    parser.add_argument("--db", default=CAMPAIGN_DB, help="SQLite 캠페인 DB 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_status = sub.add_parser("status", help="단계·상태별 작업 수")
+    p_status.add_argument("campaign")
+    p_resume = sub.add_parser("resume", help="실패·미완료 작업만 다시 큐에 넣고 캠페인을 이어서 실행")
+    p_resume.add_argument("campaign")
+    p_resume.add_argument("--stale-after", type=float, default=None, help="이 시간(초)보다 오래 running 인 작업만 재시도")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        store = CampaignStore(args.db)
+        print(store.status(args.campaign).to_string(index=False))
+        failures = store.failures(args.campaign)
+        if not failures.empty:
+            print(f"\n{len(failures)} failed jobs:\n" + failures.head(20).to_string(index=False))
+    else:
+        from auto_hypothesis_agent.pipelines.compound_screen_pipeline import resume_campaign
+
+        df = resume_campaign(args.campaign, campaign_db=args.db, stale_after_s=args.stale_after)
+        print(f"Campaign '{args.campaign}' finished with {len(df)} ranked compounds.")
+
+
+if __name__ == "__main__":
+    main()
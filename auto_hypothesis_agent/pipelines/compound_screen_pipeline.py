@@ -3,20 +3,32 @@
 from __future__ import annotations
 import argparse
 import glob
+import heapq
+import itertools
 import logging
 import os
 import subprocess
+import tempfile
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Sequence
 
 import pandas as pd
-from rdkit import Chem
 
 from auto_hypothesis_agent import config
+from auto_hypothesis_agent.config import CAMPAIGN_DB, RECEPTOR_CACHE_DIR
 from auto_hypothesis_agent.kg_interface import GraphClient
+from auto_hypothesis_agent.pipelines.campaign_store import CampaignStore
+from auto_hypothesis_agent.pipelines.stage_graph import STAGE_CACHE_DIR, StageGraph, file_digest
+from auto_hypothesis_agent.pipelines.streaming import StreamingPipeline, StreamStage
+from auto_hypothesis_agent.simulation.admet_gate import AdmetGate, combine_summaries
 from auto_hypothesis_agent.simulation.admet_predictor import ADMETPredictor
 from auto_hypothesis_agent.simulation.binding_energy import BindingEnergyCalculator
+from auto_hypothesis_agent.simulation.compound_library import CompoundLibrary
 from auto_hypothesis_agent.simulation.docking import DockingRunner
+from auto_hypothesis_agent.simulation.pareto import pareto_rank
+from auto_hypothesis_agent.simulation.receptor_cache import ReceptorPrepCache, legacy_pocket
 
 
 def _get_grid_from_pocket(pocket_pdb_file: str) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
@@ -60,135 +72,528 @@ def _get_grid_from_pocket(pocket_pdb_file: str) -> tuple[tuple[float, float, flo
     return (center_x, center_y, center_z), (size_x, size_y, size_z)
 
 
-def run_compound_screen(target_protein: str, target_variant: str, library_sdf: str | None, top_k: int) -> pd.DataFrame:
-    """Runs the full compound screening pipeline."""
+# -----------------------------------------------------------------------------
+# Knowledge-graph compound source
+# -----------------------------------------------------------------------------
+
+KG_PAGE_SIZE = 1000
+
+# 커서는 ligand_id 로 쓰이는 c.name – 같은 이름의 화합물 노드는 어차피 같은 ligand_id 로 충돌하므로
+# 페이지 경계에서 하나로 합쳐져도 결과가 바뀌지 않는다.
+_KG_COMPOUND_QUERY = (
+    "MATCH (c:Compound)-[:TARGETS]->(g:Gene) "
+    "WHERE g.name STARTS WITH $gene_name AND c.name IS NOT NULL AND c.smiles IS NOT NULL "
+    "AND ($cursor IS NULL OR c.name > $cursor) "
+    "WITH DISTINCT c "
+    "RETURN c.name AS cursor, c.name AS ligand_id, c.smiles AS smiles "
+    "ORDER BY cursor LIMIT $limit"
+)
+
+
+def kg_compound_batches(target_protein: str, page_size: int = KG_PAGE_SIZE) -> Iterator[CompoundLibrary]:
+    """Yield the target's KG compounds one page at a time as `CompoundLibrary` batches.
+
+    `GraphClient.run_paged` 로 ``c.name`` 기준 keyset 페이지네이션하므로 전체 결과 목록이나
+    중간 SDF 없이 페이지 단위로 라이브러리 배치를 만든다.
+
+    비용: 질의는 페이지마다 다시 실행된다. ``:Compound(name)`` range 인덱스가 있고 플래너가
+    그 인덱스에서 출발하면 커서 이후부터 읽지만, Gene 쪽에서 출발하는 계획(인덱스가 없을 때
+    포함)은 페이지마다 대상의 화합물 N 개를 다시 매칭·정렬하므로 전체 O(N·pages) 이다.
+    큰 대상은 *page_size* 를 키워 페이지 수를 줄인다.
+    """
+    client = GraphClient(config.NEO4J_BOLT_URI, config.NEO4J_USER, config.NEO4J_PASSWORD)
+    try:
+        for i, page in enumerate(client.run_paged(_KG_COMPOUND_QUERY, page_size=page_size, gene_name=target_protein)):
+            logging.info(f"KG compound page {i + 1}: {len(page)} rows")
+            yield CompoundLibrary.from_records(pd.DataFrame(page, columns=["ligand_id", "smiles"]))
+    finally:
+        client.close()
+
+
+# -----------------------------------------------------------------------------
+# Stages – func(inputs, params, workdir) (see `stage_graph.StageGraph`)
+# -----------------------------------------------------------------------------
+
+
+def _stage_receptor_prep(inputs: dict, params: dict, workdir: Path) -> dict:
+    """Receptor PDB → PDBQT via the shared `ReceptorPrepCache` (OpenBabel, Gasteiger charges).
+
+    PDB 옆에 직접 준비한 PDBQT 가 있으면 변환 대신 사용한다 (두 파일의 내용 해시가 모두 키에 들어간다).
+    """
+    receptor_pdb = params["receptor_pdb"]
+    receptor_pdbqt_path = ReceptorPrepCache(params["cache_dir"]).pdbqt(receptor_pdb, params.get("receptor_pdbqt"))
+    return {"receptor_pdb": receptor_pdb, "receptor_pdbqt": receptor_pdbqt_path}
+
+
+def _stage_pocket_detection(inputs: dict, params: dict, workdir: Path) -> dict:
+    """Docking grid from a precomputed fpocket pocket, or the cached fpocket run of the receptor."""
+    pocket_file = params.get("pocket_file")
+    if not pocket_file:
+        pocket_file = ReceptorPrepCache(params["cache_dir"]).best_pocket(params["receptor_pdb"])
+
+    if not pocket_file:
+        logging.info("No fpocket pocket available – DockingRunner will derive the grid from the receptor.")
+        return {"pocket_file": None, "center": None, "size": None}
+
+    logging.info(f"Found pocket file: {pocket_file}")
+    center, size = _get_grid_from_pocket(pocket_file)
+    return {"pocket_file": str(pocket_file), "center": center, "size": size}
+
+
+def _stage_library_build(inputs: dict, params: dict, workdir: Path) -> str:
+    """SDF 또는 지식 그래프에서 컬럼형 라이브러리를 만든다."""
+    library_path = (workdir / "library.arrow").as_posix()
+    if params["library_sdf"]:
+        logging.info(f"Loading compounds from provided SDF: {params['library_sdf']}")
+        return CompoundLibrary.from_sdf(params["library_sdf"]).write(library_path)
+
+    logging.info("SDF library not provided. Fetching compounds from Knowledge Graph.")
+    batches = kg_compound_batches(params["target_protein"], params["page_size"])
+    library_path, n_rows = CompoundLibrary.write_batches(batches, library_path)
+    if not n_rows:
+        raise ValueError(f"No compounds found for target {params['target_protein']} in Knowledge Graph.")
+    return library_path
+
+
+def _stage_filters(inputs: dict, params: dict, workdir: Path) -> str:
+    """SMILES 가 없거나 InChIKey 가 중복된 화합물을 제거한다."""
+    library = CompoundLibrary.open(inputs["library_build"])
+    df = library.to_frame(columns=["ligand_id", "smiles", "inchikey"])
+    keep = df["smiles"].notna()
+    if params["dedupe_inchikey"]:
+        keep &= ~(df["inchikey"].notna() & df["inchikey"].duplicated())
+    logging.info(f"Filters kept {int(keep.sum())}/{len(df)} compounds.")
+    filtered = CompoundLibrary(library.table.filter(keep.to_numpy()))
+    return filtered.write((workdir / "library.arrow").as_posix())
+
+
+def _stage_admet(inputs: dict, params: dict, workdir: Path) -> str:
+    """ADMET 디스크립터를 라이브러리 컬럼으로 저장 → 도킹 단계는 필요한 컬럼만 읽는다."""
+    library = CompoundLibrary.open(inputs["filters"])
+    logging.info(f"Predicting ADMET properties for {len(library)} compounds.")
+    library = library.with_admet(ADMETPredictor())
+    library_path = library.write((workdir / "library.arrow").as_posix())
+    logging.info(f"Columnar compound library saved to {library_path}")
+    return library_path
+
+
+def _stage_admet_gate(inputs: dict, params: dict, workdir: Path) -> dict:
+    """ADMET 규칙(`AdmetGate`)을 통과한 화합물만 도킹 큐에 넣는다."""
+    library = CompoundLibrary.open(inputs["admet"])
+    gate = AdmetGate.from_dict(params["gate"])
+    columns = sorted({"ligand_id", *(rule.column for rule in gate.rules)} & set(library.table.column_names))
+    admet_df = library.to_frame(columns=columns)
+    passed, summary = gate.apply(admet_df)
+    logging.info(f"ADMET gate passed {len(passed)}/{len(admet_df)} compounds.")
+    if passed.empty:
+        raise ValueError("No compounds passed the ADMET gate.")
+    if len(passed) < len(admet_df):
+        library = CompoundLibrary(library.table.filter(admet_df.index.isin(passed.index)))
+    return {"library": library.write((workdir / "library.arrow").as_posix()), "summary": summary}
+
+
+def _stage_docking(inputs: dict, params: dict, workdir: Path) -> pd.DataFrame:
+    pocket = inputs["pocket_detection"]
+    docking_runner = DockingRunner(grid_center=pocket["center"], grid_size=pocket["size"])
+    docking_results_df = docking_runner.run(
+        receptor_pdbqt=inputs["receptor_prep"]["receptor_pdbqt"],
+        library_sdf=inputs["admet_gate"]["library"],
+        out_dir=workdir.as_posix(),
+        top_k=params["top_k"],
+    )
+    if docking_results_df.empty:
+        raise ValueError("Docking returned no results.")
+
+    # 열 이름 통일: 'compound_id' -> 'ligand_id'
+    if "compound_id" in docking_results_df.columns:
+        docking_results_df = docking_results_df.rename(columns={"compound_id": "ligand_id"})
+    return docking_results_df
+
+
+def _stage_rescoring(inputs: dict, params: dict, workdir: Path) -> pd.DataFrame:
+    """도킹 결과와 ADMET 예측을 병합하고 MM/GBSA 결합 에너지를 계산한다."""
+    admet_df = CompoundLibrary.open(inputs["admet_gate"]["library"]).to_frame(columns=["ligand_id", "smiles", *ADMETPredictor.ADMET_KEYS])
+    results_df = pd.merge(inputs["docking"], admet_df, on="ligand_id", how="left")
+
+    dg_calculator = BindingEnergyCalculator()
+    logging.info(f"Calculating binding energy for {len(results_df)} docked complexes.")
+    energy_df = dg_calculator.batch(df=results_df, receptor_pdb=inputs["receptor_prep"]["receptor_pdb"])
+    return pd.merge(results_df, energy_df, on="ligand_id", how="left")
+
+
+def _stage_evaluation(inputs: dict, params: dict, workdir: Path) -> pd.DataFrame:
+    final_results_df = inputs["rescoring"]
+    if params["ranking"] == "pareto":
+        final_results_df = pareto_rank(final_results_df)
+    else:
+        final_results_df = final_results_df.sort_values(by="docking_score", ascending=True)
+    # 불필요한 열 제거
+    return final_results_df.drop(columns=['complex_file'], errors='ignore')
+
+
+def build_screen_graph(
+    target_protein: str,
+    target_variant: str,
+    library_sdf: str | None,
+    top_k: int,
+    ranking: str = "docking",
+    cache_dir: str = STAGE_CACHE_DIR,
+    admet_gate: AdmetGate | str | None = None,
+) -> StageGraph:
+    """Compound screen as a stage DAG.
+
+    receptor_prep → pocket_detection ────────────┐
+    library_build → filters → admet → admet_gate ┴→ docking → rescoring → evaluation
+
+    입력 파일(수용체 PDB, 라이브러리 SDF, 기존 fpocket 결과)은 내용 해시로 키에 반영된다.
+    *admet_gate* 는 `AdmetGate.resolve` 로 해석되며 규칙이 키에 들어가므로 임계값을 바꾸면
+    게이트 이후 단계만 다시 계산된다.
+    지식 그래프 라이브러리는 그래프 내용이 키에 들어가지 않으므로, 그래프가 갱신되면
+    ``force=["library_build"]`` 로 다시 조회한다 (하위 단계도 함께 재계산된다).
+    """
+    receptor_pdb_files = sorted(glob.glob(f"outputs/{target_variant}*.pdb"))
+    if not receptor_pdb_files:
+        raise FileNotFoundError(f"Receptor PDB not found for variant {target_variant} in outputs/")
+    receptor_pdb = receptor_pdb_files[0]
+    logging.info(f"Found receptor PDB: {receptor_pdb}")
+    pocket_file = legacy_pocket(f"outputs/{Path(receptor_pdb).stem}_out", receptor_pdb)
+
+    graph = StageGraph(cache_dir)
+    receptor_pdbqt = Path(receptor_pdb).with_suffix(".pdbqt")
+    graph.add(
+        "receptor_prep", _stage_receptor_prep,
+        params={
+            "receptor_pdb": receptor_pdb,
+            "receptor_pdbqt": receptor_pdbqt.as_posix() if receptor_pdbqt.exists() else None,
+            "cache_dir": RECEPTOR_CACHE_DIR,
+        },
+        files=("receptor_pdb", "receptor_pdbqt"),
+    )
+    graph.add(
+        "pocket_detection", _stage_pocket_detection, inputs=("receptor_prep",),
+        params={"receptor_pdb": receptor_pdb, "pocket_file": pocket_file, "cache_dir": RECEPTOR_CACHE_DIR},
+        files=("pocket_file",),
+    )
+    graph.add(
+        "library_build", _stage_library_build,
+        params={
+            "library_sdf": library_sdf,
+            "target_protein": None if library_sdf else target_protein,
+            "page_size": None if library_sdf else KG_PAGE_SIZE,
+        },
+        files=("library_sdf",),
+    )
+    graph.add("filters", _stage_filters, inputs=("library_build",), params={"dedupe_inchikey": True})
+    graph.add("admet", _stage_admet, inputs=("filters",))
+    graph.add("admet_gate", _stage_admet_gate, inputs=("admet",), params={"gate": AdmetGate.resolve(admet_gate).to_dict()})
+    graph.add("docking", _stage_docking, inputs=("receptor_prep", "pocket_detection", "admet_gate"), params={"top_k": top_k})
+    graph.add("rescoring", _stage_rescoring, inputs=("docking", "admet_gate", "receptor_prep"))
+    graph.add("evaluation", _stage_evaluation, inputs=("rescoring",), params={"ranking": ranking})
+    return graph
+
+
+def run_compound_screen(
+    target_protein: str,
+    target_variant: str,
+    library_sdf: str | None,
+    top_k: int,
+    ranking: str = "docking",
+    cache_dir: str = STAGE_CACHE_DIR,
+    force: Sequence[str] = (),
+    admet_gate: AdmetGate | str | None = None,
+) -> pd.DataFrame:
+    """Runs the full compound screening pipeline.
+
+    *ranking* – ``"docking"`` (docking_score 오름차순) 또는 ``"pareto"`` (도킹·ΔG·SA·ADMET 경고
+    다목적 Pareto 순위, `pareto.pareto_rank`).
+
+    각 단계 출력은 *cache_dir* 아래에 입력·파라미터 해시로 캐시되므로(`build_screen_graph`),
+    재실행 시 바뀐 파라미터의 하위 단계만 다시 계산한다. *force* 의 단계와 그 하위 단계는
+    항상 재계산한다 (예: ``force=["library_build"]`` 로 지식 그래프 화합물을 새로 조회).
+
+    *admet_gate* – 도킹 전에 적용할 ADMET 규칙(`AdmetGate`, ``"default"`` 또는 저장된 프로파일
+    이름). 기본값 None 은 게이트 없이 모든 화합물을 도킹한다. 규칙별 탈락 수는 리포트 옆
+    ``*_admet_gate.csv`` 로 저장된다.
+    """
+    if ranking not in ("docking", "pareto"):
+        raise ValueError(f"ranking must be 'docking' or 'pareto', got {ranking!r}")
     logging.info(f"Starting compound screen for {target_protein} ({target_variant})")
-    
-    temp_sdf_path = None
+
     try:
-        # 1. Find receptor PDB and pocket files
-        receptor_glob_pattern = f"outputs/{target_variant}*.pdb"
-        receptor_pdb_files = glob.glob(receptor_glob_pattern)
-        if not receptor_pdb_files:
-            raise FileNotFoundError(f"Receptor PDB not found for variant {target_variant} in outputs/")
-
-        receptor_pdb = receptor_pdb_files[0]
-        logging.info(f"Found receptor PDB: {receptor_pdb}")
-
-        receptor_stem = Path(receptor_pdb).stem
-        pocket_glob_pattern = f"outputs/{receptor_stem}_out/pockets/*_atm.pdb"
-        pocket_files = glob.glob(pocket_glob_pattern)
-        if not pocket_files:
-            logging.info(f"Pocket PDB file not found in derived path: {os.path.dirname(pocket_glob_pattern)}")
-
-        pocket_file = pocket_files[0]
-        logging.info(f"Found pocket file: {pocket_file}")
-
-        # 2. 화합물 라이브러리 가져오기 및 ADMET 예측
-        # --------------------------------------------------------------------------
+        graph = build_screen_graph(target_protein, target_variant, library_sdf, top_k, ranking, cache_dir, admet_gate)
+        outputs = graph.run(targets=["admet_gate", "evaluation"], force=force)
+        final_results_df = outputs["evaluation"]
+
+        # 최종 결과 저장
+        _save_screen_report(final_results_df, outputs["admet_gate"]["summary"], target_variant)
+
+        return final_results_df
+
+    except Exception as e:
+        logging.error(f"Compound screening pipeline failed: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def _save_screen_report(results_df: pd.DataFrame, gate_summary: pd.DataFrame, target_variant: str) -> str:
+    """Write the screening CSV and, next to it, the per-rule ADMET gate rejection counts."""
+    report_dir = "outputs/reports"
+    os.makedirs(report_dir, exist_ok=True)
+    report_path = os.path.join(report_dir, f"screening_report_{target_variant}_{pd.Timestamp.now():%Y%m%d%H%M%S}.csv")
+    results_df.to_csv(report_path, index=False)
+    logging.info(f"Screening report saved to {report_path}")
+    if len(gate_summary) > 1:  # 규칙 없이 "total" 행만 있으면 게이트가 꺼진 것
+        gate_path = report_path.replace(".csv", "_admet_gate.csv")
+        gate_summary.to_csv(gate_path, index=False)
+        logging.info(f"ADMET gate summary saved to {gate_path}")
+    return report_path
+
+
+# -----------------------------------------------------------------------------
+# Streaming mode – filters/ADMET, docking and MM/GBSA run concurrently on batches
+# -----------------------------------------------------------------------------
+
+STREAM_WORKERS = {"filters": 1, "docking": 4, "rescoring": 1}
+
+
+class _RunningTopK:
+    """Thread-safe gate admitting scores that are within the best *k* seen so far.
+
+    임계값은 단조롭게 엄격해지므로 최종 top-k 에 드는 화합물은 도착 시점에 반드시 통과한다.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: list[float] = []  # -score (max-heap of the k best = lowest scores)
+        self._lock = threading.Lock()
+
+    def admit(self, scores: Sequence[float]) -> list[bool]:
+        keep = []
+        with self._lock:
+            for score in scores:
+                if len(self._heap) < self.k:
+                    heapq.heappush(self._heap, -score)
+                    keep.append(True)
+                elif score < -self._heap[0]:
+                    heapq.heapreplace(self._heap, -score)
+                    keep.append(True)
+                else:
+                    keep.append(False)
+        return keep
+
+
+class _CampaignJobs:
+    """One run's view of a `CampaignStore` campaign for a single receptor."""
+
+    def __init__(self, store: CampaignStore, campaign: str, receptor: str):
+        self.store = store
+        self.campaign = campaign
+        self.receptor = receptor
+
+    def run(self, stage: str, ligand_ids: Sequence[str], func) -> pd.DataFrame | None:
+        """Run ``func(claimed_ids)`` for the unfinished jobs and add the stored rows of finished ones.
+
+        실패한 배치는 failed 로 기록하고 건너뛰므로(다음 `resume` 때 재시도) 한 배치의 오류가
+        캠페인 전체를 멈추지 않는다.
+        """
+        claimed, done = self.store.claim(self.campaign, self.receptor, stage, ligand_ids)
+        out = None
+        if claimed:
+            try:
+                out = func(claimed)
+            except Exception as exc:  # pylint: disable=broad-except
+                logging.warning(f"{stage} failed for {len(claimed)} compounds: {exc}")
+                self.store.fail(self.campaign, self.receptor, stage, claimed, f"{type(exc).__name__}: {exc}")
+            else:
+                self.store.complete(self.campaign, self.receptor, stage, out)
+                finished = set(out["ligand_id"].astype(str)) if out is not None and not out.empty else set()
+                missing = [cid for cid in claimed if cid not in finished]
+                if missing:
+                    self.store.fail(self.campaign, self.receptor, stage, missing, "no result")
+        parts = [df for df in (out, done) if df is not None and not df.empty]
+        return pd.concat(parts, ignore_index=True) if parts else None
+
+
+def run_compound_screen_streaming(
+    target_protein: str,
+    target_variant: str,
+    library_sdf: str | None,
+    top_k: int,
+    ranking: str = "docking",
+    batch_size: int = 32,
+    workers: dict[str, int] | None = None,
+    queue_size: int = 4,
+    cache_dir: str = STAGE_CACHE_DIR,
+    out_dir: str = "outputs/docking/stream",
+    admet_gate: AdmetGate | str | None = None,
+    campaign: str | None = None,
+    campaign_db: str = CAMPAIGN_DB,
+) -> pd.DataFrame:
+    """Producer/consumer variant of `run_compound_screen`.
+
+    수용체·포켓·라이브러리 준비는 `build_screen_graph` 의 캐시된 단계를 그대로 쓰고, 이후
+    화합물을 *batch_size* 단위로 filters+ADMET → docking → rescoring(MM/GBSA) 단계에
+    흘려보낸다(`streaming.StreamingPipeline`). 단계 사이 큐는 *queue_size* 배치로 제한되며
+    단계별 스레드 수는 *workers* (기본 `STREAM_WORKERS`) 로 정한다. SDF 가 없으면 지식 그래프
+    페이지(`kg_compound_batches`)를 라이브러리 파일 없이 바로 배치로 나눠 넣는다.
+    배치 라이브러리와 도킹 포즈는 실행마다 새로 만드는 ``<out_dir>/<target_variant>/run_*/``
+    아래에 쓰므로 동시에 도는 스크리닝끼리 덮어쓰지 않는다.
+
+    MM/GBSA 는 지금까지 본 도킹 점수 중 상위 *top_k* 안에 드는 화합물에만 수행하므로
+    (최종 top-k 는 항상 포함), 배치 경로와 같은 화합물 집합이 최종 결과로 남는다.
+    *admet_gate* 는 filters 단계에서 배치마다 적용되고 규칙별 탈락 수는 합산해 저장한다.
+
+    *campaign* 을 지정하면 (수용체, 리간드, docking|rescoring) 작업의 상태·결과·시간을
+    *campaign_db* (`campaign_store.CampaignStore`) 에 기록한다. 이미 끝난 작업은 저장된 결과를
+    재사용하고 다른 프로세스가 처리 중인 작업은 건너뛰므로, 같은 캠페인을 여러 워커 프로세스가
+    동시에 돌리거나 `resume_campaign` 으로 이어서 실행할 수 있다.
+    """
+    if ranking not in ("docking", "pareto"):
+        raise ValueError(f"ranking must be 'docking' or 'pareto', got {ranking!r}")
+    workers = {**STREAM_WORKERS, **(workers or {})}
+    logging.info(f"Starting streaming compound screen for {target_protein} ({target_variant})")
+
+    try:
+        graph = build_screen_graph(target_protein, target_variant, library_sdf, top_k, ranking, cache_dir, admet_gate)
+        prep = graph.run(targets=["receptor_prep", "pocket_detection"] + (["library_build"] if library_sdf else []))
+        receptor, pocket = prep["receptor_prep"], prep["pocket_detection"]
+
+        jobs = None
+        if campaign:
+            store = CampaignStore(campaign_db)
+            store.create_campaign(campaign, {
+                "target_protein": target_protein,
+                "target_variant": target_variant,
+                "library_sdf": library_sdf,
+                "top_k": top_k,
+                "ranking": ranking,
+                "batch_size": batch_size,
+                "admet_gate": AdmetGate.resolve(admet_gate).to_dict(),
+            })
+            # 수용체는 준비된 PDBQT 의 내용 해시로 식별한다(구조·준비 옵션이 바뀌면 새 작업).
+            jobs = _CampaignJobs(store, campaign, file_digest(receptor["receptor_pdbqt"])[:16])
+
+        seen_keys: set[str] = set()
+        seen_lock = threading.Lock()
+        predictor = ADMETPredictor()
+        admet_rules = AdmetGate.resolve(admet_gate)
+        gate_summaries: list[pd.DataFrame] = []
+
+        def filter_batch(batch: CompoundLibrary) -> CompoundLibrary | None:
+            df = batch.to_frame(columns=["smiles", "inchikey"])
+            keep = df["smiles"].notna().to_numpy().copy()
+            with seen_lock:
+                for i, key in enumerate(df["inchikey"]):
+                    if keep[i] and key is not None:
+                        keep[i] = key not in seen_keys
+                        seen_keys.add(key)
+            if not keep.any():
+                return None
+            batch = CompoundLibrary(batch.table.filter(keep)).with_admet(predictor)
+            if not admet_rules.rules:
+                return batch
+            admet_df = batch.to_frame(columns=list(ADMETPredictor.ADMET_KEYS))
+            passed, summary = admet_rules.apply(admet_df)
+            with seen_lock:
+                gate_summaries.append(summary)
+            if passed.empty:
+                return None
+            return CompoundLibrary(batch.table.filter(admet_df.index.isin(passed.index)))
+
+        docking_runner = DockingRunner(grid_center=pocket["center"], grid_size=pocket["size"])
+        batch_ids = itertools.count()
+        # 실행마다 새 디렉터리 → 동시에 도는 스크리닝이 서로의 배치 라이브러리·포즈를 덮어쓰지 않는다.
+        (Path(out_dir) / target_variant).mkdir(parents=True, exist_ok=True)
+        run_dir = Path(tempfile.mkdtemp(prefix=f"run_{datetime.now():%Y%m%d-%H%M%S}_", dir=Path(out_dir) / target_variant))
+        logging.info(f"Streaming batch outputs go to {run_dir}")
+
+        def dock(batch: CompoundLibrary) -> pd.DataFrame | None:
+            batch_dir = run_dir / f"batch_{next(batch_ids):05d}"
+            library_path = batch.write((batch_dir / "library.arrow").as_posix())
+            docked = docking_runner.run(
+                receptor_pdbqt=receptor["receptor_pdbqt"],
+                library_sdf=library_path,
+                out_dir=batch_dir.as_posix(),
+                top_k=len(batch),
+            )
+            if docked.empty:
+                return None
+            if "compound_id" in docked.columns:
+                docked = docked.rename(columns={"compound_id": "ligand_id"})
+            admet_df = batch.to_frame(columns=["ligand_id", "smiles", *ADMETPredictor.ADMET_KEYS])
+            return pd.merge(docked, admet_df, on="ligand_id", how="left")
+
+        def dock_batch(batch: CompoundLibrary) -> pd.DataFrame | None:
+            if jobs is None:
+                return dock(batch)
+            ids = batch.to_frame(columns=["ligand_id"])["ligand_id"].astype(str)
+            return jobs.run(
+                "docking", ids.tolist(), lambda claimed: dock(CompoundLibrary(batch.table.filter(ids.isin(claimed).to_numpy())))
+            )
+
+        gate = _RunningTopK(top_k)
+        local = threading.local()
+
+        def rescore(docked: pd.DataFrame) -> pd.DataFrame:
+            if not hasattr(local, "calculator"):
+                local.calculator = BindingEnergyCalculator()
+            energy_df = local.calculator.batch(df=docked, receptor_pdb=receptor["receptor_pdb"])
+            return pd.merge(docked, energy_df, on="ligand_id", how="left")
+
+        def rescore_batch(docked: pd.DataFrame) -> pd.DataFrame | None:
+            docked = docked[gate.admit(docked["docking_score"].tolist())]
+            if docked.empty:
+                return None
+            if jobs is None:
+                return rescore(docked)
+            ids = docked["ligand_id"].astype(str)
+            return jobs.run("rescoring", ids.tolist(), lambda claimed: rescore(docked[ids.isin(claimed)]))
+
+        pipeline = StreamingPipeline(
+            [
+                StreamStage("filters", filter_batch, workers["filters"]),
+                StreamStage("docking", dock_batch, workers["docking"]),
+                StreamStage("rescoring", rescore_batch, workers["rescoring"]),
+            ],
+            queue_size=queue_size,
+        )
         if library_sdf:
-            logging.info(f"Loading compounds from provided SDF: {library_sdf}")
-            # SDF에서 화합물 ID와 SMILES 로드
-            mols = [m for m in Chem.SDMolSupplier(library_sdf) if m]
-            compounds_data = [{
-                "ligand_id": m.GetProp("_Name") if m.HasProp("_Name") else f"lig_{i}",
-                "smiles": Chem.MolToSmiles(m)
-            } for i, m in enumerate(mols)]
-            compounds_df = pd.DataFrame(compounds_data)
-            
+            pages = [CompoundLibrary.open(prep["library_build"])]
         else:
-            logging.info("SDF library not provided. Fetching compounds from Knowledge Graph.")
-            client = GraphClient(config.NEO4J_BOLT_URI, config.NEO4J_USER, config.NEO4J_PASSWORD)
-            cypher = (
-                "MATCH (c:Compound)-[:TARGETS]->(g:Gene) "
-                "WHERE g.name STARTS WITH $gene_name AND c.name IS NOT NULL AND c.smiles IS NOT NULL "
-                "RETURN c.name AS ligand_id, c.smiles AS smiles"
-            )
-            results = client.run(cypher, gene_name=target_protein)
-            client.close()
-
-            if not results:
-                logging.error(f"No compounds found for target {target_protein} in Knowledge Graph.")
-                return pd.DataFrame()
-            
-            compounds_df = pd.DataFrame(results)
-
-            # 임시 SDF 생성
-            os.makedirs("outputs/docking", exist_ok=True)
-            temp_sdf_path = f"outputs/docking/temp_kg_library_{target_protein}.sdf"
-            with Chem.SDWriter(temp_sdf_path) as writer:
-                for _, row in compounds_df.iterrows():
-                    mol = Chem.MolFromSmiles(row["smiles"])
-                    if mol:
-                        mol.SetProp("_Name", str(row["ligand_id"]))
-                        writer.write(mol)
-            library_sdf = temp_sdf_path
-
-        logging.info(f"Predicting ADMET properties for {len(compounds_df)} compounds.")
-        admet_predictor = ADMETPredictor()
-        admet_df = admet_predictor.batch_predict(df=compounds_df.copy(), smiles_column="smiles")
-
-        # 3. 도킹 실행
-        # --------------------------------------------------------------------------
-        receptor_pdbqt_path = Path(receptor_pdb).with_suffix(".pdbqt").as_posix()
-        if not Path(receptor_pdbqt_path).exists():
-            logging.info(f"Receptor PDBQT file not found. Generating from {receptor_pdb}...")
-            cmd = [
-                "obabel", "-ipdb", receptor_pdb, "-opdbqt", "-O",
-                receptor_pdbqt_path, "--partialcharge", "gasteiger", "-xr",
-            ]
-            subprocess.run(cmd, check=True)
-
-        center, size = _get_grid_from_pocket(pocket_file)
-        docking_runner = DockingRunner(grid_center=center, grid_size=size)
-        docking_results_df = docking_runner.run(
-            receptor_pdbqt=receptor_pdbqt_path,
-            library_sdf=library_sdf,
-            top_k=top_k
+            # KG 페이지를 그대로 파이프라인에 흘려보낸다(라이브러리 파일·전체 결과 목록 없음).
+            pages = kg_compound_batches(target_protein, max(KG_PAGE_SIZE, batch_size))
+        batches = (
+            CompoundLibrary(page.table.slice(i, batch_size)) for page in pages for i in range(0, len(page), batch_size)
         )
+        scored = list(pipeline.run(batches))
+        if not scored:
+            raise ValueError("Docking returned no results.")
 
-        if docking_results_df.empty:
-            logging.warning("Docking returned no results. Aborting.")
-            return pd.DataFrame()
-        
-        # 열 이름 통일: 'compound_id' -> 'ligand_id'
-        if "compound_id" in docking_results_df.columns:
-            docking_results_df = docking_results_df.rename(columns={"compound_id": "ligand_id"})
-        
-        # 4. 결과 병합 및 결합 에너지 계산
-        # --------------------------------------------------------------------------
-        # 도킹 결과와 ADMET 예측 병합
-        results_df = pd.merge(docking_results_df, admet_df, on="ligand_id", how="left")
-
-        dg_calculator = BindingEnergyCalculator()
-        logging.info(f"Calculating binding energy for {len(results_df)} docked complexes.")
-        energy_df = dg_calculator.batch(df=results_df)
-
-        # 최종 결과 병합
-        final_results_df = pd.merge(results_df, energy_df, on="ligand_id", how="left")
-
-        # 7. 최종 결과 저장
-        report_dir = "outputs/reports"
-        os.makedirs(report_dir, exist_ok=True)
-        report_path = os.path.join(report_dir, f"screening_report_{target_variant}_{pd.Timestamp.now():%Y%m%d%H%M%S}.csv")
-        final_results_df = final_results_df.sort_values(by="docking_score", ascending=True)
-        
-        # 불필요한 열 제거
-        final_results_df = final_results_df.drop(columns=['complex_file'], errors='ignore')
-        
-        final_results_df.to_csv(report_path, index=False)
-        logging.info(f"Screening report saved to {report_path}")
+        results_df = pd.concat(scored, ignore_index=True).sort_values("docking_score").head(top_k)
+        final_results_df = _stage_evaluation({"rescoring": results_df}, {"ranking": ranking}, Path(out_dir))
+        _save_screen_report(final_results_df, combine_summaries(gate_summaries), target_variant)
+        if jobs is not None:
+            logging.info(f"Campaign '{campaign}' job status:\n{jobs.store.status(campaign).to_string(index=False)}")
 
         return final_results_df
 
     except Exception as e:
-        logging.error(f"Compound screening pipeline failed: {e}", exc_info=True)
+        logging.error(f"Streaming compound screening pipeline failed: {e}", exc_info=True)
         return pd.DataFrame()
-    finally:
-        # Clean up temporary SDF file if created
-        if temp_sdf_path and os.path.exists(temp_sdf_path):
-            os.remove(temp_sdf_path)
-            logging.info(f"Removed temporary SDF file: {temp_sdf_path}")
+
+
+def resume_campaign(campaign: str, campaign_db: str = CAMPAIGN_DB, stale_after_s: float | None = None, **kwargs) -> pd.DataFrame:
+    """Re-queue the failed / interrupted jobs of *campaign* and run it again with its stored parameters.
+
+    끝난 작업은 저장된 결과를 재사용하므로 미완료·실패 작업만 다시 계산된다. *stale_after_s* 를
+    주면 그보다 오래 running 으로 남은 작업만 중단된 것으로 본다(다른 워커가 아직 돌고 있을 때).
+    *kwargs* 는 `run_compound_screen_streaming` 의 실행 옵션(workers, queue_size 등)이다.
+    """
+    store = CampaignStore(campaign_db)
+    params = store.campaign(campaign)
+    requeued = store.requeue(campaign, stale_after_s)
+    logging.info(f"Resuming campaign '{campaign}': {requeued} failed/interrupted jobs re-queued.")
+    params["admet_gate"] = AdmetGate.from_dict(params["admet_gate"])
+    return run_compound_screen_streaming(**params, campaign=campaign, campaign_db=campaign_db, **kwargs)
 
 
 if __name__ == '__main__':
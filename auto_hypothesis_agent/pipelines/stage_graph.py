@@ -0,0 +1,192 @@
+"""StageGraph – 내용 해시 기반 캐시를 갖는 파이프라인 단계 DAG 실행기.
+
+각 단계(stage)는 ``func(inputs, params, workdir)`` 형태의 함수이며, 캐시 키는
+
+* 단계 이름과 *version*,
+* 파라미터(JSON 직렬화),
+* *files* 로 지정한 파라미터가 가리키는 파일의 내용 해시,
+* 상위 단계들의 캐시 키
+
+의 SHA-256 이다. 상위 단계의 키가 입력으로 들어가므로 파라미터 하나를 바꾸면 그 단계와
+하위 단계만 키가 바뀌어 다시 계산되고, 나머지는 캐시에서 읽는다. 키는 실행 전에 모두
+계산되므로 캐시된 단계의 출력은 실제로 필요한 경우(하위 단계 재계산)에만 로드한다.
+
+단계 출력은 ``<cache_dir>/<name>/<key>.pkl`` 에 원자적으로 기록되며, 단계가 파일을 만들어야
+하면 전달받은 *workdir* (``<cache_dir>/<name>/<key>/``) 안에 써서 캐시와 함께 보존한다.
+같은 키를 계산하는 실행끼리는 키별 잠금 파일로 직렬화되어 나중 실행이 결과를 재사용한다.
+
+사용 예시::
+
+    graph = StageGraph("outputs/cache/stages")
+    graph.add("prep", prep_receptor, params={"receptor_pdb": pdb}, files=("receptor_pdb",))
+    graph.add("dock", dock, inputs=("prep",), params={"top_k": 50})
+    outputs = graph.run()            # {"prep": ..., "dock": ...}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from auto_hypothesis_agent.simulation.receptor_cache import file_lock
+
+STAGE_CACHE_DIR = "outputs/cache/stages"
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[dict, dict, Path], Any]
+    inputs: tuple[str, ...] = ()
+    params: dict = field(default_factory=dict)
+    files: tuple[str, ...] = ()
+    version: str = "1"
+
+
+class StageGraph:
+    """Run a DAG of stages, caching every output under a hash of its inputs and parameters."""
+
+    def __init__(self, cache_dir: str = STAGE_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.stages: dict[str, Stage] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[dict, dict, Path], Any],
+        inputs: Iterable[str] = (),
+        params: dict | None = None,
+        files: Iterable[str] = (),
+        version: str = "1",
+    ) -> Stage:
+        """Register a stage. *inputs* must name stages added earlier (keeps the graph acyclic)."""
+
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined.")
+        inputs = tuple(inputs)
+        missing = [i for i in inputs if i not in self.stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on undefined stage(s): {missing}")
+        stage = Stage(name, func, inputs, dict(params or {}), tuple(files), version)
+        self.stages[name] = stage
+        return stage
+
+    # ------------------------------------------------------------------
+    def keys(self) -> dict[str, str]:
+        """Cache key of every stage (computed in definition order = topological order)."""
+
+        keys: dict[str, str] = {}
+        for name, stage in self.stages.items():
+            h = hashlib.sha256()
+            h.update(f"{name}:{stage.version}".encode())
+            h.update(json.dumps(stage.params, sort_keys=True, default=str).encode())
+            for param in stage.files:
+                path = stage.params.get(param)
+                h.update(f"{param}={file_digest(path) if path else None}".encode())
+            for upstream in stage.inputs:
+                h.update(f"{upstream}={keys[upstream]}".encode())
+            keys[name] = h.hexdigest()
+        return keys
+
+    def run(self, targets: Iterable[str] | None = None, force: Iterable[str] = ()) -> dict[str, Any]:
+        """Execute the stages needed for *targets* (default: all) and return their outputs.
+
+        *force* 에 지정한 단계와 그 모든 하위 단계는 캐시를 무시하고 다시 계산한다. 강제 재계산은
+        같은 키에 새 출력을 덮어쓰므로(예: 지식 그래프처럼 키에 드러나지 않는 외부 입력 갱신),
+        하위 단계가 낡은 캐시를 계속 읽지 않도록 함께 무효화한다.
+        """
+
+        keys = self.keys()
+        targets = list(targets or self.stages)
+        force = self.descendants(force)
+        for name in force:
+            # 이번 실행의 targets 밖에 있는 하위 단계도 다음 실행에서 다시 계산되도록 지운다.
+            (self.cache_dir / name / f"{keys[name]}.pkl").unlink(missing_ok=True)
+        outputs: dict[str, Any] = {}
+
+        def resolve(name: str) -> Any:
+            if name in outputs:
+                return outputs[name]
+            stage = self.stages[name]
+            key = keys[name]
+            cache_file = self.cache_dir / name / f"{key}.pkl"
+
+            if cache_file.exists():
+                print(f"[StageGraph] {name}: cached ({key[:12]})")
+                with open(cache_file, "rb") as f:
+                    outputs[name] = pickle.load(f)
+                return outputs[name]
+
+            inputs = {upstream: resolve(upstream) for upstream in stage.inputs}
+            # 같은 키를 계산하는 다른 실행과 workdir 를 지우고 덮어쓰지 않도록 키별로 잠근다.
+            with file_lock(self.cache_dir / name / f"{key}.lock"):
+                if cache_file.exists():  # 잠금을 기다리는 동안 다른 실행이 끝냈다
+                    print(f"[StageGraph] {name}: computed concurrently ({key[:12]})")
+                    with open(cache_file, "rb") as f:
+                        outputs[name] = pickle.load(f)
+                    return outputs[name]
+
+                workdir = self.cache_dir / name / key
+                if workdir.exists():
+                    shutil.rmtree(workdir)
+                workdir.mkdir(parents=True)
+
+                print(f"[StageGraph] {name}: running ({key[:12]})")
+                result = stage.func(inputs, dict(stage.params), workdir)
+                _atomic_pickle(result, cache_file)
+            outputs[name] = result
+            return result
+
+        for target in targets:
+            resolve(target)
+        return {name: outputs[name] for name in targets}
+
+    def descendants(self, names: Iterable[str]) -> set[str]:
+        """*names* plus every stage that depends on them, directly or transitively."""
+
+        found = set(names)
+        unknown = found - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {sorted(unknown)}")
+        for name, stage in self.stages.items():  # 정의 순서 = 위상 순서
+            if found.intersection(stage.inputs):
+                found.add(name)
+        return found
+
+    def clear(self, name: str | None = None) -> None:
+        """Remove cached outputs of one stage (or all stages)."""
+
+        path = self.cache_dir / name if name else self.cache_dir
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+
+
+def file_digest(path: str | os.PathLike, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents (``"missing"`` if it does not exist)."""
+
+    path = Path(path)
+    if not path.is_file():
+        return "missing"
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _atomic_pickle(obj: Any, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
@@ -0,0 +1,147 @@
+"""StreamingPipeline – 제한된 큐로 연결된 단계들을 배치 단위로 동시에 실행.
+
+각 단계는 ``func(batch) -> batch | None`` 이며 단계마다 *workers* 개의 스레드가 입력 큐에서
+배치를 꺼내 처리한 뒤 다음 큐에 넣는다(None 을 반환하면 그 배치는 버린다).
+
+• 큐 크기(*queue_size*)가 제한되어 있어 느린 단계 앞에서는 생산자가 자동으로 멈추고
+  (back-pressure) 메모리에 떠 있는 배치 수가 일정하게 유지된다.
+• 모든 단계가 서로 다른 배치를 동시에 처리하므로 전체 시간은 단계 시간의 합이 아니라
+  가장 느린 단계(÷ 그 단계 워커 수)에 가까워진다. 도킹(Vina 하위 프로세스)·OpenMM·RDKit
+  은 GIL 밖에서 계산하므로 스레드로 충분하다.
+• 한 단계에서 예외가 나면 나머지 스레드를 멈추고 `run()` 호출 측에서 다시 발생시킨다.
+• `stats` 에 단계별 처리 배치 수와 누적 작업 시간을 남겨 병목 단계를 확인할 수 있다.
+
+사용 예시::
+
+    pipe = StreamingPipeline([
+        StreamStage("filter", filter_batch, workers=2),
+        StreamStage("dock", dock_batch, workers=8),
+        StreamStage("rescore", rescore_batch, workers=2),
+    ], queue_size=4)
+    for result in pipe.run(batches):
+        ...
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+_DONE = object()
+
+
+class StreamStage(NamedTuple):
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+
+class StreamingPipeline:
+    """Producer/consumer chain of `StreamStage` objects joined by bounded queues."""
+
+    def __init__(self, stages: list[StreamStage], queue_size: int = 4):
+        if not stages:
+            raise ValueError("StreamingPipeline needs at least one stage.")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats: dict[str, dict[str, float]] = {}
+
+    def run(self, source: Iterable[Any]) -> Iterator[Any]:
+        """Feed *source* batches through all stages; yield outputs of the last stage as they finish."""
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        errors: list[BaseException] = []
+        self.stats = {s.name: {"batches": 0, "busy_s": 0.0} for s in self.stages}
+        stats_lock = threading.Lock()
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            # 하위 단계가 멈춘 경우 영원히 막히지 않도록 주기적으로 stop 을 확인한다.
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fail(exc: BaseException) -> None:
+            errors.append(exc)
+            stop.set()
+
+        def feed() -> None:
+            try:
+                for batch in source:
+                    if not put(queues[0], batch):
+                        return
+            except BaseException as exc:  # pylint: disable=broad-except
+                fail(exc)
+            finally:
+                for _ in range(self.stages[0].workers):
+                    put(queues[0], _DONE)
+
+        def work(i: int, stage: StreamStage, remaining: list[int], lock: threading.Lock) -> None:
+            inbox, outbox = queues[i], queues[i + 1]
+            try:
+                while not stop.is_set():
+                    try:
+                        batch = inbox.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if batch is _DONE:
+                        break
+                    t0 = time.perf_counter()
+                    result = stage.func(batch)
+                    with stats_lock:
+                        self.stats[stage.name]["batches"] += 1
+                        self.stats[stage.name]["busy_s"] += time.perf_counter() - t0
+                    if result is not None and not put(outbox, result):
+                        break
+            except BaseException as exc:  # pylint: disable=broad-except
+                print(f"[StreamingPipeline] stage '{stage.name}' failed: {exc}")
+                fail(exc)
+            finally:
+                # 단계의 마지막 워커가 끝나면 다음 단계 워커 수만큼 종료 신호를 보낸다.
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    n_next = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+                    for _ in range(n_next):
+                        put(outbox, _DONE)
+
+        threads = [threading.Thread(target=feed, name="stream-source", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            remaining, lock = [stage.workers], threading.Lock()
+            threads += [
+                threading.Thread(target=work, args=(i, stage, remaining, lock), name=f"stream-{stage.name}-{w}", daemon=True)
+                for w in range(stage.workers)
+            ]
+        t_start = time.perf_counter()
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                try:
+                    item = queues[-1].get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        break
+                    continue
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # 정상 종료면 모든 스레드가 이미 끝났고, 호출 측이 중간에 멈춘 경우에는 깨워서 끝낸다.
+            stop.set()
+            for t in threads:
+                t.join()
+            wall = time.perf_counter() - t_start
+            busy = ", ".join(f"{name} {s['busy_s']:.1f}s/{int(s['batches'])}" for name, s in self.stats.items())
+            print(f"[StreamingPipeline] wall {wall:.1f}s | busy per stage: {busy}")
+
+        if errors:
+            raise errors[0]
@@ -1,3 +1,4 @@
 from .reporter import Reporter
+from .result_store import ResultStoreWriter, iter_result_batches, write_results
 
-__all__ = ["Reporter"] 
\ No newline at end of file
+__all__ = ["Reporter", "ResultStoreWriter", "iter_result_batches", "write_results"]
@@ -1,6 +1,17 @@
 import os
-import pandas as pd
+import warnings
 from datetime import datetime
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from auto_hypothesis_agent.reports.result_store import count_rows, iter_result_batches, numeric_columns, result_schema
+from auto_hypothesis_agent.simulation.evaluator import RunningStats
+
+# 리포트 표에 넣지 않는 대용량 컬럼.
+_BULK_COLUMNS = {"molblock", "fingerprint"}
+
 
 class Reporter:
     """Markdown 리포트 생성기(스켈레톤)."""
@@ -12,7 +23,7 @@ class Reporter:
     def markdown_table(self, df: pd.DataFrame) -> str:
         return df.to_markdown(index=False)
 
-    def render(self, gene: str, comparison_df: pd.DataFrame) -> str:
+    def render(self, gene: str, comparison_df: pd.DataFrame, gate_summary: pd.DataFrame | None = None) -> str:
         ts = datetime.now().strftime("%Y-%m-%d")
         md = f"# {gene} Compound Evaluation Report ({ts})\n\n"
 
@@ -28,10 +39,137 @@ class Reporter:
 
         md += "## Detailed Summary (Baseline vs Candidate)\n\n" + self.markdown_table(comparison_df) + "\n"
 
+        if gate_summary is not None and not gate_summary.empty:
+            md += "\n" + self._gate_section(gate_summary)
+
         md += "---\nGenerated automatically by **Bio-Info Pipeline**. Composite score = mean(Z\_Dock, Z\_ΔG, Z\_SA).\n"
 
         # 그래프·추가 분석은 향후 구현
         path = os.path.join(self.out_dir, f"report_{gene}_{ts}.md")
         with open(path, "w", encoding="utf-8") as f:
             f.write(md)
-        return path 
\ No newline at end of file
+        return path
+
+    # ------------------------------------------------------------------
+    # Columnar store mode
+    # ------------------------------------------------------------------
+
+    def render_from_store(
+        self,
+        gene: str,
+        store_path: str,
+        top_n: int = 20,
+        score_column: str = "composite",
+        ascending: bool = False,
+        histogram_columns: Sequence[str] | None = None,
+        bins: int = 20,
+        batch_size: int = 65_536,
+        gate_summary: pd.DataFrame | None = None,
+    ) -> str:
+        """Render a report from a result store (`result_store`) without loading it whole.
+
+        결과 파일을 배치 단위로 두 번 스캔한다.
+        1) top-N 후보(*score_column* 기준)와 set 별 요약 통계(count/mean/std/min/max),
+        2) 1) 에서 얻은 범위로 숫자 컬럼 히스토그램.
+        섹션은 계산되는 대로 파일에 바로 쓰며, 전체 결과 표는 인라인하지 않고 링크만 남긴다.
+        *gate_summary* (`AdmetGate.apply` 요약)가 주어지면 규칙별 ADMET 게이트 탈락 수를 함께 쓴다.
+        """
+
+        schema = result_schema(store_path)
+        names = [n for n in schema.names if n not in _BULK_COLUMNS]
+        numeric = numeric_columns(schema)
+        if score_column not in numeric:
+            raise ValueError(f"Score column '{score_column}' not found in {store_path}.")
+        has_set = "set" in names
+        hist_cols = [c for c in (histogram_columns or numeric) if c in numeric]
+
+        ts = datetime.now().strftime("%Y-%m-%d")
+        path = os.path.join(self.out_dir, f"report_{gene}_{ts}.md")
+        link = os.path.relpath(os.path.abspath(store_path), os.path.abspath(self.out_dir))
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# {gene} Compound Evaluation Report ({ts})\n\n")
+            f.write(f"Full results ({count_rows(store_path):,} rows): [{os.path.basename(store_path)}]({link})\n\n")
+
+            # Pass 1 – top-N, per-set statistics, value ranges
+            top = None
+            stats: dict[str, RunningStats] = {}
+            lo: dict[str, np.ndarray] = {}
+            hi: dict[str, np.ndarray] = {}
+            for batch in iter_result_batches(store_path, columns=names, batch_size=batch_size):
+                candidates = batch[batch["set"] == "candidate"] if has_set else batch
+                best = self._best(candidates, score_column, top_n, ascending)
+                top = best if top is None else self._best(pd.concat([top, best]), score_column, top_n, ascending)
+
+                groups = batch.groupby("set", sort=False) if has_set else [("all", batch)]
+                for set_name, group in groups:
+                    values = group[numeric].to_numpy(dtype=np.float64)
+                    stats.setdefault(set_name, RunningStats(numeric)).update(values)
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore", RuntimeWarning)  # 전부 NaN 인 컬럼
+                        b_lo, b_hi = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+                    lo[set_name] = np.fmin(lo.get(set_name, b_lo), b_lo)
+                    hi[set_name] = np.fmax(hi.get(set_name, b_hi), b_hi)
+
+            f.write(f"## Top {top_n} Candidates ({score_column})\n\n")
+            f.write((self.markdown_table(top) if top is not None and not top.empty else "_No candidates._") + "\n\n")
+
+            f.write("## Summary by Set\n\n")
+            f.write(self.markdown_table(self._summary(stats, lo, hi)) + "\n\n")
+            if gate_summary is not None and not gate_summary.empty:
+                f.write(self._gate_section(gate_summary))
+            f.flush()
+
+            # Pass 2 – histograms on fixed edges
+            if hist_cols and stats:
+                all_lo = np.fmin.reduce([lo[s] for s in stats])
+                all_hi = np.fmax.reduce([hi[s] for s in stats])
+                edges = {}
+                for c in hist_cols:
+                    i = numeric.index(c)
+                    if np.isfinite(all_lo[i]) and np.isfinite(all_hi[i]):
+                        edges[c] = np.linspace(all_lo[i], all_hi[i] if all_hi[i] > all_lo[i] else all_lo[i] + 1.0, bins + 1)
+                counts = {c: {s: np.zeros(bins, dtype=np.int64) for s in stats} for c in edges}
+                read_cols = list(edges) + (["set"] if has_set else [])
+                if edges:
+                    for batch in iter_result_batches(store_path, columns=read_cols, batch_size=batch_size):
+                        groups = batch.groupby("set", sort=False) if has_set else [("all", batch)]
+                        for set_name, group in groups:
+                            for c, e in edges.items():
+                                counts[c][set_name] += np.histogram(group[c].dropna().to_numpy(dtype=np.float64), bins=e)[0]
+
+                f.write("## Distributions\n\n")
+                for c, e in edges.items():
+                    labels = [f"[{a:.3g}, {b:.3g})" for a, b in zip(e[:-1], e[1:])]
+                    labels[-1] = labels[-1][:-1] + "]"  # np.histogram 의 마지막 구간은 닫힌 구간
+                    table = pd.DataFrame({"bin": labels})
+                    for set_name, hist in counts[c].items():
+                        table[set_name] = hist
+                    f.write(f"### {c}\n\n" + self.markdown_table(table) + "\n\n")
+
+            f.write("---\nGenerated automatically by **Bio-Info Pipeline**. Composite score = mean(Z\\_Dock, Z\\_ΔG, Z\\_SA).\n")
+        return path
+
+    def _gate_section(self, gate_summary: pd.DataFrame) -> str:
+        return "## ADMET Gate (compounds rejected before docking)\n\n" + self.markdown_table(gate_summary) + "\n\n"
+
+    @staticmethod
+    def _best(df: pd.DataFrame, column: str, n: int, ascending: bool) -> pd.DataFrame:
+        return df.nsmallest(n, column) if ascending else df.nlargest(n, column)
+
+    @staticmethod
+    def _summary(stats: dict, lo: dict, hi: dict) -> pd.DataFrame:
+        rows = []
+        for set_name, st in stats.items():
+            for i, col in enumerate(st.columns):
+                rows.append({
+                    "set": set_name,
+                    "column": col,
+                    "count": int(st.count[i]),
+                    "mean": round(float(st.mean[i]), 3) if st.count[i] else np.nan,
+                    "std": round(float(st.std[i]), 3) if st.count[i] else np.nan,
+                    "min": lo[set_name][i],
+                    "max": hi[set_name][i],
+                })
+        return pd.DataFrame(rows)
+
@@ -0,0 +1,128 @@
+"""Result store – 스크리닝 결과를 컬럼형 파일(Parquet / Arrow IPC)로 쓰고 읽는 유틸리티.
+
+대규모 스크리닝 결과는 하나의 DataFrame·마크다운 문자열로 들고 다니지 않고 컬럼형 파일에
+배치 단위로 기록한다. 리포트(`Reporter.render_from_store`) 는 필요한 컬럼만 배치로 스캔해
+top-N · 요약 통계 · 히스토그램을 계산한다.
+
+사용 예시::
+
+    with ResultStoreWriter("outputs/reports/kras_results.parquet") as store:
+        for scored in evaluator.evaluate(source):
+            store.write(scored)
+
+    for batch in iter_result_batches("outputs/reports/kras_results.parquet", columns=["set", "composite"]):
+        ...
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_ds
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+
+    _ARROW_OK = True
+except ImportError:  # pragma: no cover
+    _ARROW_OK = False
+
+DEFAULT_BATCH_SIZE = 65_536
+
+
+class ResultStoreWriter:
+    """Append DataFrame batches to a Parquet (``.parquet``) or Arrow IPC (``.arrow``) file.
+
+    스키마는 첫 배치에서 정해지며 이후 배치는 그 스키마로 변환된다.
+    """
+
+    def __init__(self, path: str | Path):
+        if not _ARROW_OK:
+            raise ImportError("Install pyarrow: pip install pyarrow")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.n_rows = 0
+        self._schema: "pa.Schema | None" = None
+        self._writer = None
+        self._sink = None
+
+    def write(self, batch: pd.DataFrame) -> None:
+        if batch.empty:
+            return
+        if self._schema is None:
+            table = pa.Table.from_pandas(batch, preserve_index=False)
+            self._schema = table.schema.remove_metadata()
+            table = table.replace_schema_metadata(None)
+            if self.path.suffix.lower() == ".parquet":
+                self._writer = pq.ParquetWriter(self.path, self._schema, compression="zstd")
+            else:
+                self._sink = pa.OSFile(str(self.path), "wb")
+                self._writer = pa_ipc.new_file(self._sink, self._schema)
+        else:
+            table = pa.Table.from_pandas(batch, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+        self.n_rows += len(batch)
+
+    def close(self) -> str:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+        return str(self.path)
+
+    def __enter__(self) -> "ResultStoreWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_results(df: pd.DataFrame, path: str | Path) -> str:
+    """Write a whole DataFrame to the result store at *path*."""
+
+    with ResultStoreWriter(path) as store:
+        for start in range(0, len(df), DEFAULT_BATCH_SIZE):
+            store.write(df.iloc[start:start + DEFAULT_BATCH_SIZE])
+    return str(path)
+
+
+def _dataset(path: str | Path) -> "pa_ds.Dataset":
+    if not _ARROW_OK:
+        raise ImportError("Install pyarrow: pip install pyarrow")
+    fmt = "parquet" if Path(path).suffix.lower() == ".parquet" else "ipc"
+    return pa_ds.dataset(str(path), format=fmt)
+
+
+def result_schema(path: str | Path) -> "pa.Schema":
+    """Schema of the result store at *path* (no data is read)."""
+
+    return _dataset(path).schema
+
+
+def numeric_columns(schema: "pa.Schema") -> list[str]:
+    """Integer / floating-point column names of *schema* (booleans excluded)."""
+
+    return [f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+
+
+def count_rows(path: str | Path) -> int:
+    return _dataset(path).count_rows()
+
+
+def iter_result_batches(
+    path: str | Path,
+    columns: Sequence[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """Yield the result store as DataFrames of at most *batch_size* rows, reading only *columns*."""
+
+    scanner = _dataset(path).scanner(columns=list(columns) if columns else None, batch_size=batch_size)
+    for record_batch in scanner.to_batches():
+        if record_batch.num_rows:
+            yield record_batch.to_pandas()
@@ -2,14 +2,22 @@ from .docking import DockingRunner
 from .md_runner import MDRunner
 from .binding_energy import BindingEnergyCalculator
 from .admet_predictor import ADMETPredictor
-from .evaluator import CompoundEvaluator
+from .admet_gate import AdmetGate, GateRule
+from .evaluator import CompoundEvaluator, StreamingCompoundEvaluator
 from .ligand_generator import LigandGenerator
+from .fingerprint_index import FingerprintIndex
+from .compound_library import CompoundLibrary
 
 __all__ = [
     "DockingRunner",
     "MDRunner",
     "BindingEnergyCalculator",
     "ADMETPredictor",
+    "AdmetGate",
+    "GateRule",
     "CompoundEvaluator",
+    "StreamingCompoundEvaluator",
     "LigandGenerator",
+    "FingerprintIndex",
+    "CompoundLibrary",
 ] 
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""AdmetGate – 도킹 전에 ADMET 디스크립터로 화합물을 거르는 규칙 묶음.
+
+`ADMETPredictor` 가 만든 컬럼(herg_ic50, cyp_inhibition, logS, sa_score)에 대해
+``column op threshold`` 형태의 규칙을 **통과 조건**으로 정의하고, 라이브러리 전체에
+규칙별로 한 번씩 벡터 비교를 수행한다. 결과 요약에는 규칙별 탈락 수(``rejected``)와
+그 규칙에서만 탈락한 수(``rejected_only``)가 담겨 리포트에 그대로 들어간다.
+
+규칙 묶음은 프로젝트별 JSON 프로파일(`ADMET_GATE_PROFILE_DIR/<name>.json`)로 저장해
+재사용할 수 있다.
+
+사용 예시::
+
+    gate = AdmetGate.preset()                               # 기본 규칙
+    gate = AdmetGate([GateRule("logS_floor", "logS", ">=", -5.0)])
+    gate.save("kras_g12c")                                  # outputs/profiles/admet_gate/kras_g12c.json
+    passed, summary = AdmetGate.load("kras_g12c").apply(admet_df)
+"""
+
+from __future__ import annotations
+
+import json
+import operator
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from auto_hypothesis_agent.config import ADMET_GATE_PROFILE_DIR
+
+_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+SUMMARY_COLUMNS = ["rule", "column", "op", "threshold", "rejected", "rejected_only"]
+
+
+class GateRule(NamedTuple):
+    """Compounds pass when ``df[column] <op> threshold`` holds."""
+
+    name: str
+    column: str
+    op: str
+    threshold: float | bool
+
+
+# ADMETPredictor 의 hERG 플래그는 herg_ic50 = 5 nM(위험) / 30 nM 로 표기된다.
+DEFAULT_RULES = [
+    GateRule("herg_flag", "herg_ic50", ">=", 10.0),
+    GateRule("logS_floor", "logS", ">=", -6.0),
+    GateRule("sa_ceiling", "sa_score", "<=", 6.0),
+]
+
+
+class AdmetGate:
+    """Vectorised pass/fail gate over an ADMET table."""
+
+    def __init__(self, rules: list[GateRule] | None = None, reject_missing: bool = False):
+        """*reject_missing* 이면 규칙 컬럼 값이 없는(NaN/None) 화합물도 탈락시킨다."""
+        rules = list(rules or [])
+        for rule in rules:
+            if rule.op not in _OPS:
+                raise ValueError(f"Unsupported operator '{rule.op}' in rule '{rule.name}'.")
+        self.rules = rules
+        self.reject_missing = reject_missing
+
+    @classmethod
+    def preset(cls) -> "AdmetGate":
+        return cls(DEFAULT_RULES)
+
+    # ------------------------------------------------------------------
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Boolean pass matrix, one column per rule (rule columns missing from *df* pass)."""
+
+        passes = {}
+        for rule in self.rules:
+            if rule.column not in df:
+                passes[rule.name] = np.ones(len(df), dtype=bool)
+                continue
+            column = df[rule.column]
+            missing = column.isna().to_numpy()
+            values = column.to_numpy()
+            if isinstance(rule.threshold, bool):
+                values = np.where(missing, False, values).astype(bool)
+            else:
+                values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+            with np.errstate(invalid="ignore"):
+                ok = np.asarray(_OPS[rule.op](values, rule.threshold), dtype=bool)
+            passes[rule.name] = np.where(missing, not self.reject_missing, ok)
+        return pd.DataFrame(passes, index=df.index)
+
+    def apply(self, df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Return ``(passed_rows, summary)``; *summary* has one row per rule (`SUMMARY_COLUMNS`)."""
+
+        matrix = self.evaluate(df)
+        passed = matrix.all(axis=1).to_numpy() if self.rules else np.ones(len(df), dtype=bool)
+        return df[passed], self.summary(matrix)
+
+    def summary(self, matrix: pd.DataFrame) -> pd.DataFrame:
+        failed = ~matrix.to_numpy(dtype=bool)
+        only = failed & (failed.sum(axis=1, keepdims=True) == 1)
+        rows = [
+            {
+                "rule": rule.name,
+                "column": rule.column,
+                "op": rule.op,
+                "threshold": rule.threshold,
+                "rejected": int(failed[:, i].sum()),
+                "rejected_only": int(only[:, i].sum()),
+            }
+            for i, rule in enumerate(self.rules)
+        ]
+        rows.append({
+            "rule": "total",
+            "column": None,
+            "op": None,
+            "threshold": None,
+            "rejected": int(failed.any(axis=1).sum()) if self.rules else 0,
+            "rejected_only": None,
+        })
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS).astype({"rejected_only": "Int64"})
+
+    # ------------------------------------------------------------------
+    # Profiles
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {"reject_missing": self.reject_missing, "rules": [r._asdict() for r in self.rules]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AdmetGate":
+        return cls([GateRule(**r) for r in data.get("rules", [])], reject_missing=data.get("reject_missing", False))
+
+    def save(self, name_or_path: str) -> str:
+        """Store the gate as a JSON profile (bare names go to `ADMET_GATE_PROFILE_DIR`)."""
+
+        path = _profile_path(name_or_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return str(path)
+
+    @classmethod
+    def load(cls, name_or_path: str) -> "AdmetGate":
+        path = _profile_path(name_or_path)
+        if not path.exists():
+            raise FileNotFoundError(f"ADMET gate profile not found: {path}")
+        return cls.from_dict(json.loads(path.read_text()))
+
+    @classmethod
+    def resolve(cls, gate: "AdmetGate | str | None") -> "AdmetGate":
+        """``None`` → no rules, ``"default"`` → `preset()`, other strings → `load()`."""
+
+        if gate is None:
+            return cls()
+        if isinstance(gate, AdmetGate):
+            return gate
+        if gate == "default":
+            return cls.preset()
+        return cls.load(gate)
+
+
+def _profile_path(name_or_path: str) -> Path:
+    path = Path(name_or_path)
+    if path.suffix == ".json" or len(path.parts) > 1:
+        return path
+    return Path(ADMET_GATE_PROFILE_DIR) / f"{name_or_path}.json"
+
+
+def combine_summaries(summaries: list[pd.DataFrame]) -> pd.DataFrame:
+    """Sum per-rule counts of several `AdmetGate.summary` tables (e.g. one per batch)."""
+
+    if not summaries:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    combined = summaries[0].copy()
+    for other in summaries[1:]:
+        combined["rejected"] += other["rejected"].to_numpy()
+        mask = combined["rejected_only"].notna()
+        combined.loc[mask, "rejected_only"] = combined.loc[mask, "rejected_only"] + other.loc[mask, "rejected_only"].to_numpy()
+    return combined
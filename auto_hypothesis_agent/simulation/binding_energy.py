@@ -8,17 +8,34 @@ Complex − (Receptor + Ligand) 로 ΔG를 근사한다.
 
 from __future__ import annotations
 
+import hashlib
+import itertools
+import multiprocessing
+import queue
 import random
+import signal
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from pathlib import Path
-import tempfile
 import subprocess
 import os
+from typing import Iterator, NamedTuple
 
+import numpy as np
 import pandas as pd
 
+from auto_hypothesis_agent.config import SMALL_MOLECULE_FORCEFIELD
+from auto_hypothesis_agent.simulation.complex_builder import ComplexBuilder, read_pdb_block
+from auto_hypothesis_agent.simulation.param_cache import ligand_param_cache
+from auto_hypothesis_agent.simulation.pocket_truncation import truncate_complex
+
 try:
-    from openmm import Context, unit
-    from openmm.app import ForceField, PDBFile
+    from openmm import Context, LocalEnergyMinimizer, VerletIntegrator, unit
+    from openmm.app import ForceField, Modeller, PDBFile
     from openmmforcefields.generators import SMIRNOFFTemplateGenerator
     from openff.toolkit.topology import Molecule
 
@@ -26,17 +43,119 @@ try:
 except ImportError:
     _OPENMM_OK = False
 
+try:
+    import MDAnalysis as mda
+
+    _MDA_OK = True
+except ImportError:  # pragma: no cover
+    _MDA_OK = False
+
 STANDARD_AA = {
     "ALA", "ARG", "ASN", "ASP", "CYS", "GLN", "GLU", "GLY", "HIS", 
     "ILE", "LEU", "LYS", "MET", "PHE", "PRO", "SER", "THR", "TRP", 
     "TYR", "VAL"
 }
+_SOLVENT = {"HOH", "WAT", "NA", "CL", "K"}
+
+# OBC2 GB 파라미터는 ForceField XML(implicit/obc2.xml)로 로드해야 적용된다.
+GB_FORCEFIELD_FILES = ("amber14-all.xml", "amber14/tip3pfb.xml", "implicit/obc2.xml")
+
+# ContextPool 이 동시에 유지하는 Context 수 (수용체 + 복합체 + 리간드 조합 여러 개)
+CONTEXT_POOL_SIZE = 16
+
+# 병렬 배치 watchdog 이 워커 내부 SIGALRM 제한보다 늦게 개입하도록 timeout 에 더하는 여유 시간(초).
+# 시계는 워커가 작업을 집어 든 시점부터 재므로 워커 기동/초기화 시간은 포함되지 않는다.
+_WATCHDOG_GRACE_S = 10.0
+# 제출된 작업을 워커가 집어 들 때까지 기다리는 최대 시간(초) – 넘기면 풀을 다시 만든다.
+# 워커 기동·ForceField/수용체 초기화 시간을 넉넉히 덮어야 한다.
+_START_TIMEOUT_S = 600.0
+# 이만큼의 풀에서 시작하지 못한 작업은 fallback 으로 기록한다.
+_MAX_START_ATTEMPTS = 2
+
+
+class _ReceptorTerm(NamedTuple):
+    """수용체 구조 1개당 한 번 계산해 재사용하는 topology·좌표·GB 에너지."""
+
+    topology: "object"
+    positions: list
+    energy: float
+
+
+class ContextPool:
+    """Topology 가 같은 시스템의 OpenMM Context 를 재사용하는 LRU 풀.
+
+    GB 에너지 한 번 평가보다 System/Context 생성이 훨씬 비싸므로, topology
+    시그니처(잔기·원자 이름, 원소, 결합)가 같으면 기존 Context 에 좌표만
+    `setPositions` 로 넣어 에너지를 구한다. 수용체 단독 항과 MD 스냅샷 재평가처럼
+    topology 가 고정된 경우 효과가 크다.
+    """
+
+    def __init__(self, ff: "ForceField", max_size: int = CONTEXT_POOL_SIZE):
+        self.ff = ff
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # signature → (system, integrator, context); integrator 참조를 함께 유지한다.
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def energy(self, top, pos) -> float:
+        """Potential energy (kcal/mol) of *pos* using a pooled Context for *top*."""
+
+        ctx = self._context(top)
+        ctx.setPositions(pos)
+        state = ctx.getState(getEnergy=True)
+        return state.getPotentialEnergy().value_in_unit(unit.kilocalories_per_mole)
+
+    def minimize(self, top, pos, tolerance: float = 10.0, max_iterations: int = 500):
+        """Locally minimise *pos* with the pooled Context for *top*; returns positions (nm, ndarray)."""
+
+        ctx = self._context(top)
+        ctx.setPositions(pos)
+        LocalEnergyMinimizer.minimize(ctx, tolerance * unit.kilojoules_per_mole / unit.nanometer, max_iterations)
+        return ctx.getState(getPositions=True).getPositions(asNumpy=True).value_in_unit(unit.nanometer)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _context(self, top) -> "Context":
+        key = _topology_signature(top)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[2]
+
+        self.misses += 1
+        system = self.ff.createSystem(top, constraints=None)
+        integrator = VerletIntegrator(1 * unit.femtoseconds)
+        ctx = Context(system, integrator)
+        self._entries[key] = (system, integrator, ctx)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return ctx
+
 
 class BindingEnergyCalculator:
-    def __init__(self) -> None:
+    def __init__(self, pocket_cutoff: float | None = None) -> None:
+        """*pocket_cutoff* (Å) 를 주면 리간드 주변 잔기만 남긴 절단 수용체로 ΔG 를 계산한다.
+
+        정확도/속도 비교는 `pocket_truncation.benchmark` 참고.
+        """
+        self.pocket_cutoff = pocket_cutoff
         self._ff = None
+        # receptor structure hash → _ReceptorTerm
+        self._receptor_cache: dict[str, _ReceptorTerm] = {}
+        # ForceField 당 SMIRNOFF 생성기는 하나만 등록하고 분자를 추가해 나간다.
+        self._smirnoff = None
+        self._registered_smiles: set[str] = set()
+        self._builder: ComplexBuilder | None = None
+        self._contexts: ContextPool | None = None
         if _OPENMM_OK:
-            self._ff = ForceField("amber14-all.xml", "amber14/tip3pfb.xml")
+            self._ff = ForceField(*GB_FORCEFIELD_FILES)
+            self._contexts = ContextPool(self._ff)
 
     # ------------------------------------------------------------------
     def calculate(self, complex_pdb: str) -> float:  # noqa: D401
@@ -50,38 +169,415 @@ class BindingEnergyCalculator:
             return _fallback_energy()
 
     # ------------------------------------------------------------------
-    def batch(self, df: pd.DataFrame) -> pd.DataFrame:
-        """SMILES와 PDB 경로가 포함된 DataFrame을 사용하여 배치 처리합니다."""
+    def prepare_receptor(self, receptor_pdb: str, ph: float = 7.0) -> float:
+        """Compute and cache the GB energy of *receptor_pdb* (standard residues only).
+
+        구조 예측/PDB 원본에는 수소가 없어 amber14 템플릿 매칭이 실패하므로, 표준 잔기만 남긴 뒤
+        ``Modeller.addHydrogens`` 로 *ph* 에서 양성자화한다 (이미 있는 수소는 유지된다).
+        동일 구조를 포함한 복합체는 이후 receptor 항을 다시 계산하지 않는다.
+        """
+
+        pdb = PDBFile(str(receptor_pdb))
+        modeller = Modeller(pdb.topology, pdb.positions)
+        modeller.delete([r for r in modeller.topology.residues() if r.name not in STANDARD_AA])
+        modeller.addHydrogens(self._ff, pH=ph)
+        rec_atoms = [a.index for a in modeller.topology.atoms()]
+        term = self._receptor_term(modeller.topology, modeller.positions, rec_atoms)
+        # 도킹 포즈(PDBQT)는 캐시된 수용체 topology 와 메모리에서 결합한다.
+        self._builder = ComplexBuilder(receptor_topology=term.topology, receptor_positions=term.positions)
+        return term.energy
+
+    # ------------------------------------------------------------------
+    def calculate_pose(self, pose_pdbqt: str, smiles: str) -> float:
+        """ΔG for a ligand-only docked pose combined in memory with the prepared receptor.
+
+        `prepare_receptor()` 를 먼저 호출해야 한다.
+        """
         if not _OPENMM_OK:
-            # OpenMM이 없으면 모든 것에 대해 fallback 값을 반환합니다.
-            df["delta_g"] = [_fallback_energy() for _ in range(len(df))]
-            return df[["ligand_id", "delta_g"]]
+            return _fallback_energy()
+        if self._builder is None:
+            raise RuntimeError("prepare_receptor() must be called before calculate_pose().")
+
+        try:
+            top, pos, rec_atoms, lig_atoms = self._builder.build(pose_pdbqt, smiles)
+            return self._mmgbsa_topology(top, pos, rec_atoms, lig_atoms)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"[BindingEnergy] energy calc failed for pose {Path(pose_pdbqt).name} – fallback. Reason: {exc}")
+            return _fallback_energy()
+
+    def _score(self, path: str, smiles: str) -> float:
+        if self._builder is not None and str(path).endswith(".pdbqt"):
+            return self.calculate_pose(path, smiles)
+        return self.calculate(path)
+
+    # ------------------------------------------------------------------
+    def register_ligands(self, smiles_list: list[str]) -> None:
+        """Make *smiles_list* known to this calculator's SMIRNOFF template generator.
+
+        파라미터화 결과는 `ligand_param_cache()` 파일에 저장되므로, 이전 실행(또는
+        `MDRunner`)에서 이미 처리한 화합물은 AM1-BCC 전하를 다시 계산하지 않는다.
+        """
+        if not _OPENMM_OK:
+            raise RuntimeError("register_ligands() requires OpenMM/openmmforcefields, which are not installed.")
+
+        new = [smi for smi in dict.fromkeys(smiles_list) if smi not in self._registered_smiles]
+        if not new:
+            return
+        molecules = [Molecule.from_smiles(smi, allow_undefined_stereo=True) for smi in new]
+
+        if self._smirnoff is None:
+            self._smirnoff = SMIRNOFFTemplateGenerator(
+                molecules=molecules,
+                forcefield=SMALL_MOLECULE_FORCEFIELD,
+                cache=ligand_param_cache(SMALL_MOLECULE_FORCEFIELD),
+            )
+            self._ff.registerTemplateGenerator(self._smirnoff.generator)
+        else:
+            self._smirnoff.add_molecules(molecules)
+        self._registered_smiles.update(new)
+
+    # ------------------------------------------------------------------
+    def warm_ligand_cache(self, smiles_list: list[str]) -> None:
+        """Parameterize every molecule in this process so the on-disk cache is complete.
+
+        병렬 배치 전에 호출하여 워커들이 캐시를 읽기만 하도록 한다(TinyDB 동시 쓰기 방지).
+        캐시에 이미 있는 분자는 템플릿 조회만 하므로 비용이 거의 없다.
+        """
+        if not _OPENMM_OK:
+            raise RuntimeError("warm_ligand_cache() requires OpenMM/openmmforcefields, which are not installed.")
+
+        self.register_ligands(smiles_list)
+        for smi in dict.fromkeys(smiles_list):
+            try:
+                top = Molecule.from_smiles(smi, allow_undefined_stereo=True).to_topology().to_openmm()
+                self._ff.createSystem(top, constraints=None)
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"[BindingEnergy] ligand parameterization failed for {smi}. Reason: {exc}")
+
+    # ------------------------------------------------------------------
+    def batch(
+        self,
+        df: pd.DataFrame,
+        receptor_pdb: str | None = None,
+        n_workers: int = 1,
+        threads_per_worker: int | None = None,
+        timeout: float | None = None,
+    ) -> pd.DataFrame:
+        """SMILES와 PDB 경로가 포함된 DataFrame을 사용하여 배치 처리합니다.
+
+        *receptor_pdb* 를 주면 수용체 GB 에너지를 배치 시작 전에 한 번 계산해 둔다.
+        주지 않아도 첫 복합체에서 계산된 수용체 항이 구조 해시로 캐시되어 재사용된다.
+
+        *n_workers* > 1 이면 복합체를 워커 프로세스에 분산한다(`iter_batch` 참고).
+
+        수용체가 준비된 상태에서 경로가 `.pdbqt` (리간드 단독 도킹 포즈) 이면
+        `calculate_pose` 로 메모리에서 복합체를 조립해 계산한다.
+        """
+        if not _OPENMM_OK:
+            # OpenMM이 없으면 모든 것에 대해 fallback 값을 반환합니다 (입력 DataFrame 은 건드리지 않는다).
+            return pd.DataFrame({"ligand_id": df["ligand_id"].to_numpy(), "delta_g": [_fallback_energy() for _ in range(len(df))]})
+
+        results = list(self.iter_batch(df, receptor_pdb, n_workers, threads_per_worker, timeout))
+        return pd.DataFrame(results, columns=["ligand_id", "delta_g"])
+
+    # ------------------------------------------------------------------
+    def iter_batch(
+        self,
+        df: pd.DataFrame,
+        receptor_pdb: str | None = None,
+        n_workers: int = 1,
+        threads_per_worker: int | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[dict]:
+        """Yield {ligand_id, delta_g} per complex as soon as each one is scored.
+
+        • 각 워커는 템플릿 생성기가 등록된 자체 ForceField 를 초기화 시 한 번 만든다.
+        • OpenMM CPU 스레드는 ``threads_per_worker`` (기본: CPU 수 / 워커 수) 로 제한해
+          워커 간 코어 과할당을 막는다.
+        • *timeout* (초) 을 넘긴 복합체는 fallback 값으로 기록하고, 묶인 워커를 풀째 종료한 뒤
+          새 풀에 남은 작업을 다시 제출한다. 워커가 ``_START_TIMEOUT_S`` 안에 집어 들지 못한
+          작업도 풀을 다시 만들어 재시도하고, 반복되면 fallback 으로 기록한다.
+        """
 
-        # 데이터프레임에서 모든 고유 분자에 대한 템플릿 생성기를 설정합니다.
         smiles_list = df["smiles"].unique().tolist()
-        molecules = [Molecule.from_smiles(smi, allow_undefined_stereo=True) for smi in smiles_list]
-        
-        # 'openff-2.1.0' (Sage)는 최신이고 일반적으로 권장됩니다.
-        smirnoff = SMIRNOFFTemplateGenerator(molecules=molecules, forcefield="openff-2.1.0")
-        self._ff.registerTemplateGenerator(smirnoff.generator)
-
-        # 이제 각 복합체에 대한 에너지를 계산합니다.
-        results = []
-        for _, row in df.iterrows():
-            energy = self.calculate(row["output_pdbqt_path"])
-            results.append({
-                "ligand_id": row["ligand_id"],
-                "delta_g": energy
-            })
-        
-        return pd.DataFrame(results)
+        jobs = list(zip(df["ligand_id"], df[_pose_column(df)], df["smiles"]))
+        # 리간드 단독 포즈(PDBQT)는 준비된 수용체 없이는 점수를 낼 수 없다.
+        needs_receptor = any(str(path).endswith(".pdbqt") for _, path, _ in jobs)
+
+        if n_workers <= 1:
+            # 데이터프레임에서 모든 고유 분자에 대한 템플릿 생성기를 설정합니다.
+            self.register_ligands(smiles_list)
+            self._prime_receptor(receptor_pdb, required=needs_receptor)
+            for ligand_id, path, smiles in jobs:
+                with _time_limit(timeout):
+                    energy = self._score(path, smiles)
+                yield {"ligand_id": ligand_id, "delta_g": energy}
+            return
+
+        self.warm_ligand_cache(smiles_list)
+        if needs_receptor:
+            # 워커마다 실패해 전부 fallback 이 되기 전에 부모에서 수용체 준비를 검증한다.
+            self._prime_receptor(receptor_pdb, required=True)
+
+        threads = threads_per_worker or max(1, (os.cpu_count() or 1) // n_workers)
+        ctx = multiprocessing.get_context("spawn")  # fork 후 CUDA/OpenMM 초기화 문제 방지
+
+        def new_pool():
+            # 워커는 작업을 시작할 때 제출 토큰을 보낸다 → 부모가 받은 시각부터 deadline 을 잰다.
+            # 종료된 워커가 큐 잠금을 쥐고 있을 수 있으므로 풀마다 새 큐를 쓴다.
+            started_q = ctx.Queue()
+            pool = ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(smiles_list, threads, receptor_pdb, self.pocket_cutoff, started_q),
+            )
+            return pool, started_q
+
+        executor, started_q = new_pool()
+        # 워커 수만큼만 in-flight 로 유지 (대기열이 길어져도 pending 이 커지지 않는다).
+        # pending: future → (job 번호, job, 제출 토큰, 제출 시각)
+        pending: dict = {}
+        started: dict[int, float] = {}
+        unstarted: dict[int, int] = {}  # job 번호 → 시작하지 못하고 회수된 횟수
+        todo = deque(enumerate(jobs))
+        tokens = itertools.count()
+        try:
+            while True:
+                while len(pending) < n_workers and todo:
+                    idx, job = todo.popleft()
+                    token = next(tokens)
+                    try:
+                        fut = executor.submit(_score_in_worker, token, job[1], job[2], timeout)
+                    except BrokenProcessPool as exc:
+                        print(f"[BindingEnergy] process pool broken – fallback for {job[0]}. Reason: {exc}")
+                        yield {"ligand_id": job[0], "delta_g": _fallback_energy()}
+                        continue
+                    pending[fut] = (idx, job, token, time.monotonic())
+                if not pending:
+                    break
+
+                done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                while True:
+                    try:
+                        started.setdefault(started_q.get_nowait(), time.monotonic())
+                    except queue.Empty:
+                        break
+                for fut in done:
+                    _, job, token, _ = pending.pop(fut)
+                    started.pop(token, None)
+                    try:
+                        energy = fut.result()
+                    except Exception as exc:  # pylint: disable=broad-except
+                        print(f"[BindingEnergy] worker failed for {job[0]} – fallback. Reason: {exc}")
+                        energy = _fallback_energy()
+                    yield {"ligand_id": job[0], "delta_g": energy}
+
+                if not timeout:
+                    continue
+                # 워커 내부 SIGALRM 제한으로도 끝나지 않는(C++ 호출에 묶인) 복합체는 포기한다.
+                # 워커가 집어 들지 못한 작업은 _START_TIMEOUT_S 까지만 기다린다 (워커 기동/초기화가
+                # 멈췄거나 모든 워커가 묶인 경우).
+                now = time.monotonic()
+                hung = [f for f, (_, _, token, _) in pending.items()
+                        if token in started and now - started[token] > timeout + _WATCHDOG_GRACE_S]
+                stalled = [f for f, (_, _, token, submitted) in pending.items()
+                           if token not in started and now - submitted > _START_TIMEOUT_S]
+                if not (hung or stalled):
+                    continue
+
+                for fut in hung:
+                    _, job, _, _ = pending.pop(fut)
+                    print(f"[BindingEnergy] {job[0]} exceeded {timeout:.0f}s – fallback.")
+                    yield {"ligand_id": job[0], "delta_g": _fallback_energy()}
+                for fut in stalled:
+                    idx, job, _, _ = pending.pop(fut)
+                    unstarted[idx] = unstarted.get(idx, 0) + 1
+                    if unstarted[idx] >= _MAX_START_ATTEMPTS:
+                        print(f"[BindingEnergy] {job[0]} never started after {unstarted[idx]} pools – fallback.")
+                        yield {"ligand_id": job[0], "delta_g": _fallback_energy()}
+                    else:
+                        todo.appendleft((idx, job))
+                # 묶인 워커는 취소할 수 없으므로 풀을 통째로 종료하고 새로 만든다. 함께 종료되는
+                # 나머지 작업은 원래 순서대로 대기열 앞에 다시 넣는다.
+                requeue = sorted([*((idx, job) for idx, job, _, _ in pending.values()), *todo], key=lambda t: t[0])
+                todo = deque(requeue)
+                print(f"[BindingEnergy] restarting worker pool ({len(pending)} running jobs resubmitted)")
+                pending.clear()
+                started.clear()
+                _terminate_pool(executor, started_q)
+                executor, started_q = new_pool()
+        finally:
+            if pending:
+                # 소비자가 중간에 멈췄거나 예외가 났다 – 실행 중인 작업을 기다리지 않는다.
+                _terminate_pool(executor, started_q)
+            else:
+                executor.shutdown(wait=True, cancel_futures=True)
+                started_q.close()
+
+    def _prime_receptor(self, receptor_pdb: str | None, required: bool = False) -> None:
+        """Prepare *receptor_pdb* if given; with *required* a missing or failed receptor raises.
+
+        복합체 PDB 배치에서는 수용체 사전 계산이 최적화일 뿐이므로 실패해도 복합체별로 계산한다.
+        PDBQT 포즈 배치(*required*)는 수용체 없이 모두 fallback 값이 되므로 예외로 알린다.
+        """
+        if not receptor_pdb:
+            if required:
+                raise ValueError("receptor_pdb is required to score ligand-only PDBQT poses.")
+            return
+        try:
+            self.prepare_receptor(receptor_pdb)
+        except Exception as exc:  # pylint: disable=broad-except
+            if required:
+                raise RuntimeError(f"Receptor preparation failed for {receptor_pdb}: {exc}") from exc
+            print(f"[BindingEnergy] receptor pre-computation failed – computing per complex. Reason: {exc}")
+
+    # ------------------------------------------------------------------
+    def calculate_trajectory(
+        self,
+        topology_pdb: str,
+        trajectory: str,
+        smiles: str | None = None,
+        start: int = 0,
+        stop: int | None = None,
+        stride: int = 1,
+        n_workers: int = 1,
+        threads_per_worker: int | None = None,
+    ) -> dict:
+        """Mean ΔG and its standard error over MD frames.
+
+        Returns ``{"delta_g", "delta_g_se", "n_frames"}``. 연속 프레임은 서로 상관되어
+        있으므로 SE 가 과소평가되지 않도록 *stride* 를 충분히 크게 잡는다.
+        """
+        if not (_OPENMM_OK and _MDA_OK):
+            print("[BindingEnergy] OpenMM/MDAnalysis unavailable – fallback.")
+            return {"delta_g": _fallback_energy(), "delta_g_se": float("nan"), "n_frames": 0}
+
+        frames = self.rescore_trajectory(
+            topology_pdb, trajectory, smiles, start, stop, stride, n_workers, threads_per_worker
+        )
+        if frames.empty:
+            raise ValueError(f"No frames selected from {trajectory}")
+
+        dg = frames["delta_g"].to_numpy()
+        se = float(dg.std(ddof=1) / np.sqrt(len(dg))) if len(dg) > 1 else float("nan")
+        return {"delta_g": round(float(dg.mean()), 2), "delta_g_se": round(se, 2), "n_frames": len(dg)}
+
+    # ------------------------------------------------------------------
+    def rescore_trajectory(
+        self,
+        topology_pdb: str,
+        trajectory: str,
+        smiles: str | None = None,
+        start: int = 0,
+        stop: int | None = None,
+        stride: int = 1,
+        n_workers: int = 1,
+        threads_per_worker: int | None = None,
+    ) -> pd.DataFrame:
+        """Per-frame complex/receptor/ligand GB energies for an MD trajectory.
+
+        • *topology_pdb* 는 궤적과 같은 원자 순서의 PDB (예: `MDRunner` 입력 복합체),
+          *trajectory* 는 MDAnalysis 가 읽을 수 있는 파일(DCD 등)이다.
+        • 프레임은 MDAnalysis 로 한 장씩 읽으므로 긴 궤적도 메모리에 올리지 않는다.
+        • topology 가 고정이므로 세 항 모두 `ContextPool` 의 Context 를 재사용한다.
+        • *n_workers* > 1 이면 프레임 구간을 워커 프로세스에 나눠 각 워커가 직접 읽는다.
+        • 포켓 절단(`pocket_cutoff`)은 프레임마다 캡 좌표가 달라지므로 적용하지 않는다.
+        """
+
+        universe = mda.Universe(str(topology_pdb), str(trajectory))
+        frame_ids = list(range(*slice(start, stop, stride).indices(len(universe.trajectory))))
+        del universe
+
+        if n_workers <= 1 or len(frame_ids) < 2:
+            if smiles:
+                self.register_ligands([smiles])
+            rows = _TrajectoryTerms(self._contexts, topology_pdb, trajectory).energies(frame_ids)
+        else:
+            if smiles:
+                self.warm_ligand_cache([smiles])
+            threads = threads_per_worker or max(1, (os.cpu_count() or 1) // n_workers)
+            chunks = [c.tolist() for c in np.array_split(frame_ids, min(len(frame_ids), n_workers * 4))]
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_trajectory_worker,
+                initargs=(str(topology_pdb), str(trajectory), smiles, threads),
+            ) as executor:
+                rows = [row for chunk_rows in executor.map(_rescore_frames_in_worker, chunks) for row in chunk_rows]
+
+        return pd.DataFrame(rows, columns=["frame", "e_complex", "e_receptor", "e_ligand", "delta_g"])
+
+    # ------------------------------------------------------------------
+    def minimize_complex(self, complex_pdb: str, smiles: str | None = None, max_iterations: int = 500) -> dict:
+        """Minimise a complex in implicit solvent and report pose/interaction changes.
+
+        Returns ``{lig_displacement (Å, backbone 정렬 후 리간드 중원자 RMSD),
+        e_int_before, e_int_after (kcal/mol, E_complex − E_receptor − E_ligand)}``.
+        수용체 topology 가 같은 복합체끼리는 `ContextPool` Context 를 공유한다.
+        OpenMM 이 없으면 fallback 값 대신 `RuntimeError` 를 낸다 (가짜 포즈 판정 방지).
+        """
+        if not _OPENMM_OK:
+            raise RuntimeError("minimize_complex() requires OpenMM/openmmforcefields, which are not installed.")
+
+        from auto_hypothesis_agent.simulation.trajectory_analysis import AtomSelection, ligand_rmsd, select_atoms
+
+        if smiles:
+            self.register_ligands([smiles])
+
+        pdb = PDBFile(str(complex_pdb))
+        top = pdb.topology
+        rec_atoms = [a.index for a in top.atoms() if a.residue.name in STANDARD_AA]
+        lig_atoms = _ligand_atoms(top)
+        if not lig_atoms:
+            raise ValueError(f"No ligand atoms found in {complex_pdb}")
+
+        complex_atoms = sorted(rec_atoms + lig_atoms)
+        complex_top, complex_pos = _subset(top, pdb.positions, complex_atoms)
+        # 부분 topology 안에서의 리간드/수용체 인덱스 (Modeller.delete 는 순서를 유지한다)
+        lig_set = set(lig_atoms)
+        sub_lig = [i for i, a in enumerate(complex_atoms) if a in lig_set]
+        sub_rec = [i for i, a in enumerate(complex_atoms) if a not in lig_set]
+        rec_top, _ = _subset(complex_top, complex_pos, sub_rec)
+        lig_top, _ = _subset(complex_top, complex_pos, sub_lig)
+
+        before = np.asarray(complex_pos.value_in_unit(unit.nanometer))
+        after = self._contexts.minimize(complex_top, before, max_iterations=max_iterations)
+
+        def interaction(xyz):
+            return (
+                self._contexts.energy(complex_top, xyz)
+                - self._contexts.energy(rec_top, xyz[sub_rec])
+                - self._contexts.energy(lig_top, xyz[sub_lig])
+            )
+
+        atoms = list(complex_top.atoms())
+        heavy_lig = np.asarray(
+            [i for i in sub_lig if atoms[i].element is None or atoms[i].element.symbol != "H"], dtype=np.int64
+        )
+        selection = AtomSelection(select_atoms(complex_top).fit, heavy_lig)
+        displacement = float(ligand_rmsd(after * 10.0, before * 10.0, selection)[0])
+        return {
+            "lig_displacement": round(displacement, 2),
+            "e_int_before": round(interaction(before), 2),
+            "e_int_after": round(interaction(after), 2),
+        }
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
     def _mmgbsa_single(self, pdb_path: Path) -> float:
-        """Compute GBSA energies for complex, receptor, ligand."""
+        """Compute GBSA energies for complex, receptor, ligand (raises if the PDB is unusable)."""
+
+        return self._mmgbsa_topology(*self._read_complex(pdb_path))
+
+    def _read_complex(self, pdb_path: Path) -> tuple:
+        """Parse a complex PDB into (topology, positions, receptor atoms, ligand atoms).
+
+        ATOM/HETATM 레코드가 없거나, 파싱에 실패하거나, 리간드 원자가 없으면 `ValueError` 를 낸다.
+        fallback 값은 호출자(`calculate`)가 정한다.
+        """
 
         cleaned_pdb_lines = []
         with open(pdb_path, 'r') as f:
@@ -92,26 +588,14 @@ class BindingEnergyCalculator:
                     break
 
         if not cleaned_pdb_lines:
-            print(f"[BindingEnergy] Could not extract any ATOM/HETATM records from {pdb_path.name}")
-            return _fallback_energy()
-            
+            raise ValueError(f"Could not extract any ATOM/HETATM records from {pdb_path.name}")
+
         pdb_block = "".join(cleaned_pdb_lines)
 
         try:
-            # Write the cleaned PDB block to a temporary file and pass the path
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.pdb', delete=False) as tmp_pdb_file:
-                tmp_pdb_file.write(pdb_block)
-                tmp_pdb_path = tmp_pdb_file.name
-            
-            pdb = PDBFile(tmp_pdb_path)
-
+            pdb = read_pdb_block(pdb_block)
         except Exception as e:
-            print(f"[BindingEnergy] OpenMM failed to parse cleaned PDB from {pdb_path.name}. Reason: {e}")
-            return _fallback_energy()
-        finally:
-            # Ensure the temporary file is deleted
-            if 'tmp_pdb_path' in locals() and os.path.exists(tmp_pdb_path):
-                os.remove(tmp_pdb_path)
+            raise ValueError(f"OpenMM failed to parse cleaned PDB from {pdb_path.name}: {e}") from e
 
         # Split atoms by residue name (standard vs. non-standard)
         complex_top = pdb.topology
@@ -121,38 +605,209 @@ class BindingEnergyCalculator:
         lig_atoms = [a.index for a in complex_top.atoms() if a.residue.name not in STANDARD_AA]
 
         if not lig_atoms:
-            # No separate ligand marked; treat entire complex energy as fallback
-            print(f"[BindingEnergy] No ligand atoms found in {pdb_path.name}. Cannot calculate deltaG.")
-            return _fallback_energy()
+            raise ValueError(f"No ligand atoms found in {pdb_path.name}. Cannot calculate deltaG.")
+
+        return complex_top, complex_pos, rec_atoms, lig_atoms
+
+    def _mmgbsa_topology(self, complex_top, complex_pos, rec_atoms: list[int], lig_atoms: list[int]) -> float:
+        """ΔG = E(complex) − E(receptor) − E(ligand) for an in-memory complex."""
+
+        if self.pocket_cutoff:
+            complex_top, complex_pos, rec_atoms, lig_atoms = truncate_complex(
+                complex_top, complex_pos, lig_atoms, self.pocket_cutoff
+            )
 
         # Complex energy
-        e_complex = _gb_energy(self._ff, complex_top, complex_pos)
+        e_complex = self._contexts.energy(complex_top, complex_pos)
 
-        # Receptor-only
-        rec_top = complex_top.subset(rec_atoms)
-        rec_pos = [complex_pos[i] for i in rec_atoms]
-        e_receptor = _gb_energy(self._ff, rec_top, rec_pos)
+        # Receptor-only – rigid docking 에서는 모든 리간드가 같은 수용체를 공유하므로 캐시 사용
+        e_receptor = self._receptor_term(complex_top, complex_pos, rec_atoms).energy
 
         # Ligand-only
-        lig_top = complex_top.subset(lig_atoms)
-        lig_pos = [complex_pos[i] for i in lig_atoms]
-        e_ligand = _gb_energy(self._ff, lig_top, lig_pos)
+        lig_top, lig_pos = _subset(complex_top, complex_pos, lig_atoms)
+        e_ligand = self._contexts.energy(lig_top, lig_pos)
 
         delta_g = e_complex - (e_receptor + e_ligand)
         return round(delta_g, 2)
 
+    def _receptor_term(self, top, pos, rec_atoms: list[int]) -> _ReceptorTerm:
+        key = _structure_key(top, pos, rec_atoms)
+        term = self._receptor_cache.get(key)
+        if term is None:
+            rec_top, rec_pos = _subset(top, pos, rec_atoms)
+            term = _ReceptorTerm(rec_top, rec_pos, self._contexts.energy(rec_top, rec_pos))
+            self._receptor_cache[key] = term
+        return term
+
+
+class _TrajectoryTerms:
+    """고정 topology 궤적에서 프레임별 complex/receptor/ligand GB 에너지를 계산한다."""
+
+    def __init__(self, contexts: ContextPool, topology_pdb: str, trajectory: str):
+        self.contexts = contexts
+        self.universe = mda.Universe(str(topology_pdb), str(trajectory))
+
+        pdb = PDBFile(str(topology_pdb))
+        top = pdb.topology
+        if top.getNumAtoms() != self.universe.atoms.n_atoms:
+            raise ValueError(f"{topology_pdb} and {trajectory} have different atom counts")
+
+        self.rec_atoms = np.array([a.index for a in top.atoms() if a.residue.name in STANDARD_AA])
+        self.lig_atoms = np.array(_ligand_atoms(top))
+        if self.lig_atoms.size == 0:
+            raise ValueError(f"No ligand atoms found in {topology_pdb}")
+        self.complex_atoms = np.sort(np.concatenate([self.rec_atoms, self.lig_atoms]))
+
+        self.complex_top, _ = _subset(top, pdb.positions, self.complex_atoms.tolist())
+        self.rec_top, _ = _subset(top, pdb.positions, self.rec_atoms.tolist())
+        self.lig_top, _ = _subset(top, pdb.positions, self.lig_atoms.tolist())
+
+    def energies(self, frame_ids: list[int]) -> list[tuple]:
+        rows = []
+        for i in frame_ids:
+            xyz = self.universe.trajectory[i].positions / 10.0  # Å → nm
+            e_complex = self.contexts.energy(self.complex_top, xyz[self.complex_atoms])
+            e_receptor = self.contexts.energy(self.rec_top, xyz[self.rec_atoms])
+            e_ligand = self.contexts.energy(self.lig_top, xyz[self.lig_atoms])
+            delta_g = round(e_complex - (e_receptor + e_ligand), 2)
+            rows.append((i, e_complex, e_receptor, e_ligand, delta_g))
+        return rows
+
 
 # -----------------------------------------------------------------------------
 # Stand-alone helpers
 # -----------------------------------------------------------------------------
 
 
-def _gb_energy(ff: "ForceField", top, pos) -> float:
-    system = ff.createSystem(top, implicitSolvent="OBC2", constraints=None)
-    ctx = Context(system, unit.VerletIntegrator(1 * unit.femtoseconds))
-    ctx.setPositions(pos)
-    state = ctx.getState(getEnergy=True)
-    return state.getPotentialEnergy().value_in_unit(unit.kilocalories_per_mole)
+def _ligand_atoms(top) -> list[int]:
+    """Atoms of residue ``LIG`` if present, otherwise all non-protein, non-solvent atoms."""
+
+    lig = [a.index for a in top.atoms() if a.residue.name == "LIG"]
+    if lig:
+        return lig
+    return [a.index for a in top.atoms() if a.residue.name not in STANDARD_AA | _SOLVENT]
+
+
+def _pose_column(df: pd.DataFrame) -> str:
+    """Column holding pose/complex paths (`DockingRunner` 출력은 `complex_file`)."""
+
+    for col in ("output_pdbqt_path", "complex_file"):
+        if col in df.columns:
+            return col
+    raise ValueError("DataFrame needs an 'output_pdbqt_path' or 'complex_file' column.")
+
+
+def _subset(top, pos, atom_indices: list[int]):
+    """Return (topology, positions) containing only *atom_indices*."""
+
+    keep = set(atom_indices)
+    modeller = Modeller(top, pos)
+    modeller.delete([a for a in top.atoms() if a.index not in keep])
+    return modeller.topology, modeller.positions
+
+
+def _structure_key(top, pos, atom_indices: list[int]) -> str:
+    """Hash atom identities and coordinates (0.001 Å resolution) of *atom_indices*."""
+
+    atoms = list(top.atoms())
+    h = hashlib.sha1()
+    for i in atom_indices:
+        a = atoms[i]
+        h.update(f"{a.residue.chain.id}:{a.residue.id}:{a.residue.name}:{a.name};".encode())
+    xyz = np.array([[p.x, p.y, p.z] for p in (pos[i].value_in_unit(unit.angstrom) for i in atom_indices)])
+    h.update(np.rint(xyz * 1000).astype(np.int64).tobytes())
+    return h.hexdigest()
+
+
+def _topology_signature(top) -> str:
+    """Hash residue/atom names, elements and bonds – everything `createSystem` depends on."""
+
+    h = hashlib.sha1()
+    for a in top.atoms():
+        symbol = a.element.symbol if a.element is not None else "?"
+        h.update(f"{a.residue.name}:{a.name}:{symbol};".encode())
+    bonds = np.array([(b[0].index, b[1].index) for b in top.bonds()], dtype=np.int64)
+    h.update(bonds.tobytes())
+    return h.hexdigest()
+
+
+class _ComplexTimeout(Exception):
+    pass
+
+
+@contextmanager
+def _time_limit(seconds: float | None):
+    """SIGALRM 기반 per-complex 시간 제한 (Unix 메인 스레드에서만 동작)."""
+
+    if not seconds or not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _raise(signum, frame):
+        raise _ComplexTimeout(f"timed out after {seconds:.0f}s")
+
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+# -----------------------------------------------------------------------------
+# Process-pool worker state
+# -----------------------------------------------------------------------------
+
+_WORKER_CALC: BindingEnergyCalculator | None = None
+_WORKER_STARTED = None  # multiprocessing Queue – 작업 시작 알림 (iter_batch watchdog)
+
+
+def _init_worker(
+    smiles_list: list[str], threads: int, receptor_pdb: str | None, pocket_cutoff: float | None, started_q=None
+) -> None:
+    global _WORKER_CALC, _WORKER_STARTED
+
+    # CPU 플랫폼은 Context 생성 시 이 값을 기본 Threads 로 사용한다.
+    os.environ["OPENMM_CPU_THREADS"] = str(threads)
+    _WORKER_CALC = BindingEnergyCalculator(pocket_cutoff=pocket_cutoff)
+    _WORKER_CALC.register_ligands(smiles_list)
+    _WORKER_CALC._prime_receptor(receptor_pdb)
+    _WORKER_STARTED = started_q
+
+
+def _terminate_pool(executor: ProcessPoolExecutor, started_q) -> None:
+    # ProcessPoolExecutor 는 실행 중인 작업을 취소할 수 없으므로 워커를 직접 종료한다.
+    for proc in list((getattr(executor, "_processes", None) or {}).values()):
+        proc.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+    started_q.close()
+
+
+def _score_in_worker(seq: int, path: str, smiles: str, timeout: float | None) -> float:
+    assert _WORKER_CALC is not None, "worker not initialised"
+    if _WORKER_STARTED is not None:
+        _WORKER_STARTED.put(seq)
+    with _time_limit(timeout):
+        return _WORKER_CALC._score(path, smiles)
+
+
+_WORKER_TRAJ: _TrajectoryTerms | None = None
+
+
+def _init_trajectory_worker(topology_pdb: str, trajectory: str, smiles: str | None, threads: int) -> None:
+    global _WORKER_TRAJ
+
+    os.environ["OPENMM_CPU_THREADS"] = str(threads)
+    calc = BindingEnergyCalculator()
+    if smiles:
+        calc.register_ligands([smiles])
+    _WORKER_TRAJ = _TrajectoryTerms(calc._contexts, topology_pdb, trajectory)
+
+
+def _rescore_frames_in_worker(frame_ids: list[int]) -> list[tuple]:
+    assert _WORKER_TRAJ is not None, "worker not initialised"
+    return _WORKER_TRAJ.energies(frame_ids)
 
 
 def _fallback_energy() -> float:
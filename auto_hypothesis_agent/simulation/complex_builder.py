@@ -0,0 +1,137 @@
+"""ComplexBuilder – 수용체 + 도킹 포즈(PDBQT) 를 메모리에서 결합.
+
+Vina 출력 PDBQT 는 리간드만 담고 있고 비극성 수소·결합 차수가 없다. 여기서는
+
+1. 첫 MODEL 의 중원자 좌표로 RDKit Mol 을 만들고 (거리 기반 결합 추정),
+2. SMILES 템플릿으로 결합 차수를 복원한 뒤 좌표 기반으로 수소를 추가하고,
+3. residue 이름 ``LIG`` 로 OpenMM Topology 를 만들어
+4. 한 번만 읽어 둔 수용체 topology/좌표와 합친다.
+
+파일 시스템 I/O 는 수용체를 처음 읽을 때와 포즈 파일을 읽을 때뿐이며,
+임시 PDB 를 쓰고 다시 읽는 과정이 없다.
+"""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+from rdkit import Chem
+from rdkit.Chem import AllChem
+
+try:
+    from openmm import Vec3, unit
+    from openmm.app import Modeller, PDBFile, Topology, element
+
+    _OPENMM_OK = True
+except ImportError:  # pragma: no cover
+    _OPENMM_OK = False
+
+LIGAND_RESNAME = "LIG"
+
+# AutoDock atom type → element symbol (PDBQT 77-79 컬럼)
+_AD_TYPE_ELEMENT = {
+    "A": "C", "C": "C", "N": "N", "NA": "N", "NS": "N", "OA": "O", "OS": "O", "O": "O",
+    "SA": "S", "S": "S", "P": "P", "F": "F", "Cl": "Cl", "CL": "Cl", "Br": "Br", "BR": "Br",
+    "I": "I", "H": "H", "HD": "H", "HS": "H", "G0": "C", "G1": "C", "CG0": "C", "CG1": "C",
+}
+
+
+class ComplexBuilder:
+    """수용체를 한 번 로드해 두고 포즈마다 복합체 topology/좌표를 만든다."""
+
+    def __init__(self, receptor_pdb: str | None = None, receptor_topology=None, receptor_positions=None):
+        if not _OPENMM_OK:
+            raise ImportError("Install openmm: pip install openmm")
+        if receptor_pdb is not None:
+            pdb = PDBFile(str(receptor_pdb))
+            receptor_topology, receptor_positions = pdb.topology, pdb.positions
+        if receptor_topology is None or receptor_positions is None:
+            raise ValueError("receptor_pdb or receptor_topology/receptor_positions must be provided")
+
+        self.receptor_topology = receptor_topology
+        self.receptor_positions = receptor_positions
+        self.n_receptor_atoms = receptor_topology.getNumAtoms()
+
+    # ------------------------------------------------------------------
+    def build(self, pose_pdbqt: str, smiles: str):
+        """Return ``(topology, positions, receptor_atoms, ligand_atoms)`` for one docked pose."""
+
+        mol = pdbqt_to_mol(Path(pose_pdbqt).read_text(), smiles)
+        lig_top, lig_pos = mol_to_openmm(mol)
+
+        modeller = Modeller(self.receptor_topology, self.receptor_positions)
+        modeller.add(lig_top, lig_pos)
+        n_total = modeller.topology.getNumAtoms()
+        return (
+            modeller.topology,
+            modeller.positions,
+            list(range(self.n_receptor_atoms)),
+            list(range(self.n_receptor_atoms, n_total)),
+        )
+
+
+# -----------------------------------------------------------------------------
+# Conversion helpers
+# -----------------------------------------------------------------------------
+
+
+def pdbqt_to_mol(pdbqt_text: str, smiles: str) -> Chem.Mol:
+    """Build an all-hydrogen RDKit Mol with 3D coordinates from the first PDBQT model."""
+
+    lines = []
+    serial = 0
+    for line in pdbqt_text.splitlines():
+        if line.startswith("ENDMDL"):
+            break
+        if not line.startswith(("ATOM", "HETATM")):
+            continue
+        ad_type = line[77:79].strip() or line[12:16].strip()[:1]
+        symbol = _AD_TYPE_ELEMENT.get(ad_type, ad_type[:1])
+        if symbol == "H":
+            continue  # 수소는 결합 차수 복원 후 좌표 기반으로 다시 추가한다.
+        serial += 1
+        lines.append(
+            f"HETATM{serial:5d} {symbol + str(serial):<4s} {LIGAND_RESNAME} L   1    "
+            f"{line[30:54]}  1.00  0.00          {symbol:>2s}"
+        )
+
+    if not lines:
+        raise ValueError("No heavy atoms found in PDBQT pose")
+
+    pose = Chem.MolFromPDBBlock("\n".join(lines) + "\nEND\n", removeHs=True, proximityBonding=True)
+    if pose is None:
+        raise ValueError("RDKit could not parse PDBQT pose")
+
+    template = Chem.MolFromSmiles(smiles)
+    if template is None:
+        raise ValueError(f"Invalid SMILES: {smiles!r}")
+    mol = AllChem.AssignBondOrdersFromTemplate(template, pose)
+    return Chem.AddHs(mol, addCoords=True)
+
+
+def mol_to_openmm(mol: Chem.Mol, resname: str = LIGAND_RESNAME):
+    """Convert an RDKit Mol with a conformer into an OpenMM (Topology, positions)."""
+
+    top = Topology()
+    chain = top.addChain("L")
+    residue = top.addResidue(resname, chain)
+    counts: dict[str, int] = {}
+    atoms = []
+    for atom in mol.GetAtoms():
+        symbol = atom.GetSymbol()
+        counts[symbol] = counts.get(symbol, 0) + 1
+        atoms.append(top.addAtom(f"{symbol}{counts[symbol]}", element.get_by_symbol(symbol), residue))
+
+    for bond in mol.GetBonds():
+        top.addBond(atoms[bond.GetBeginAtomIdx()], atoms[bond.GetEndAtomIdx()])
+
+    conf = mol.GetConformer()
+    positions = [Vec3(p.x, p.y, p.z) for p in (conf.GetAtomPosition(i) for i in range(mol.GetNumAtoms()))] * unit.angstrom
+    return top, positions
+
+
+def read_pdb_block(pdb_block: str):
+    """Parse a PDB string with OpenMM without touching the filesystem."""
+
+    return PDBFile(io.StringIO(pdb_block))
@@ -0,0 +1,277 @@
+"""CompoundLibrary – Arrow/Parquet 기반 컬럼형 화합물 라이브러리.
+
+스크리닝 단계 간에 SDF 를 반복해서 읽고 쓰는 대신, 다음 컬럼을 한 테이블에 담아
+전달한다.
+
+* ``ligand_id`` / ``smiles`` / ``inchikey``
+* ``molblock``    – 3D 좌표를 포함한 MolBlock (SDF 입력 시; SMILES 입력이면 null)
+* ``fingerprint`` – 패킹된 Morgan 지문 (`FingerprintIndex` 와 동일한 비트 배치)
+* ADMET 디스크립터 (`with_admet()` 호출 시; `ADMETPredictor.ADMET_KEYS`)
+
+Arrow IPC(`.arrow`, `.feather`) 파일은 메모리 매핑으로 열리고, Parquet(`.parquet`) 는
+압축 저장에 적합하다. 두 형식 모두 컬럼 프로젝션을 지원하므로 각 단계는 필요한
+컬럼만 읽는다. SDF 가져오기/내보내기는 파이프라인 양 끝단을 위해 유지한다.
+
+사용 예시::
+
+    lib = CompoundLibrary.from_sdf("library.sdf").with_admet()
+    lib.write("outputs/library/kras.arrow")
+
+    ids = CompoundLibrary.open("outputs/library/kras.arrow", columns=["ligand_id", "smiles"])
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+from rdkit import Chem
+from rdkit.Chem import rdFingerprintGenerator
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+
+    _ARROW_OK = True
+except ImportError:  # pragma: no cover
+    _ARROW_OK = False
+
+LIBRARY_SUFFIXES = (".arrow", ".feather", ".parquet")
+FP_RADIUS = 2
+FP_BITS = 2048
+
+
+def is_library_path(path: str | Path) -> bool:
+    """Return True if *path* points to a columnar library rather than an SDF."""
+    return Path(path).suffix.lower() in LIBRARY_SUFFIXES
+
+
+class CompoundLibrary:
+    """`pyarrow.Table` 을 감싼 화합물 라이브러리."""
+
+    def __init__(self, table: "pa.Table"):
+        if not _ARROW_OK:
+            raise ImportError("Install pyarrow: pip install pyarrow")
+        self.table = table
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def columns(self) -> list[str]:
+        return self.table.column_names
+
+    # ------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_sdf(cls, sdf_path: str, with_fingerprints: bool = True) -> "CompoundLibrary":
+        """Build a library from *sdf_path*, keeping each record's MolBlock."""
+
+        records = []
+        for idx, mol in enumerate(Chem.SDMolSupplier(str(sdf_path), removeHs=False)):
+            if mol is None:
+                continue
+            name = mol.GetProp("_Name") if mol.HasProp("_Name") and mol.GetProp("_Name") else f"lig_{idx}"
+            records.append((name, mol, Chem.MolToMolBlock(mol)))
+        return cls._from_mols(records, with_fingerprints)
+
+    @classmethod
+    def from_records(
+        cls,
+        df: pd.DataFrame,
+        id_column: str = "ligand_id",
+        smiles_column: str = "smiles",
+        with_fingerprints: bool = True,
+    ) -> "CompoundLibrary":
+        """Build a library from a DataFrame of IDs and SMILES (e.g. KG query rows)."""
+
+        if smiles_column not in df.columns:
+            raise ValueError(f"SMILES column '{smiles_column}' not found in DataFrame.")
+
+        if id_column in df.columns:
+            ids = df[id_column].astype(str).tolist()
+        else:
+            ids = [f"lig_{i}" for i in range(len(df))]
+
+        records = []
+        for cid, smi in zip(ids, df[smiles_column]):
+            mol = Chem.MolFromSmiles(smi) if isinstance(smi, str) else None
+            if mol is None:
+                print(f"[CompoundLibrary] Invalid SMILES for {cid} – skipped.")
+                continue
+            records.append((cid, mol, None))
+        return cls._from_mols(records, with_fingerprints)
+
+    @classmethod
+    def _from_mols(cls, records: Sequence[tuple[str, "Chem.Mol", str | None]], with_fingerprints: bool) -> "CompoundLibrary":
+        if not _ARROW_OK:
+            raise ImportError("Install pyarrow: pip install pyarrow")
+
+        generator = rdFingerprintGenerator.GetMorganGenerator(radius=FP_RADIUS, fpSize=FP_BITS)
+        data: dict[str, list] = {"ligand_id": [], "smiles": [], "inchikey": [], "molblock": []}
+        fps: list[bytes] = []
+        for cid, mol, molblock in records:
+            # 지문은 SMILES 질의와 일치하도록 명시적 수소를 제거한 그래프에서 계산한다.
+            heavy = Chem.RemoveHs(mol)
+            data["ligand_id"].append(cid)
+            data["smiles"].append(Chem.MolToSmiles(heavy))
+            data["inchikey"].append(Chem.MolToInchiKey(mol) or None)
+            data["molblock"].append(molblock)
+            if with_fingerprints:
+                bits = generator.GetFingerprintAsNumPy(heavy).astype(np.uint8, copy=False)
+                fps.append(np.packbits(bits).tobytes())
+
+        arrays = {
+            "ligand_id": pa.array(data["ligand_id"], pa.string()),
+            "smiles": pa.array(data["smiles"], pa.string()),
+            "inchikey": pa.array(data["inchikey"], pa.string()),
+            "molblock": pa.array(data["molblock"], pa.large_string()),
+        }
+        if with_fingerprints:
+            arrays["fingerprint"] = pa.array(fps, pa.binary(FP_BITS // 8))
+        return cls(pa.table(arrays))
+
+    # ------------------------------------------------------------------
+    # Enrichment
+    # ------------------------------------------------------------------
+
+    def with_admet(self, predictor=None) -> "CompoundLibrary":
+        """Return a new library with ADMET descriptor columns appended."""
+
+        if predictor is None:
+            from .admet_predictor import ADMETPredictor
+
+            predictor = ADMETPredictor()
+
+        smiles = self.table.column("smiles").to_pylist()
+        preds = [predictor.predict(smi) for smi in smiles]
+        table = self.table
+        for key in predictor.ADMET_KEYS:
+            values = pa.array([p[key] for p in preds])
+            if key in table.column_names:
+                table = table.set_column(table.column_names.index(key), key, values)
+            else:
+                table = table.append_column(key, values)
+        return CompoundLibrary(table)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def write(self, path: str) -> str:
+        """Write the library; format is chosen from the suffix of *path*."""
+
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        if out.suffix.lower() == ".parquet":
+            pq.write_table(self.table, out, compression="zstd")
+        else:
+            with pa.OSFile(str(out), "wb") as sink, pa_ipc.new_file(sink, self.table.schema) as writer:
+                writer.write_table(self.table)
+        return str(out)
+
+    @staticmethod
+    def write_batches(batches: Iterable["CompoundLibrary"], path: str) -> tuple[str, int]:
+        """Write libraries arriving in batches to one file without concatenating them in memory.
+
+        스키마는 첫 배치에서 정해진다. 기록한 행 수를 함께 돌려주며, 배치가 하나도 없으면
+        파일을 만들지 않는다.
+        """
+
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        writer = sink = schema = None
+        n_rows = 0
+        try:
+            for batch in batches:
+                if not len(batch):
+                    continue
+                if schema is None:
+                    schema = batch.table.schema
+                    if out.suffix.lower() == ".parquet":
+                        writer = pq.ParquetWriter(out, schema, compression="zstd")
+                    else:
+                        sink = pa.OSFile(str(out), "wb")
+                        writer = pa_ipc.new_file(sink, schema)
+                writer.write_table(batch.table.cast(schema))
+                n_rows += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+            if sink is not None:
+                sink.close()
+        return str(out), n_rows
+
+    @classmethod
+    def open(cls, path: str, columns: Sequence[str] | None = None) -> "CompoundLibrary":
+        """Open a library written by :meth:`write`, loading only *columns*.
+
+        Arrow IPC 파일은 메모리 매핑되므로 선택한 컬럼만 실제로 페이지 인 된다.
+        """
+
+        if not _ARROW_OK:
+            raise ImportError("Install pyarrow: pip install pyarrow")
+
+        src = Path(path)
+        if src.suffix.lower() == ".parquet":
+            table = pq.read_table(src, columns=list(columns) if columns else None, memory_map=True)
+        else:
+            table = pa_ipc.open_file(pa.memory_map(str(src), "r")).read_all()
+            if columns:
+                table = table.select(list(columns))
+        return cls(table)
+
+    # ------------------------------------------------------------------
+    # Export / access
+    # ------------------------------------------------------------------
+
+    def to_frame(self, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        table = self.table.select(list(columns)) if columns else self.table
+        return table.to_pandas()
+
+    def iter_mols(self) -> Iterator[tuple[str, "Chem.Mol"]]:
+        """Yield (ligand_id, Mol) pairs, preferring stored MolBlocks over SMILES.
+
+        MolBlock 이 없는 행(SMILES 입력)은 수소 추가 후 ETKDG 로 3D 좌표를 생성한다.
+        """
+
+        from rdkit.Chem import AllChem
+
+        ids = self.table.column("ligand_id").to_pylist()
+        smiles = self.table.column("smiles").to_pylist()
+        molblocks = self.table.column("molblock").to_pylist() if "molblock" in self.table.column_names else [None] * len(ids)
+
+        for cid, smi, block in zip(ids, smiles, molblocks):
+            if block:
+                mol = Chem.MolFromMolBlock(block, removeHs=False)
+            else:
+                mol = Chem.MolFromSmiles(smi) if smi else None
+                if mol is not None:
+                    mol = Chem.AddHs(mol)
+                    if AllChem.EmbedMolecule(mol, AllChem.ETKDG()) != 0:
+                        mol = None
+            if mol is None:
+                print(f"[CompoundLibrary] Could not build molecule for {cid} – skipped.")
+                continue
+            mol.SetProp("_Name", str(cid))
+            yield cid, mol
+
+    def to_sdf(self, path: str) -> str:
+        """Export the library as SDF (ADMET columns are written as SD properties)."""
+
+        extra = [c for c in self.table.column_names if c not in ("ligand_id", "smiles", "molblock", "fingerprint")]
+        props = self.table.select(extra).to_pylist() if extra else [{}] * len(self)
+        prop_by_id = dict(zip(self.table.column("ligand_id").to_pylist(), props))
+
+        with Chem.SDWriter(str(path)) as writer:
+            for cid, mol in self.iter_mols():
+                for key, value in prop_by_id.get(cid, {}).items():
+                    if value is not None:
+                        mol.SetProp(key, str(value))
+                writer.write(mol)
+        return str(path)
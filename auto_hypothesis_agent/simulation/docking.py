@@ -28,6 +28,8 @@ from rdkit import Chem
 from rdkit.Chem import AllChem
 
 from auto_hypothesis_agent.config import AUTODOCK_VINA_BIN, FPOCKET_BIN
+from auto_hypothesis_agent.simulation.compound_library import CompoundLibrary, is_library_path
+from auto_hypothesis_agent.simulation.receptor_cache import ReceptorPrepCache
 
 _RNG = random.Random(42)
 
@@ -80,6 +82,8 @@ class DockingRunner:
     ) -> pd.DataFrame:
         """Dock all ligands in *library_sdf* against *receptor_pdbqt*.
 
+        *library_sdf* 는 SDF 또는 `CompoundLibrary` 파일(.arrow/.feather/.parquet)일 수 있다.
+
         Returns a DataFrame[compound_id, docking_score].
         """
 
@@ -100,30 +104,24 @@ class DockingRunner:
     # ------------------------------------------------------------------
 
     def _dock_with_vina(self, receptor: Path, sdf_file: Path, out_dir: Path) -> pd.DataFrame:
-        # Prepare ligand list
-        suppl = Chem.SDMolSupplier(str(sdf_file), removeHs=False)
         rows = []
-        for mol_idx, mol in enumerate(suppl):
-            if mol is None:
-                continue
-            cid = mol.GetProp(_get_title_prop(mol)) if mol.HasProp("_Name") else f"LIG_{mol_idx}"
+        # Auto grid if not set – 수용체마다 한 번만 계산한다(fpocket 결과는 ReceptorPrepCache 공유).
+        if self.grid_center is None or self.grid_size is None:
+            if self.pocket_mode == "fpocket":
+                center, size = _calc_grid_fpocket(receptor)
+                if center is None:
+                    center, size = _calc_grid_from_receptor(receptor)
+            else:
+                center, size = _calc_grid_from_receptor(receptor)
+        else:
+            center, size = self.grid_center, self.grid_size
 
+        for cid, mol in _iter_ligands(sdf_file):
             with tempfile.TemporaryDirectory() as tmp:
                 lig_pdbqt = Path(tmp) / f"{cid}.pdbqt"
                 out_pdbqt = out_dir / f"{Path(receptor).stem}_{cid}_out.pdbqt"
                 _mol_to_pdbqt(mol, lig_pdbqt)
 
-                # Auto grid if not set
-                if self.grid_center is None or self.grid_size is None:
-                    if self.pocket_mode == "fpocket":
-                        center, size = _calc_grid_fpocket(receptor)
-                        if center is None:
-                            center, size = _calc_grid_from_receptor(receptor)
-                    else:
-                        center, size = _calc_grid_from_receptor(receptor)
-                else:
-                    center, size = self.grid_center, self.grid_size
-
                 cmd = [
                     AUTODOCK_VINA_BIN,
                     "--receptor",
@@ -181,6 +179,23 @@ def _binary_exists(cmd_name: str | None) -> bool:
     return which(cmd_name) is not None
 
 
+def _iter_ligands(library: Path):
+    """Yield (compound_id, Mol) from an SDF or a columnar `CompoundLibrary` file."""
+
+    if is_library_path(library):
+        # 도킹에 필요한 컬럼만 프로젝션하여 읽는다.
+        lib = CompoundLibrary.open(str(library), columns=["ligand_id", "smiles", "molblock"])
+        yield from lib.iter_mols()
+        return
+
+    suppl = Chem.SDMolSupplier(str(library), removeHs=False)
+    for mol_idx, mol in enumerate(suppl):
+        if mol is None:
+            continue
+        cid = mol.GetProp(_get_title_prop(mol)) if mol.HasProp("_Name") else f"LIG_{mol_idx}"
+        yield cid, mol
+
+
 def _generate_random_scores(n: int, out_dir: Path, receptor_name: str) -> pd.DataFrame:
     records = []
     for _ in range(n):
@@ -269,35 +284,25 @@ def _get_title_prop(mol: Chem.Mol) -> str:
 
 
 def _calc_grid_fpocket(receptor_pdbqt: Path):
-    """Run fpocket to detect binding pocket center and approximate size.
+    """Detect the binding pocket center and approximate size with (cached) fpocket.
 
     Returns (center, size) or (None, None) if fpocket fails.
     """
 
-    if not _binary_exists(FPOCKET_BIN):
+    out_dir = ReceptorPrepCache().fpocket(str(receptor_pdbqt))
+    if out_dir is None:
+        return None, None
+
+    info_path = out_dir / "pockets" / "pocket0" / "pocket0_info.txt"
+    if not info_path.exists():
+        # new version maybe pockets/info.txt
+        info_path = out_dir / "pockets" / "info.txt"
+    if not info_path.exists():
         return None, None
 
-    # Convert PDBQT to PDB (fpocket requires PDB) – remove charges columns simply copy.
-    tmp_receptor = receptor_pdbqt.with_suffix(".pdb")
+    center = None
+    radius = None
     try:
-        # crude conversion: copy lines up to END, replace element columns same.
-        with open(receptor_pdbqt) as inp, open(tmp_receptor, "w") as out:
-            for ln in inp:
-                if ln.startswith("ATOM") or ln.startswith("HETATM") or ln.startswith("TER"):
-                    out.write(ln[:66] + "\n")
-        # Run fpocket
-        subprocess.run([FPOCKET_BIN, "-f", str(tmp_receptor)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
-
-        out_dir = tmp_receptor.stem + "_out"
-        info_path = Path(out_dir) / "pockets" / "pocket0" / "pocket0_info.txt"
-        if not info_path.exists():
-            # new version maybe pockets/info.txt
-            info_path = Path(out_dir) / "pockets" / "info.txt"
-        if not info_path.exists():
-            return None, None
-
-        center = None
-        radius = None
         with open(info_path) as f:
             for ln in f:
                 if "center" in ln.lower():
@@ -308,12 +313,10 @@ def _calc_grid_fpocket(receptor_pdbqt: Path):
                     m = re.search(r"([-+]?[0-9]*\.?[0-9]+)", ln)
                     if m:
                         radius = float(m.group(1))
-        if center and radius:
-            size = (radius * 2 + 4, radius * 2 + 4, radius * 2 + 4)
-            return center, size
-    except Exception:
+    except OSError:
         return None, None
-    finally:
-        tmp_receptor.unlink(missing_ok=True)
+    if center and radius:
+        size = (radius * 2 + 4, radius * 2 + 4, radius * 2 + 4)
+        return center, size
 
-    return None, None 
\ No newline at end of file
+    return None, None
@@ -1,5 +1,73 @@
+"""CompoundEvaluator – baseline 대비 Z-score · composite 점수 계산.
+
+• `CompoundEvaluator.compare` : baseline + 후보 전체를 한 번에 합쳐 계산 (배치 경로).
+• `CompoundEvaluator.pareto`  : composite 대신 다목적 Pareto 순위 (`pareto.pareto_rank`).
+• `StreamingCompoundEvaluator` : 후보를 배치 단위로 받아 열별 평균/분산을 Welford
+  방식으로 누적하고 composite / delta 점수를 배치마다 내보낸다. 메모리는 배치 크기에만
+  비례하며, `evaluate()` 의 2-pass 결과는 `compare()` 와 (부동소수 오차 내에서) 같다.
+
+baseline CSV 는 유전자별로 한 번만 읽어 프로세스 내에 캐시한다.
+
+사용 예시::
+
+    ev = StreamingCompoundEvaluator("KRAS")
+    for scored in ev.evaluate(lambda: pd.read_csv("cands.csv", chunksize=100_000)):
+        scored.to_csv("scored.csv", mode="a", header=False, index=False)
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
 import pandas as pd
 
+from auto_hypothesis_agent.simulation.pareto import pareto_rank
+
+SCORE_COLUMNS = ["docking_score", "delta_g", "sa_score"]
+BASELINE_CSV = os.path.abspath(os.path.join(os.path.dirname(__file__), "../resources/baseline_compounds.csv"))
+
+_BASELINE_CACHE: dict[tuple[str, float], pd.DataFrame] = {}
+
+
+def _load_baseline(gene: str) -> pd.DataFrame:
+    """Baseline rows for *gene*, cached per (gene, CSV mtime). Callers get a copy."""
+
+    mtime = os.path.getmtime(BASELINE_CSV) if os.path.exists(BASELINE_CSV) else 0.0
+    key = (gene, mtime)
+    cached = _BASELINE_CACHE.get(key)
+    if cached is None:
+        cached = _read_baseline(gene)
+        _BASELINE_CACHE[key] = cached
+    return cached.copy()
+
+
+def _read_baseline(gene: str) -> pd.DataFrame:
+    if os.path.exists(BASELINE_CSV):
+        df = pd.read_csv(BASELINE_CSV)
+        df = df[df["gene"].str.upper() == gene]
+        if not df.empty:
+            df = df.drop(columns=["gene"], errors="ignore")
+            df["set"] = "baseline"
+            return df.reset_index(drop=True)
+
+    # Fallback dummy (구조는 일반 키나아제 억제제 – 유사도 조회용 자리표시자)
+    data = {
+        "compound_id": ["REF1", "REF2", "REF3"],
+        "docking_score": [-8.5, -9.2, -7.8],
+        "delta_g": [-45.2, -50.1, -40.3],
+        "sa_score": [3.5, 4.0, 3.8],
+        "smiles": [
+            "Cc1ccc(NC(=O)c2ccc(CN3CCN(C)CC3)cc2)cc1Nc1nccc(-c2cccnc2)n1",
+            "COc1cc2ncnc(Nc3ccc(F)c(Cl)c3)c2cc1OCCCN1CCOCC1",
+            "COCCOc1cc2ncnc(Nc3cccc(c3)C#C)c2cc1OCCOC",
+        ],
+        "set": ["baseline"] * 3,
+    }
+    return pd.DataFrame(data)
+
+
 class CompoundEvaluator:
     """Baseline 대비 Z-score 및 composite 점수를 계산."""
 
@@ -14,30 +82,10 @@ class CompoundEvaluator:
 
         1) CSV `resources/baseline_compounds.csv` 에 gene 필드가 일치하는 행 사용.
         2) 없으면 더미 baseline 3개 반환.
+        유전자별로 한 번만 읽고 이후에는 캐시된 복사본을 돌려준다.
         """
 
-        import os
-
-        csv_path = os.path.join(os.path.dirname(__file__), "../resources/baseline_compounds.csv")
-        csv_path = os.path.abspath(csv_path)
-
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path)
-            df = df[df["gene"].str.upper() == self.gene]
-            if not df.empty:
-                df = df.drop(columns=["gene"], errors="ignore")
-                df["set"] = "baseline"
-                return df.reset_index(drop=True)
-
-        # Fallback dummy
-        data = {
-            "compound_id": ["REF1", "REF2", "REF3"],
-            "docking_score": [-8.5, -9.2, -7.8],
-            "delta_g": [-45.2, -50.1, -40.3],
-            "sa_score": [3.5, 4.0, 3.8],
-            "set": ["baseline"] * 3,
-        }
-        return pd.DataFrame(data)
+        return _load_baseline(self.gene)
 
     def compare(self, candidates: pd.DataFrame) -> pd.DataFrame:
         base = self.load_baseline()
@@ -45,12 +93,174 @@ class CompoundEvaluator:
         cand["set"] = "candidate"
         merged = pd.concat([base, cand], ignore_index=True)
 
-        for col in ["docking_score", "delta_g", "sa_score"]:
+        for col in SCORE_COLUMNS:
             merged[f"z_{col}"] = self._zscore(merged[col])
 
-        merged["composite"] = merged[[f"z_{c}" for c in ["docking_score", "delta_g", "sa_score"]]].mean(axis=1)
+        merged["composite"] = merged[[f"z_{c}" for c in SCORE_COLUMNS]].mean(axis=1)
 
         # ΔScore = candidate - baseline 평균
         baseline_mean = merged.loc[merged["set"] == "baseline", "composite"].mean()
         merged["delta_score"] = merged["composite"] - baseline_mean
-        return merged 
\ No newline at end of file
+        return merged
+
+    def pareto(self, candidates: pd.DataFrame, objectives: dict[str, str] | None = None) -> pd.DataFrame:
+        """Baseline + 후보를 다목적 Pareto 순위로 정렬 (`pareto.pareto_rank`).
+
+        composite 평균과 달리 목적 간 trade-off 를 유지한다. 반환 DataFrame 에는 ``set``,
+        ``pareto_rank``, ``crowding_distance`` 가 추가된다.
+        """
+
+        base = self.load_baseline()
+        cand = candidates.copy()
+        cand["set"] = "candidate"
+        return pareto_rank(pd.concat([base, cand], ignore_index=True), objectives)
+
+    def library_neighbours(self, index, k: int = 10, min_similarity: float | None = None) -> pd.DataFrame:
+        """Baseline 화합물별로 `FingerprintIndex` 라이브러리의 최근접 이웃을 조회.
+
+        baseline CSV 의 `smiles` 컬럼을 쓰며, SMILES 가 비어 있는 행은 건너뛴다.
+        Returns DataFrame[query_id, compound_id, similarity].
+        """
+
+        base = self.load_baseline()
+        if "smiles" not in base.columns:
+            raise ValueError(f"Baseline compounds for {self.gene} have no 'smiles' column.")
+        queries = base[base["smiles"].notna() & (base["smiles"].astype(str).str.strip() != "")]
+        if queries.empty:
+            raise ValueError(f"Baseline compounds for {self.gene} have no SMILES.")
+        skipped = sorted(set(base["compound_id"]) - set(queries["compound_id"]))
+        if skipped:
+            print(f"[CompoundEvaluator] no SMILES for baseline {', '.join(map(str, skipped))} – skipped.")
+        return index.search(queries, k=k, min_similarity=min_similarity, id_column="compound_id")
+
+
+# -----------------------------------------------------------------------------
+# Streaming evaluation
+# -----------------------------------------------------------------------------
+
+
+class RunningStats:
+    """Per-column count / mean / M2 accumulated batch-wise (Welford–Chan merge).
+
+    NaN 은 열별로 건너뛰므로 pandas ``mean()`` / ``std(ddof=0)`` 와 같은 값을 준다.
+    """
+
+    def __init__(self, columns: list[str]):
+        self.columns = list(columns)
+        self.count = np.zeros(len(columns))
+        self.mean = np.zeros(len(columns))
+        self.m2 = np.zeros(len(columns))
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold a ``(rows, columns)`` block into the running statistics."""
+
+        values = np.asarray(values, dtype=np.float64)
+        mask = ~np.isnan(values)
+        n_b = mask.sum(axis=0).astype(np.float64)
+        if not n_b.any():
+            return
+        safe = np.where(mask, values, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, safe.sum(axis=0) / n_b, 0.0)
+        m2_b = (np.where(mask, values - mean_b, 0.0) ** 2).sum(axis=0)
+
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.where(n > 0, self.mean + delta * n_b / n, 0.0)
+            self.m2 = np.where(n > 0, self.m2 + m2_b + delta**2 * self.count * n_b / n, 0.0)
+        self.count = n
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation (``ddof=0``), NaN for empty columns."""
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, np.sqrt(self.m2 / self.count), np.nan)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"count": self.count, "mean": self.mean, "std": self.std}, index=self.columns)
+
+
+class StreamingCompoundEvaluator:
+    """Batch-wise counterpart of `CompoundEvaluator.compare` with bounded memory.
+
+    baseline 은 생성 시 한 번 로드해 통계에 먼저 반영한다. 이후 후보 배치는
+    `update()` 로 통계에만 누적되고, `score()` 는 현재 통계로 후보 배치의 z-score,
+    composite, delta_score 를 계산한다.
+
+    • `evaluate(source)` – 2-pass(통계 누적 → 점수 산출). *source* 는 호출할 때마다
+      새 배치 이터레이터를 돌려주는 callable(예: ``lambda: pd.read_csv(..., chunksize=N)``).
+      결과는 배치 경로와 같다.
+    • `stream(batches)` – 1-pass. 각 배치를 누적한 직후 그 시점까지의 통계로 점수를
+      내보낸다(점진적 추정치; 마지막 배치에서 배치 경로와 같은 통계가 된다).
+    """
+
+    def __init__(self, gene: str, score_columns: list[str] | None = None):
+        self.gene = gene.upper()
+        self.score_columns = list(score_columns or SCORE_COLUMNS)
+        self._baseline = _load_baseline(self.gene)
+        self.stats = RunningStats(self.score_columns)
+        self.stats.update(self._values(self._baseline))
+        self.n_candidates = 0
+
+    # ------------------------------------------------------------------
+    def update(self, batch: pd.DataFrame) -> None:
+        """Accumulate a candidate batch into the running statistics."""
+
+        self.stats.update(self._values(batch))
+        self.n_candidates += len(batch)
+
+    def score(self, batch: pd.DataFrame, set_name: str = "candidate") -> pd.DataFrame:
+        """Score *batch* against the current statistics (same columns as ``compare``)."""
+
+        out = batch.copy()
+        out["set"] = set_name
+        z = self._z(out)
+        for i, col in enumerate(self.score_columns):
+            out[f"z_{col}"] = z[:, i]
+        out["composite"] = self._composite(z)
+        out["delta_score"] = out["composite"] - self.baseline_composite_mean()
+        return out
+
+    def baseline(self) -> pd.DataFrame:
+        """Baseline rows scored with the current statistics."""
+
+        return self.score(self._baseline.drop(columns=["set"]), set_name="baseline")
+
+    def baseline_composite_mean(self) -> float:
+        composite = self._composite(self._z(self._baseline))
+        return float(np.nanmean(composite)) if np.isfinite(composite).any() else float("nan")
+
+    # ------------------------------------------------------------------
+    def evaluate(self, source: Callable[[], Iterable[pd.DataFrame]]) -> Iterator[pd.DataFrame]:
+        """Two-pass streaming evaluation; yields scored candidate batches."""
+
+        for batch in source():
+            self.update(batch)
+        print(f"[StreamingCompoundEvaluator] {self.gene}: statistics over {self.n_candidates} candidates")
+        for batch in source():
+            yield self.score(batch)
+
+    def stream(self, batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """One-pass evaluation with running statistics; yields scored batches."""
+
+        for batch in batches:
+            self.update(batch)
+            yield self.score(batch)
+
+    # ------------------------------------------------------------------
+    def _values(self, frame: pd.DataFrame) -> np.ndarray:
+        return frame.reindex(columns=self.score_columns).to_numpy(dtype=np.float64)
+
+    def _z(self, frame: pd.DataFrame) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (self._values(frame) - self.stats.mean) / self.stats.std
+
+    @staticmethod
+    def _composite(z: np.ndarray) -> np.ndarray:
+        # pandas ``mean(axis=1)`` 과 같이 NaN 을 건너뛴 행 평균.
+        mask = ~np.isnan(z)
+        n = mask.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, np.where(mask, z, 0.0).sum(axis=1) / n, np.nan)
@@ -0,0 +1,299 @@
+"""FingerprintIndex – 비트 패킹 Morgan 지문 기반 Tanimoto 유사도 인덱스.
+
+Morgan(ECFP) 지문을 ``uint64`` 워드로 패킹하여 디스크(`.npy`)에 저장하고,
+``np.load(mmap_mode="r")`` 로 메모리 매핑한 채 청크 단위 벡터화 popcount 로
+k-NN / threshold 질의를 수행한다. 수백만 화합물 라이브러리도 Python 루프 없이
+1초 이내에 질의할 수 있다.
+
+디렉터리 구성::
+
+    <index_dir>/
+        fps.npy        # (N, n_bits/64) uint64, 패킹된 지문
+        popcount.npy   # (N,) int32, 지문별 on-bit 수
+        ids.txt        # 행 순서의 화합물 ID (줄 단위)
+        meta.json      # radius, n_bits
+
+사용 예시::
+
+    idx = FingerprintIndex.build(smiles_list, ids, "outputs/index/kras_lib")
+    idx = FingerprintIndex.open("outputs/index/kras_lib")
+    idx.knn("C=CC(=O)N1CCN(...)CC1", k=10)
+
+    # Baseline / KG 화합물 DataFrame(compound_id, smiles) 일괄 질의
+    idx.search(baseline_df, k=10)
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from rdkit import Chem
+from rdkit.Chem import rdFingerprintGenerator
+
+_CHUNK_ROWS = 1 << 18  # 262,144 rows × 32 words ≈ 64 MB per chunk (2048 bits)
+
+
+class FingerprintIndex:
+    """메모리 매핑된 패킹 지문 배열 위에서 동작하는 Tanimoto 검색 인덱스."""
+
+    def __init__(self, fps: np.ndarray, popcount: np.ndarray, ids: Sequence[str], radius: int = 2, n_bits: int = 2048):
+        if fps.ndim != 2 or fps.dtype != np.uint64:
+            raise ValueError("fps must be a 2-D uint64 array of packed fingerprints.")
+        if len(ids) != fps.shape[0] or popcount.shape[0] != fps.shape[0]:
+            raise ValueError("fps, popcount and ids must have the same number of rows.")
+
+        self.fps = fps
+        self.popcount = popcount
+        self.ids = list(ids)
+        self.radius = radius
+        self.n_bits = n_bits
+        self._generator = rdFingerprintGenerator.GetMorganGenerator(radius=radius, fpSize=n_bits)
+
+    def __len__(self) -> int:
+        return self.fps.shape[0]
+
+    # ------------------------------------------------------------------
+    # Construction / persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        smiles: Sequence[str],
+        ids: Sequence[str] | None,
+        path: str,
+        radius: int = 2,
+        n_bits: int = 2048,
+    ) -> "FingerprintIndex":
+        """Compute fingerprints for *smiles* and write the index to *path*.
+
+        파싱에 실패한 SMILES 는 영벡터로 저장되어 행 순서가 입력과 일치하며,
+        어떤 질의에 대해서도 유사도 0 을 갖는다.
+        """
+
+        if n_bits % 64:
+            raise ValueError("n_bits must be a multiple of 64.")
+        if ids is None:
+            ids = [f"LIG_{i}" for i in range(len(smiles))]
+        if len(ids) != len(smiles):
+            raise ValueError("ids and smiles must have the same length.")
+
+        out_dir = Path(path)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        n_words = n_bits // 64
+        fps = np.lib.format.open_memmap(out_dir / "fps.npy", mode="w+", dtype=np.uint64, shape=(len(smiles), n_words))
+        generator = rdFingerprintGenerator.GetMorganGenerator(radius=radius, fpSize=n_bits)
+
+        n_failed = 0
+        for row, smi in enumerate(smiles):
+            words = _pack_smiles(generator, smi)
+            if words is None:
+                n_failed += 1
+                continue
+            fps[row] = words
+
+        _finalize_index(out_dir, fps, ids, radius, n_bits)
+
+        if n_failed:
+            print(f"[FingerprintIndex] {n_failed} SMILES could not be parsed – stored as empty fingerprints.")
+
+        del fps
+        return cls.open(str(out_dir))
+
+    @classmethod
+    def from_library(cls, library_path: str, path: str) -> "FingerprintIndex":
+        """Write an index from the precomputed ``fingerprint`` column of a `CompoundLibrary`."""
+
+        from .compound_library import FP_BITS, FP_RADIUS, CompoundLibrary
+
+        table = CompoundLibrary.open(library_path, columns=["ligand_id", "fingerprint"]).table
+        out_dir = Path(path)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        n_words = FP_BITS // 64
+        fps = np.lib.format.open_memmap(out_dir / "fps.npy", mode="w+", dtype=np.uint64, shape=(table.num_rows, n_words))
+        row = 0
+        for chunk in table.column("fingerprint").chunks:
+            # fixed_size_binary 값 버퍼를 복사 없이 uint64 행렬로 해석한다.
+            width = FP_BITS // 8
+            buf = np.frombuffer(chunk.buffers()[1], dtype=np.uint8)
+            buf = buf[chunk.offset * width:(chunk.offset + len(chunk)) * width]
+            fps[row:row + len(chunk)] = buf.view(np.uint64).reshape(len(chunk), n_words)
+            row += len(chunk)
+
+        _finalize_index(out_dir, fps, table.column("ligand_id").to_pylist(), FP_RADIUS, FP_BITS)
+
+        del fps
+        return cls.open(str(out_dir))
+
+    @classmethod
+    def open(cls, path: str) -> "FingerprintIndex":
+        """Memory-map an index previously written by :meth:`build`."""
+
+        in_dir = Path(path)
+        meta = json.loads((in_dir / "meta.json").read_text(encoding="utf-8"))
+        fps = np.load(in_dir / "fps.npy", mmap_mode="r")
+        popcount = np.load(in_dir / "popcount.npy", mmap_mode="r")
+        ids = (in_dir / "ids.txt").read_text(encoding="utf-8").splitlines()
+        return cls(fps, popcount, ids, radius=meta["radius"], n_bits=meta["n_bits"])
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def similarity(self, smiles: str) -> np.ndarray:
+        """Return Tanimoto similarity of *smiles* against every indexed row."""
+
+        query = self._query_words(smiles)
+        sims = np.empty(len(self), dtype=np.float32)
+        for start, chunk in self._iter_chunks(query):
+            sims[start:start + chunk.shape[0]] = chunk
+        return sims
+
+    def knn(self, smiles: str, k: int = 10) -> pd.DataFrame:
+        """Return the *k* most similar compounds as DataFrame[compound_id, similarity]."""
+
+        query = self._query_words(smiles)
+        best_idx = np.empty(0, dtype=np.int64)
+        best_sim = np.empty(0, dtype=np.float32)
+
+        # 청크별 top-k 만 유지하여 전체 유사도 배열을 만들지 않는다.
+        for start, sims in self._iter_chunks(query):
+            top = _top_k(sims, k)
+            best_idx = np.concatenate([best_idx, top + start])
+            best_sim = np.concatenate([best_sim, sims[top]])
+            keep = _top_k(best_sim, k)
+            best_idx, best_sim = best_idx[keep], best_sim[keep]
+
+        order = np.argsort(-best_sim, kind="stable")
+        return self._frame(best_idx[order], best_sim[order])
+
+    def threshold(self, smiles: str, min_similarity: float = 0.7) -> pd.DataFrame:
+        """Return every compound with Tanimoto ≥ *min_similarity*, most similar first."""
+
+        query = self._query_words(smiles)
+        hit_idx, hit_sim = [], []
+        for start, sims in self._iter_chunks(query):
+            hits = np.flatnonzero(sims >= min_similarity)
+            hit_idx.append(hits + start)
+            hit_sim.append(sims[hits])
+
+        idx = np.concatenate(hit_idx) if hit_idx else np.empty(0, dtype=np.int64)
+        sim = np.concatenate(hit_sim) if hit_sim else np.empty(0, dtype=np.float32)
+        order = np.argsort(-sim, kind="stable")
+        return self._frame(idx[order], sim[order])
+
+    def search(
+        self,
+        queries: pd.DataFrame,
+        k: int = 10,
+        min_similarity: float | None = None,
+        id_column: str = "compound_id",
+        smiles_column: str = "smiles",
+    ) -> pd.DataFrame:
+        """Run k-NN (or threshold) queries for every row of *queries*.
+
+        Baseline(`CompoundEvaluator.load_baseline`) 이나 KG 조회 결과
+        (`ligand_id`, `smiles`) 를 그대로 전달할 수 있다.
+        Returns DataFrame[query_id, compound_id, similarity].
+        """
+
+        if smiles_column not in queries.columns:
+            raise ValueError(f"SMILES column '{smiles_column}' not found in DataFrame.")
+        if id_column not in queries.columns:
+            raise ValueError(f"ID column '{id_column}' not found in DataFrame.")
+
+        frames = []
+        for qid, smi in zip(queries[id_column], queries[smiles_column]):
+            if min_similarity is None:
+                hits = self.knn(smi, k=k)
+            else:
+                hits = self.threshold(smi, min_similarity=min_similarity)
+            hits.insert(0, "query_id", qid)
+            frames.append(hits)
+
+        if not frames:
+            return pd.DataFrame(columns=["query_id", "compound_id", "similarity"])
+        return pd.concat(frames, ignore_index=True)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _query_words(self, smiles: str) -> np.ndarray:
+        words = _pack_smiles(self._generator, smiles)
+        if words is None:
+            raise ValueError(f"Invalid query SMILES: {smiles!r}")
+        return words
+
+    def _iter_chunks(self, query: np.ndarray) -> Iterable[tuple[int, np.ndarray]]:
+        q_count = int(_popcount_rows(query[None, :])[0])
+        for start in range(0, len(self), _CHUNK_ROWS):
+            block = np.asarray(self.fps[start:start + _CHUNK_ROWS])
+            common = _popcount_rows(block & query)
+            union = np.asarray(self.popcount[start:start + _CHUNK_ROWS]) + q_count - common
+            sims = np.divide(common, union, out=np.zeros(common.shape, dtype=np.float32), where=union > 0)
+            yield start, sims.astype(np.float32, copy=False)
+
+    def _frame(self, idx: np.ndarray, sim: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame({
+            "compound_id": [self.ids[i] for i in idx],
+            "similarity": np.round(sim.astype(float), 4),
+        })
+
+
+# -----------------------------------------------------------------------------
+# Stand-alone helpers
+# -----------------------------------------------------------------------------
+
+
+def _finalize_index(out_dir: Path, fps: np.ndarray, ids: Sequence[str], radius: int, n_bits: int) -> None:
+    """Flush *fps* and write the popcount, ID and metadata files next to it."""
+
+    fps.flush()
+    popcount = np.lib.format.open_memmap(out_dir / "popcount.npy", mode="w+", dtype=np.int32, shape=(fps.shape[0],))
+    for start in range(0, fps.shape[0], _CHUNK_ROWS):
+        popcount[start:start + _CHUNK_ROWS] = _popcount_rows(fps[start:start + _CHUNK_ROWS])
+    popcount.flush()
+
+    (out_dir / "ids.txt").write_text("\n".join(str(i) for i in ids) + "\n", encoding="utf-8")
+    (out_dir / "meta.json").write_text(json.dumps({"radius": radius, "n_bits": n_bits}), encoding="utf-8")
+
+
+def _pack_smiles(generator, smiles: str) -> np.ndarray | None:
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        return None
+    bits = generator.GetFingerprintAsNumPy(mol).astype(np.uint8, copy=False)
+    return np.packbits(bits).view(np.uint64)
+
+
+def _top_k(values: np.ndarray, k: int) -> np.ndarray:
+    if values.shape[0] <= k:
+        return np.arange(values.shape[0])
+    return np.argpartition(-values, k - 1)[:k]
+
+
+if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+
+    def _popcount_rows(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+
+else:
+    _M1 = np.uint64(0x5555555555555555)
+    _M2 = np.uint64(0x3333333333333333)
+    _M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+    _H01 = np.uint64(0x0101010101010101)
+
+    def _popcount_rows(words: np.ndarray) -> np.ndarray:
+        # SWAR popcount (Hacker's Delight) – 워드 단위 벡터 연산만 사용.
+        x = words - ((words >> np.uint64(1)) & _M1)
+        x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+        x = (x + (x >> np.uint64(4))) & _M4
+        x = (x * _H01) >> np.uint64(56)
+        return x.sum(axis=1, dtype=np.int32)
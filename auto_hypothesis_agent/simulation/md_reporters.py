@@ -0,0 +1,206 @@
+"""MD reporters – MDRunner 용 OpenMM 커스텀 리포터.
+
+`LigandRMSDReporter` 는 *interval* 스텝마다
+
+1. 좌표를 압축 궤적(XTC; 지원하지 않는 OpenMM 에서는 DCD) 파일에 바로 기록하고,
+2. 수용체 backbone 으로 정렬한 리간드 중원자 RMSD 와 초기 포켓 접촉 유지 비율을
+   계산해 시계열에 추가한다 (`trajectory_analysis.ligand_rmsd`, `contact_fraction`).
+3. `TriagePolicy` 가 주어지면 매 샘플마다 해리/안정 여부를 판정해 `stop_reason` 을 남긴다
+   (MDRunner 는 이를 보고 남은 스텝을 건너뛴다).
+
+프레임 좌표는 기록 후 버리므로 메모리 사용량은 시계열(프레임당 float 몇 개)뿐이다.
+궤적은 `BindingEnergyCalculator.calculate_trajectory` 로 다시 읽을 수 있다.
+
+체크포인트 재개 시에는 `checkpoint_state()` 로 저장해 둔 파일 크기까지 궤적을 잘라
+(`truncate_trajectory`) 체크포인트 이후에 기록된 중복 프레임을 제거한 뒤 이어 쓴다.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from auto_hypothesis_agent.simulation.trajectory_analysis import (
+    AtomSelection,
+    contact_fraction,
+    ligand_rmsd,
+    native_contacts,
+    receptor_heavy_atoms,
+)
+
+try:
+    from openmm import unit
+    from openmm.app import DCDFile
+
+    try:
+        from openmm.app.xtcfile import XTCFile
+    except ImportError:  # OpenMM < 8.1
+        XTCFile = None  # type: ignore
+
+    _OPENMM_OK = True
+except ImportError:  # pragma: no cover
+    _OPENMM_OK = False
+
+
+class TriagePolicy:
+    """Early-termination rule for MD triage runs.
+
+    • 해리(``dissociated``): RMSD > *unbound_rmsd* Å 또는 접촉 유지 비율 <
+      *min_contact_fraction* 이 *patience* 샘플 연속.
+    • 안정(``stable``): *min_samples* 이후, 최근 *window* 샘플의 RMSD 가 모두
+      *stable_rmsd* Å 이하이고 표준편차가 *stable_std* Å 이하이며 접촉 유지 비율이
+      *stable_contact_fraction* 이상.
+    """
+
+    def __init__(
+        self,
+        unbound_rmsd: float = 5.0,
+        min_contact_fraction: float = 0.25,
+        patience: int = 2,
+        stable_rmsd: float = 2.0,
+        stable_std: float = 0.3,
+        stable_contact_fraction: float = 0.6,
+        window: int = 10,
+        min_samples: int = 20,
+    ):
+        self.unbound_rmsd = unbound_rmsd
+        self.min_contact_fraction = min_contact_fraction
+        self.patience = patience
+        self.stable_rmsd = stable_rmsd
+        self.stable_std = stable_std
+        self.stable_contact_fraction = stable_contact_fraction
+        self.window = window
+        self.min_samples = min_samples
+
+    def check(self, rmsd: list[float], contacts: list[float]) -> str | None:
+        """Return ``"dissociated"``, ``"stable"`` or None for the series so far."""
+
+        if len(rmsd) >= self.patience:
+            recent_rmsd = np.asarray(rmsd[-self.patience:])
+            recent_contacts = np.asarray(contacts[-self.patience:])
+            # 접촉이 정의되지 않은(NaN) 경우 비교 결과는 False 이므로 RMSD 기준만 남는다.
+            if np.all((recent_rmsd > self.unbound_rmsd) | (recent_contacts < self.min_contact_fraction)):
+                return "dissociated"
+
+        if len(rmsd) >= max(self.min_samples, self.window):
+            recent_rmsd = np.asarray(rmsd[-self.window:])
+            recent_contacts = np.asarray(contacts[-self.window:])
+            contacts_ok = np.all(np.isnan(recent_contacts) | (recent_contacts >= self.stable_contact_fraction))
+            if recent_rmsd.max() <= self.stable_rmsd and recent_rmsd.std() <= self.stable_std and contacts_ok:
+                return "stable"
+        return None
+
+
+class LigandRMSDReporter:
+    """Stream frames to a trajectory file and record ligand RMSD per frame."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        interval: int,
+        topology,
+        reference_positions,
+        selection: AtomSelection,
+        dt,
+        append: bool = False,
+        triage: TriagePolicy | None = None,
+        contact_cutoff: float = 4.5,
+    ):
+        """*append* 이면 기존 궤적 파일에 이어 쓴다 (`restore()` 로 시계열도 복원)."""
+        if not _OPENMM_OK:
+            raise ImportError("Install openmm: pip install openmm")
+
+        self.interval = interval
+        self.selection = selection
+        self.triage = triage
+        self.contact_cutoff = contact_cutoff
+        self._ref = np.asarray(reference_positions.value_in_unit(unit.angstrom), dtype=np.float64)
+        self._contacts = native_contacts(self._ref, selection.ligand, receptor_heavy_atoms(topology), contact_cutoff)
+
+        self._periodic = topology.getPeriodicBoxVectors() is not None
+        self.path = Path(path)
+        if XTCFile is None or self.path.suffix != ".xtc":
+            self.path = self.path.with_suffix(".dcd")
+        append = append and self.path.exists()
+        if not append:
+            self.path.unlink(missing_ok=True)
+
+        if self.path.suffix == ".xtc":
+            self._traj = XTCFile(str(self.path), topology, dt, interval=interval, append=append)
+            self._dcd_handle = None
+        else:
+            self._dcd_handle = open(self.path, "r+b" if append else "wb")
+            self._traj = DCDFile(self._dcd_handle, topology, dt, interval=interval, append=append)
+
+        self.steps: list[int] = []
+        self.rmsd: list[float] = []
+        self.contacts: list[float] = []
+        self.stop_reason: str | None = None
+
+    # OpenMM reporter interface ------------------------------------------------
+    def describeNextReport(self, simulation):
+        steps = self.interval - simulation.currentStep % self.interval
+        # (steps, positions, velocities, forces, energy, enforcePeriodicBox)
+        return (steps, True, False, False, False, False)
+
+    def report(self, simulation, state) -> None:
+        positions = state.getPositions(asNumpy=True)
+        box = state.getPeriodicBoxVectors() if self._periodic else None
+        self._traj.writeModel(positions, periodicBoxVectors=box)
+
+        xyz = positions.value_in_unit(unit.angstrom)
+        self.steps.append(simulation.currentStep)
+        self.rmsd.append(float(ligand_rmsd(xyz, self._ref, self.selection)[0]))
+        self.contacts.append(float(contact_fraction(xyz, self._contacts, self.contact_cutoff)[0]))
+        if self.triage is not None and self.stop_reason is None:
+            self.stop_reason = self.triage.check(self.rmsd, self.contacts)
+
+    # -------------------------------------------------------------------------
+    def close(self) -> None:
+        if self._dcd_handle is not None:
+            self._dcd_handle.close()
+            self._dcd_handle = None
+
+    def checkpoint_state(self) -> dict:
+        """Frame count and trajectory size to record alongside an OpenMM checkpoint."""
+
+        if self._dcd_handle is not None:
+            self._dcd_handle.flush()
+        return {"n_frames": len(self.steps), "traj_bytes": self.path.stat().st_size if self.path.exists() else 0}
+
+    def restore(self, steps: list[int], rmsd: list[float], contacts: list[float] | None = None) -> None:
+        self.steps = list(steps)
+        self.rmsd = list(rmsd)
+        self.contacts = list(contacts) if contacts is not None else [float("nan")] * len(self.rmsd)
+
+    def series(self, dt_ps: float) -> pd.DataFrame:
+        """Time series as ``DataFrame[step, time_ps, lig_rmsd, contact_fraction]``."""
+
+        steps = np.asarray(self.steps, dtype=np.int64)
+        return pd.DataFrame({
+            "step": steps,
+            "time_ps": steps * dt_ps,
+            "lig_rmsd": np.round(self.rmsd, 3),
+            "contact_fraction": np.round(self.contacts, 3),
+        })
+
+
+def truncate_trajectory(path: str | Path, traj_bytes: int, n_frames: int) -> None:
+    """Drop frames written after a checkpoint so the file can be appended to.
+
+    DCD 는 헤더의 프레임 수(NSET, offset 8)도 함께 맞춘다.
+    """
+
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "r+b") as f:
+        f.truncate(traj_bytes)
+        if path.suffix == ".dcd" and traj_bytes >= 12:
+            f.seek(8, os.SEEK_SET)
+            f.write(struct.pack("<i", n_frames))
+
@@ -2,19 +2,40 @@
 
 • OpenMM, OpenMMForceFields, GPU(CUDA) 또는 CPU에서 실행 가능.
 • 환경에 필요한 툴이 없으면 과거 더미 RMSD 로직으로 폴백.
+• `run_many()` 로 여러 복합체 × replica 를 프로세스 병렬 실행 (워커별 CPU Threads 할당).
+• *checkpoint_interval* 스텝마다 체크포인트를 남기며, 같은 *out_dir* 로 다시 호출하면
+  마지막 체크포인트에서 이어 간다. *max_wall_time* 으로 실행 시간 예산을 줄 수 있다.
+• ``hmr=True`` 는 수소 질량 재분배(HMR, 3 amu) + H-결합 제약 + LangevinMiddle 적분기로
+  4 fs 스텝을 사용한다. 스텝 수는 선택한 timestep 에서 계산되며, 사용 전
+  `validate_timestep()` 으로 짧은 안정성 검증을 할 수 있다.
+• *triage* 모드는 리간드 RMSD/포켓 접촉을 매 샘플 확인해 해리·안정이 분명해지면
+  조기 종료하고 ``stop_reason`` 에 이유를 남긴다 (`md_reporters.TriagePolicy`).
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import math
+import multiprocessing
 import os
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import pandas as pd
 
+from auto_hypothesis_agent.config import SMALL_MOLECULE_FORCEFIELD
+from auto_hypothesis_agent.simulation import binding_energy
+from auto_hypothesis_agent.simulation.minimization_triage import MinimizationTriage
+from auto_hypothesis_agent.simulation.md_reporters import LigandRMSDReporter, TriagePolicy, truncate_trajectory
+from auto_hypothesis_agent.simulation.param_cache import ligand_param_cache
+from auto_hypothesis_agent.simulation.trajectory_analysis import ligand_rmsd, select_atoms
+
 try:
-    from openmm import LangevinIntegrator, Platform, unit
-    from openmm.app import (PDBFile, Simulation, Topology, ForceField)
+    from openmm import LangevinIntegrator, LangevinMiddleIntegrator, Platform, unit
+    from openmm.app import (PDBFile, Simulation, Topology, ForceField, HBonds, NoCutoff)
     try:
         from openmmforcefields.generators import SystemGenerator  # type: ignore
     except ImportError:
@@ -26,9 +47,31 @@ except ImportError:
     _OPENMM_AVAILABLE = False
 
 
+# Fast-dynamics 모드 기본값 (HMR)
+HMR_HYDROGEN_MASS = 3.0  # amu
+HMR_TIMESTEP_FS = 4.0
+DEFAULT_TIMESTEP_FS = 2.0
+_MOLAR_GAS_CONSTANT_KJ = 0.00831446261815324  # kJ/(mol·K)
+
+
 class MDRunner:
-    def __init__(self, temperature: float = 300.0, platform: str | None = None):
+    def __init__(
+        self,
+        temperature: float = 300.0,
+        platform: str | None = None,
+        threads: int | None = None,
+        hmr: bool = False,
+        timestep_fs: float | None = None,
+    ):
+        """*threads* 는 CPU 플랫폼의 OpenMM ``Threads`` 속성 (None 이면 OpenMM 기본값 = 전체 코어).
+
+        *hmr* 이면 수소 질량을 3 amu 로 재분배하고 기본 timestep 을 4 fs 로 올린다.
+        *timestep_fs* 로 timestep 을 직접 지정할 수 있다 (HMR 없이 2 fs 초과는 권장하지 않음).
+        """
         self.temperature = temperature  # Kelvin
+        self.threads = threads
+        self.hmr = hmr
+        self.timestep_fs = timestep_fs or (HMR_TIMESTEP_FS if hmr else DEFAULT_TIMESTEP_FS)
         if platform:
             self.platform_name = platform
         elif _OPENMM_AVAILABLE:
@@ -42,11 +85,35 @@ class MDRunner:
             self.platform_name = None
 
     # ------------------------------------------------------------------
-    def run(self, complex_pdb: str, ns: int = 1, out_dir: str = "outputs/md") -> pd.DataFrame:  # noqa: D401
+    def run(
+        self,
+        complex_pdb: str,
+        ns: int = 1,
+        out_dir: str = "outputs/md",
+        report_interval: int = 1000,
+        seed: int | None = None,
+        checkpoint_interval: int = 25000,
+        max_wall_time: float | None = None,
+        resume: bool = True,
+        triage: bool | TriagePolicy = False,
+    ) -> pd.DataFrame:  # noqa: D401
         """Run MD and return DataFrame with `lig_rmsd`.
 
-        *complex_pdb* : Path to protein-ligand PDB (all atoms, single model)
-        *ns*          : nanoseconds to simulate (default 1 ns)
+        *complex_pdb*     : Path to protein-ligand PDB (all atoms, single model)
+        *ns*              : nanoseconds to simulate (default 1 ns)
+        *report_interval* : steps between trajectory frames / RMSD samples (1000 steps = 2 ps @ 2 fs)
+        *seed*            : Langevin/initial-velocity random seed (replica 구분용, None 이면 무작위)
+        *checkpoint_interval* : steps between checkpoints (25000 steps = 50 ps @ 2 fs)
+        *max_wall_time*   : 초 단위 실행 시간 예산. 다음 청크가 예산을 넘길 것 같으면
+                            체크포인트 상태로 멈추고 ``completed=False`` 를 반환한다.
+        *resume*          : *out_dir* 에 체크포인트가 있으면 이어서 실행 (False 면 새로 시작)
+        *triage*          : True 또는 `TriagePolicy` 이면 해리/안정 판정 시 조기 종료
+
+        반환 컬럼: ``complex_file`` (최종 스냅샷), ``lig_rmsd`` (마지막 프레임),
+        ``trajectory`` (XTC/DCD 경로), ``lig_rmsd_series`` (프레임별 RMSD 리스트,
+        ``<stem>_lig_rmsd.csv`` 에도 time_ps·contact_fraction 과 함께 저장), ``steps_done``,
+        ``completed`` (재개할 필요가 없으면 True), ``stop_reason``
+        (``"completed"``/``"dissociated"``/``"stable"``/``"wall_time"``).
         """
 
         os.makedirs(out_dir, exist_ok=True)
@@ -54,63 +121,339 @@ class MDRunner:
         if not _OPENMM_AVAILABLE:
             return _dummy_md(complex_pdb)
 
+        policy = TriagePolicy() if triage is True else (triage or None)
         try:
-            rmsd, final_pdb = self._simulate_openmm(Path(complex_pdb), ns, Path(out_dir))
+            result = self._simulate_openmm(
+                Path(complex_pdb), ns, Path(out_dir), report_interval, seed, checkpoint_interval, max_wall_time, resume, policy
+            )
         except Exception as exc:  # pylint: disable=broad-except
             print(f"[MDRunner] OpenMM simulation failed – fallback dummy. Reason: {exc}")
             return _dummy_md(complex_pdb)
 
-        return pd.DataFrame([{"complex_file": str(final_pdb), "lig_rmsd": round(rmsd, 2)}])
+        return pd.DataFrame([result])
+
+    # ------------------------------------------------------------------
+    def run_many(
+        self,
+        complex_pdbs: list[str] | dict[str, str] | pd.DataFrame,
+        replicas: int = 1,
+        ns: int = 1,
+        out_dir: str = "outputs/md",
+        report_interval: int = 1000,
+        n_workers: int | None = None,
+        threads_per_worker: int | None = None,
+        checkpoint_interval: int = 25000,
+        max_wall_time: float | None = None,
+        triage: bool | TriagePolicy = False,
+        prefilter: bool | MinimizationTriage = False,
+    ) -> pd.DataFrame:
+        """Run *replicas* independent simulations of every complex across processes.
+
+        • CPU 플랫폼: 워커 수 × ``threads_per_worker`` 가 전체 코어 수를 넘지 않도록
+          스레드 예산을 나눈다. 작업 수가 코어보다 적으면 워커당 스레드를 늘린다.
+        • 작업은 예상 비용(원자 수 × ns) 내림차순으로 제출해 긴 작업이 마지막에
+          홀로 남아 코어가 노는 시간을 줄인다.
+        • replica *k* 는 seed *k + 1* 로 실행되며 ``<out_dir>/<stem>/rep<k>`` 에 저장된다.
+          같은 *out_dir* 로 다시 호출하면 각 replica 는 자신의 체크포인트에서 재개한다.
+        • *complex_pdbs* 는 경로 리스트, ``{pdb: smiles}`` 매핑, 또는 ``complex_file``
+          (선택: ``smiles``, ``ligand_id``) 열을 가진 DataFrame 이다. SMILES 는 prefilter
+          최소화의 리간드 파라미터화에 쓰인다.
+        • *prefilter* 가 True 또는 `MinimizationTriage` 이면 먼저 모든 복합체를 암시적 용매에서
+          병렬 최소화해 포즈를 유지한 것만 MD 에 보낸다 (``<out_dir>/min_triage.csv``).
+          탈락한 복합체는 ``stop_reasons={"minimization_rejected": ...}`` 로 표기된다.
+          OpenMM 또는 openmmforcefields/openff 가 없으면 prefilter 는 건너뛴다.
+
+        반환: 복합체별 ``n_replicas``, ``lig_rmsd_mean/std/min/max``, ``n_completed``,
+        ``steps_done_mean``, ``stop_reasons`` (triage 종료 사유별 개수), ``trajectories``.
+        replica 단위 결과는 ``<out_dir>/md_replicas.csv`` 에 저장한다.
+        """
+
+        triage_input = _triage_input(complex_pdbs)
+        complex_pdbs = triage_input["complex_file"].tolist()
+
+        rejected: list[str] = []
+        if prefilter and not binding_energy._OPENMM_OK:
+            # openmm 만 있고 openmmforcefields/openff 가 없어도 최소화(리간드 파라미터화)는 불가능하다.
+            print("[MDRunner] OpenMM/openmmforcefields unavailable – skipping minimization prefilter.")
+        elif prefilter:
+            prefilter = prefilter if isinstance(prefilter, MinimizationTriage) else MinimizationTriage(
+                n_workers=n_workers or os.cpu_count() or 1
+            )
+            table = prefilter.run(triage_input)
+            os.makedirs(out_dir, exist_ok=True)
+            table.to_csv(Path(out_dir) / "min_triage.csv", index=False)
+            survivors = set(prefilter.survivors(table))
+            rejected = [str(p) for p in complex_pdbs if str(p) not in survivors]
+            complex_pdbs = [p for p in complex_pdbs if str(p) in survivors]
+
+        jobs = [(str(pdb), k) for pdb in complex_pdbs for k in range(replicas)]
+        if not jobs and not rejected:
+            return pd.DataFrame()
+        jobs.sort(key=lambda job: _estimated_cost(job[0]) * ns, reverse=True)
+
+        n_workers, threads = _thread_budget(len(jobs), self.platform_name, n_workers, threads_per_worker)
+        print(f"[MDRunner] {len(jobs)} runs on {n_workers} workers × {threads} threads")
+
+        rows = []
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_md_worker,
+            initargs=(threads,),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _run_replica,
+                    self._worker_kwargs(threads),
+                    pdb,
+                    ns,
+                    str(Path(out_dir) / Path(pdb).stem / f"rep{k}"),
+                    report_interval,
+                    k + 1,
+                    checkpoint_interval,
+                    max_wall_time,
+                    triage,
+                ): (pdb, k)
+                for pdb, k in jobs
+            }
+            for fut in as_completed(futures):
+                pdb, k = futures[fut]
+                try:
+                    row = fut.result().iloc[0].to_dict()
+                except Exception as exc:  # pylint: disable=broad-except
+                    print(f"[MDRunner] replica {k} of {Path(pdb).name} failed – fallback dummy. Reason: {exc}")
+                    row = _dummy_md(pdb).iloc[0].to_dict()
+                rows.append({"input_pdb": pdb, "replica": k, **row})
+
+        for pdb in rejected:
+            rows.extend(
+                {"input_pdb": pdb, "replica": k, "complex_file": pdb, "lig_rmsd": float("nan"), "trajectory": None,
+                 "lig_rmsd_series": [], "steps_done": 0, "completed": True, "stop_reason": "minimization_rejected"}
+                for k in range(replicas)
+            )
+
+        replica_df = pd.DataFrame(rows).sort_values(["input_pdb", "replica"], ignore_index=True)
+        os.makedirs(out_dir, exist_ok=True)
+        replica_df.drop(columns=["lig_rmsd_series"]).to_csv(Path(out_dir) / "md_replicas.csv", index=False)
+        return _aggregate_replicas(replica_df)
+
+    def _worker_kwargs(self, threads: int) -> dict:
+        return {
+            "temperature": self.temperature,
+            "platform": self.platform_name,
+            "threads": threads,
+            "hmr": self.hmr,
+            "timestep_fs": self.timestep_fs,
+        }
+
+    # ------------------------------------------------------------------
+    def validate_timestep(self, complex_pdb: str, ps: float = 10.0, tolerance: float = 0.1) -> dict:
+        """Short stability check of this runner's timestep/HMR settings on *complex_pdb*.
+
+        최소화 후 *ps* 피코초를 진행하며 1 ps 마다 위치·에너지의 유한성과 순간 온도를
+        확인한다. 평균 온도가 목표의 ±*tolerance* 이내이고 NaN 이 없으면 ``stable=True``.
+        ``ns_per_day`` 는 같은 조건에서 측정한 처리량(현재 설정)이다.
+        """
+
+        if not _OPENMM_AVAILABLE:
+            raise ImportError("Install openmm: pip install openmm")
+
+        pdb = PDBFile(str(complex_pdb))
+        simulation, dt = self._create_simulation(pdb.topology, seed=1)
+        simulation.context.setPositions(pdb.positions)
+        simulation.minimizeEnergy()
+        simulation.context.setVelocitiesToTemperature(self.temperature * unit.kelvin, 1)
+
+        system = simulation.system
+        n_dof = 3 * system.getNumParticles() - system.getNumConstraints()
+        n_dof -= 3 if any(type(f).__name__ == "CMMotionRemover" for f in system.getForces()) else 0
+
+        steps_per_ps = max(1, int(round(1000.0 / self.timestep_fs)))
+        n_blocks = max(1, int(round(ps)))
+        temperatures: list[float] = []
+        reason = None
+        started = time.monotonic()
+        for _ in range(n_blocks):
+            try:
+                simulation.step(steps_per_ps)
+            except Exception as exc:  # pylint: disable=broad-except
+                reason = f"integration failed: {exc}"
+                break
+            state = simulation.context.getState(getEnergy=True)
+            energy = state.getPotentialEnergy().value_in_unit(unit.kilojoules_per_mole)
+            kinetic = state.getKineticEnergy().value_in_unit(unit.kilojoules_per_mole)
+            if not (math.isfinite(energy) and math.isfinite(kinetic)):
+                reason = "non-finite energy"
+                break
+            temperatures.append(2.0 * kinetic / (n_dof * _MOLAR_GAS_CONSTANT_KJ))
+        elapsed = time.monotonic() - started
+
+        simulated_ns = simulation.currentStep * self.timestep_fs * 1e-6
+        t_mean = float(sum(temperatures) / len(temperatures)) if temperatures else float("nan")
+        if reason is None and abs(t_mean - self.temperature) > tolerance * self.temperature:
+            reason = f"mean temperature {t_mean:.0f} K outside ±{tolerance:.0%} of {self.temperature:.0f} K"
+
+        result = {
+            "timestep_fs": self.timestep_fs,
+            "hmr": self.hmr,
+            "stable": reason is None,
+            "reason": reason or "ok",
+            "temperature_mean": round(t_mean, 1),
+            "ns_per_day": round(simulated_ns / elapsed * 86400.0, 2) if elapsed > 0 else float("nan"),
+        }
+        print(f"[MDRunner] timestep validation: {result}")
+        return result
 
     # ------------------------------------------------------------------
     # Internal – OpenMM implementation
     # ------------------------------------------------------------------
 
-    def _simulate_openmm(self, pdb_path: Path, ns: int, out_dir: Path) -> tuple[float, Path]:
-        pdb = PDBFile(str(pdb_path))
+    def _create_simulation(self, topology, seed: int | None = None):
+        """Build System + integrator + Simulation for *topology*; returns (simulation, dt)."""
+
+        # HMR 은 createSystem 의 hydrogenMass 로 적용된다 (H-결합 제약과 함께 사용).
+        ff_kwargs = {"constraints": HBonds}
+        if self.hmr:
+            ff_kwargs["hydrogenMass"] = HMR_HYDROGEN_MASS * unit.amu
 
         # Detect ligand atoms (resname 'LIG')
-        lig_atoms = [a for a in pdb.topology.atoms() if a.residue.name == "LIG"]
+        lig_atoms = [a for a in topology.atoms() if a.residue.name == "LIG"]
 
         if lig_atoms and SystemGenerator is not None:
             # Protein + ligand parameterization via SystemGenerator (requires openmmforcefields)
+            # 리간드 파라미터 캐시는 BindingEnergyCalculator 와 공유한다.
             generator = SystemGenerator(
                 forcefields=["amber/ff14SB.xml", "amber/tip3p.xml", "amber/gaff2.xml"],
-                small_molecule_forcefield="openff-2.0.0",
+                small_molecule_forcefield=SMALL_MOLECULE_FORCEFIELD,
                 molecules=None,
-                cache=None,
+                cache=ligand_param_cache(SMALL_MOLECULE_FORCEFIELD),
+                forcefield_kwargs=ff_kwargs,
             )
-            system = generator.create_system(pdb.topology)
+            system = generator.create_system(topology)
         else:
             # Protein-only or fallback: use standard Amber14 force field
             ff = ForceField("amber14-all.xml", "amber14/tip3p.xml")
-            system = ff.createSystem(pdb.topology, nonbondedMethod=None)
+            system = ff.createSystem(topology, nonbondedMethod=NoCutoff, **ff_kwargs)
 
-        integrator = LangevinIntegrator(
+        dt = self.timestep_fs * 0.001 * unit.picoseconds
+        # 4 fs 에서는 LangevinMiddle(BAOAB) 가 구성 공간 샘플링이 더 정확하고 안정적이다.
+        integrator_cls = LangevinMiddleIntegrator if self.hmr else LangevinIntegrator
+        integrator = integrator_cls(
             self.temperature * unit.kelvin,
             1.0 / unit.picoseconds,
-            0.002 * unit.picoseconds,
+            dt,
         )
+        if seed is not None:
+            integrator.setRandomNumberSeed(seed)
 
         platform = Platform.getPlatformByName(self.platform_name) if self.platform_name else None
-        simulation = Simulation(pdb.topology, system, integrator, platform) if platform else Simulation(pdb.topology, system, integrator)
-
-        simulation.context.setPositions(pdb.positions)
+        properties = {"Threads": str(self.threads)} if self.threads and self.platform_name == "CPU" else None
+        simulation = Simulation(topology, system, integrator, platform, properties) if platform else Simulation(topology, system, integrator)
+        return simulation, dt
+
+    def _checkpoint_identity(self, pdb_path: Path, seed: int | None) -> dict:
+        """Inputs a checkpoint must match to be resumed (structure content + dynamics settings)."""
+
+        h = hashlib.sha256()
+        with open(pdb_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return {
+            "input_sha256": h.hexdigest(),
+            "timestep_fs": self.timestep_fs,
+            # HMR 은 수소 질량·적분기를 바꾸므로 2 fs 체크포인트를 HMR System 에 복원하면 안 된다.
+            "hmr": self.hmr,
+            "hydrogen_mass_amu": HMR_HYDROGEN_MASS if self.hmr else None,
+            "temperature": self.temperature,
+            "seed": seed,
+        }
+
+    def _simulate_openmm(
+        self,
+        pdb_path: Path,
+        ns: int,
+        out_dir: Path,
+        report_interval: int,
+        seed: int | None = None,
+        checkpoint_interval: int = 25000,
+        max_wall_time: float | None = None,
+        resume: bool = True,
+        triage: TriagePolicy | None = None,
+    ) -> dict:
+        pdb = PDBFile(str(pdb_path))
+        simulation, dt = self._create_simulation(pdb.topology, seed)
+
+        # Compute steps from the timestep (2 fs → 0.5e6 steps/ns, 4 fs → 0.25e6); 긴 실행은 체크포인트로 나눠 이어 간다.
+        total_steps = int(round(ns * 1e6 / self.timestep_fs))
+        files = _CheckpointFiles(out_dir, pdb_path.stem, self._checkpoint_identity(pdb_path, seed))
+        progress = files.load() if resume else files.reset()
+
+        if progress is not None:
+            # 체크포인트 이후에 기록된 프레임은 다시 계산되므로 먼저 잘라낸다.
+            truncate_trajectory(progress["trajectory"], progress["traj_bytes"], progress["n_frames"])
+
+        reporter = LigandRMSDReporter(
+            out_dir / f"{pdb_path.stem}_traj.xtc",
+            report_interval,
+            pdb.topology,
+            pdb.positions,
+            select_atoms(pdb.topology),
+            dt,
+            append=progress is not None,
+            triage=triage,
+        )
 
-        # Minimize
-        simulation.minimizeEnergy()
+        if progress is not None:
+            reporter.restore(progress["steps"], progress["rmsd"], progress.get("contacts"))
+            reporter.stop_reason = progress.get("stop_reason") if triage is not None else None
+            files.restore(simulation)
+            simulation.currentStep = progress["step"]
+            print(f"[MDRunner] Resuming {pdb_path.name} from step {progress['step']}/{total_steps}")
+        else:
+            simulation.context.setPositions(pdb.positions)
 
-        # Compute steps
-        steps = int(ns * 500000)  # 2 fs step → 0.5e6 steps per ns
-        steps = min(steps, 250000)  # safety cap = 0.5 ns for demo
+            # Minimize
+            simulation.minimizeEnergy()
+            if seed is not None:
+                simulation.context.setVelocitiesToTemperature(self.temperature * unit.kelvin, seed)
 
-        # Run MD
-        simulation.reporters.append(
-            # Save every 1000 steps to DCD
-            # openmm.app.DCDReporter(str(out_dir / "traj.dcd"), 1000)
-            # To avoid heavy output in demo, skip reporter
-        )
-        simulation.step(steps)
+        # Run MD – 프레임은 압축 궤적으로 스트리밍하고 리간드 RMSD 만 메모리에 남긴다.
+        # triage 모드는 샘플마다 판정해야 하므로 report_interval 단위로 끊어 진행한다.
+        simulation.reporters.append(reporter)
+        started = chunk_start = time.monotonic()
+        try:
+            while simulation.currentStep < total_steps and reporter.stop_reason is None:
+                current = simulation.currentStep
+                n = min(total_steps - current, checkpoint_interval - current % checkpoint_interval)
+                if triage is not None:
+                    n = min(n, report_interval - current % report_interval)
+                simulation.step(n)
+
+                at_checkpoint = simulation.currentStep % checkpoint_interval == 0
+                if not (at_checkpoint or simulation.currentStep >= total_steps or reporter.stop_reason):
+                    continue
+                files.save(simulation, reporter, total_steps)
+
+                # 다음 청크가 예산을 넘길 것으로 보이면 체크포인트 상태로 멈춘다.
+                if max_wall_time is not None:
+                    now = time.monotonic()
+                    if now - started + (now - chunk_start) > max_wall_time:
+                        break
+                    chunk_start = now
+        finally:
+            reporter.close()
+
+        if reporter.stop_reason is not None:
+            stop_reason = reporter.stop_reason
+            print(f"[MDRunner] Triage stop for {pdb_path.name} at step {simulation.currentStep}/{total_steps}: {stop_reason}")
+        elif simulation.currentStep >= total_steps:
+            stop_reason = "completed"
+        else:
+            stop_reason = "wall_time"
+            print(
+                f"[MDRunner] Wall-clock budget reached at step {simulation.currentStep}/{total_steps} "
+                f"for {pdb_path.name} – call run() again to resume."
+            )
 
         state = simulation.context.getState(getPositions=True)
         positions = state.getPositions(asNumpy=True)
@@ -122,7 +465,18 @@ class MDRunner:
 
         # Compute RMSD of ligand heavy atoms (resname == LIG) vs initial
         rmsd = _ligand_rmsd(pdb.topology, pdb.positions, positions)
-        return rmsd, final_pdb
+
+        series = reporter.series(dt.value_in_unit(unit.picoseconds))
+        series.to_csv(out_dir / f"{pdb_path.stem}_lig_rmsd.csv", index=False)
+        return {
+            "complex_file": str(final_pdb),
+            "lig_rmsd": round(rmsd, 2),
+            "trajectory": str(reporter.path),
+            "lig_rmsd_series": series["lig_rmsd"].tolist(),
+            "steps_done": simulation.currentStep,
+            "completed": stop_reason != "wall_time",
+            "stop_reason": stop_reason,
+        }
 
 
 # -----------------------------------------------------------------------------
@@ -130,23 +484,191 @@ class MDRunner:
 # -----------------------------------------------------------------------------
 
 
+class _CheckpointFiles:
+    """Checkpoint set for one run in *out_dir*.
+
+    ``<stem>_<step>.chk`` (OpenMM 바이너리, 같은 플랫폼에서 RNG 포함 완전 복원),
+    ``<stem>_<step>_state.xml`` (플랫폼 무관 백업), ``<stem>_progress.json`` (최신
+    체크포인트를 가리키는 포인터 + RMSD 시계열 + 궤적 크기 + 실행 *identity*). 새 체크포인트를
+    먼저 쓰고 progress 를 원자적으로 교체한 뒤 이전 파일을 지우므로, 어느 시점에 중단돼도
+    progress 가 가리키는 파일 쌍은 항상 일관된다.
+
+    *identity* (입력 PDB 해시, timestep·HMR, 온도, seed 등)가 저장된 값과 다르면 이어 가지 않고
+    이전 체크포인트를 지운 뒤 새로 시작한다.
+    """
+
+    def __init__(self, out_dir: Path, stem: str, identity: dict | None = None):
+        self.out_dir = out_dir
+        self.stem = stem
+        self.identity = identity or {}
+        self.progress = out_dir / f"{stem}_progress.json"
+        self._current: dict | None = None
+
+    def _read(self) -> dict | None:
+        try:
+            return json.loads(self.progress.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def load(self) -> dict | None:
+        progress = self._read()
+        if progress is None:
+            return None
+        stored = progress.get("identity", {})
+        if stored != json.loads(json.dumps(self.identity)):
+            changed = sorted(k for k in set(stored) | set(self.identity) if stored.get(k) != self.identity.get(k))
+            print(f"[MDRunner] Checkpoint in {self.out_dir} was made with different inputs ({', '.join(changed)}) – starting fresh.")
+            self.reset()
+            return None
+        if not (self.out_dir / progress["checkpoint"]).exists() and not (self.out_dir / progress["state"]).exists():
+            return None
+        self._current = progress
+        return progress
+
+    def reset(self) -> None:
+        """Remove the checkpoint set of a previous run (fresh start)."""
+
+        previous = self._read()
+        if previous:
+            for name in (previous["checkpoint"], previous["state"]):
+                (self.out_dir / name).unlink(missing_ok=True)
+        self.progress.unlink(missing_ok=True)
+        self._current = None
+
+    def save(self, simulation, reporter: LigandRMSDReporter, total_steps: int) -> None:
+        step = simulation.currentStep
+        chk = f"{self.stem}_{step}.chk"
+        state = f"{self.stem}_{step}_state.xml"
+        simulation.saveCheckpoint(str(self.out_dir / chk))
+        simulation.saveState(str(self.out_dir / state))
+
+        progress = {
+            "identity": self.identity,
+            "step": step,
+            "total_steps": total_steps,
+            "checkpoint": chk,
+            "state": state,
+            "trajectory": str(reporter.path),
+            **reporter.checkpoint_state(),
+            "steps": reporter.steps,
+            "rmsd": reporter.rmsd,
+            "contacts": reporter.contacts,
+            "stop_reason": reporter.stop_reason,
+        }
+        tmp = self.progress.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(progress), encoding="utf-8")
+        os.replace(tmp, self.progress)
+
+        previous, self._current = self._current, progress
+        if previous and previous["step"] != step:
+            for name in (previous["checkpoint"], previous["state"]):
+                (self.out_dir / name).unlink(missing_ok=True)
+
+    def restore(self, simulation) -> None:
+        assert self._current is not None, "load() must succeed before restore()"
+        try:
+            simulation.loadCheckpoint(str(self.out_dir / self._current["checkpoint"]))
+        except Exception as exc:  # pylint: disable=broad-except
+            # 다른 플랫폼/OpenMM 버전의 바이너리 체크포인트는 읽을 수 없다 → XML 상태 사용
+            print(f"[MDRunner] binary checkpoint unusable – loading XML state. Reason: {exc}")
+            simulation.loadState(str(self.out_dir / self._current["state"]))
+
+
+def _triage_input(complexes) -> pd.DataFrame:
+    """Normalise `run_many` input to a ``complex_file`` / ``smiles`` frame for `MinimizationTriage`."""
+
+    if isinstance(complexes, pd.DataFrame):
+        frame = complexes.copy()
+    elif isinstance(complexes, dict):
+        frame = pd.DataFrame({"complex_file": list(complexes), "smiles": list(complexes.values())})
+    else:
+        frame = pd.DataFrame({"complex_file": list(complexes)})
+    frame["complex_file"] = frame["complex_file"].astype(str)
+    return frame
+
+
+def _estimated_cost(pdb_path: str) -> int:
+    """Atom count of *pdb_path* as a proxy for per-step cost."""
+
+    try:
+        with open(pdb_path, encoding="utf-8") as f:
+            return sum(1 for line in f if line.startswith(("ATOM", "HETATM")))
+    except OSError:
+        return 0
+
+
+def _thread_budget(n_jobs: int, platform_name: str | None, n_workers: int | None, threads_per_worker: int | None) -> tuple[int, int]:
+    """Return (workers, OpenMM threads per worker) so that workers × threads ≤ cores."""
+
+    cores = os.cpu_count() or 1
+    if platform_name not in (None, "CPU", "Reference"):
+        # GPU 플랫폼은 CPU 스레드 예산과 무관 – 기본은 한 번에 하나씩.
+        return max(1, min(n_jobs, n_workers or 1)), 1
+    if threads_per_worker is None:
+        workers = max(1, min(n_jobs, n_workers or cores))
+        return workers, max(1, cores // workers)
+    workers = max(1, min(n_jobs, n_workers or cores // threads_per_worker))
+    return workers, threads_per_worker
+
+
+def _aggregate_replicas(replica_df: pd.DataFrame) -> pd.DataFrame:
+    grouped = replica_df.groupby("input_pdb", sort=False)
+    stats = grouped["lig_rmsd"].agg(
+        n_replicas="count", lig_rmsd_mean="mean", lig_rmsd_std="std", lig_rmsd_min="min", lig_rmsd_max="max"
+    )
+    stats["n_completed"] = grouped["completed"].sum()
+    stats["steps_done_mean"] = grouped["steps_done"].mean()
+    stats["stop_reasons"] = grouped["stop_reason"].agg(lambda s: s.value_counts().to_dict())
+    stats["trajectories"] = grouped["trajectory"].agg(lambda s: [t for t in s if t])
+    return stats.round({"lig_rmsd_mean": 2, "lig_rmsd_std": 2}).reset_index()
+
+
+# -----------------------------------------------------------------------------
+# Process-pool workers
+# -----------------------------------------------------------------------------
+
+
+def _init_md_worker(threads: int) -> None:
+    # SystemGenerator 등이 만드는 보조 Context 도 같은 예산을 따르도록 기본값을 맞춘다.
+    os.environ["OPENMM_CPU_THREADS"] = str(threads)
+
+
+def _run_replica(
+    runner_kwargs, complex_pdb, ns, out_dir, report_interval, seed, checkpoint_interval, max_wall_time, triage
+) -> pd.DataFrame:
+    runner = MDRunner(**runner_kwargs)
+    return runner.run(
+        complex_pdb,
+        ns=ns,
+        out_dir=out_dir,
+        report_interval=report_interval,
+        seed=seed,
+        checkpoint_interval=checkpoint_interval,
+        max_wall_time=max_wall_time,
+        triage=triage,
+    )
+
+
 def _dummy_md(complex_pdb: str):
     rmsd = round(random.uniform(0.5, 3.0), 2)
-    return pd.DataFrame([{"complex_file": complex_pdb, "lig_rmsd": rmsd}])
+    return pd.DataFrame([{
+        "complex_file": complex_pdb,
+        "lig_rmsd": rmsd,
+        "trajectory": None,
+        "lig_rmsd_series": [rmsd],
+        "steps_done": 0,
+        "completed": False,
+        "stop_reason": "fallback",
+    }])
 
 
 def _ligand_rmsd(topology: Topology, pos_ref, pos_new) -> float:
-    """Compute RMSD for atoms belonging to residue name 'LIG'."""
-
-    import numpy as np
+    """Backbone-aligned RMSD (Å) for heavy atoms belonging to residue name 'LIG'."""
 
-    lig_indices: list[int] = [i for i, atom in enumerate(topology.atoms()) if atom.residue.name == "LIG" and atom.element.symbol != "H"]
-    if not lig_indices:
+    selection = select_atoms(topology)
+    if not selection.ligand.size:
         return random.uniform(1.0, 2.5)
 
-    ref = np.array([[pos_ref[i].x, pos_ref[i].y, pos_ref[i].z] for i in lig_indices])
-    new = np.array([[pos_new[i].x, pos_new[i].y, pos_new[i].z] for i in lig_indices])
-
-    diff = ref - new
-    rmsd = (diff ** 2).sum() / len(lig_indices)
-    return float(rmsd ** 0.5) 
\ No newline at end of file
+    ref = pos_ref.value_in_unit(unit.angstrom)
+    new = pos_new.value_in_unit(unit.angstrom)
+    return float(ligand_rmsd(new, ref, selection)[0])
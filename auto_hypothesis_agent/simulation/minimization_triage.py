@@ -0,0 +1,161 @@
+"""MinimizationTriage – MD 전 암시적 용매 최소화 기반 포즈 선별.
+
+상위 k 개 도킹 복합체를 모두 OBC2 암시적 용매에서 국소 최소화하고
+
+* ``lig_displacement`` – backbone 정렬 후 리간드 중원자 RMSD (Å)
+* ``e_int_before`` / ``e_int_after`` – 최소화 전/후 상호작용 에너지 (kcal/mol)
+
+를 기록한다. 최소화만으로 리간드가 포켓에서 크게 밀려나거나(``displaced``)
+상호작용 에너지가 여전히 불리한(``unfavourable``) 포즈는 MD 대상에서 제외한다.
+에너지 계산은 `BindingEnergyCalculator` 의 GB ForceField·ContextPool 을 그대로 쓴다.
+
+사용 예시::
+
+    triage = MinimizationTriage(n_workers=8)
+    table = triage.run(docking_df)                    # complex_file, smiles, ligand_id
+    md_df = MDRunner().run_many(triage.survivors(table))
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from auto_hypothesis_agent.simulation.binding_energy import BindingEnergyCalculator
+
+
+class MinimizationTriage:
+    """Minimise complexes in parallel and flag poses that do not hold."""
+
+    def __init__(
+        self,
+        max_displacement: float = 2.0,
+        max_interaction_energy: float = 0.0,
+        max_iterations: int = 500,
+        n_workers: int = 1,
+        threads_per_worker: int | None = None,
+    ):
+        self.max_displacement = max_displacement
+        self.max_interaction_energy = max_interaction_energy
+        self.max_iterations = max_iterations
+        self.n_workers = n_workers
+        self.threads_per_worker = threads_per_worker
+
+    # ------------------------------------------------------------------
+    def run(self, complexes) -> pd.DataFrame:
+        """Score *complexes* (list of PDB paths or DataFrame with ``complex_file``).
+
+        DataFrame 에 ``smiles`` / ``ligand_id`` 가 있으면 리간드 파라미터화와 결과 표기에
+        사용한다. 반환: ``ligand_id, complex_file, lig_displacement, e_int_before,
+        e_int_after, delta_e_int, passed, reason``.
+        """
+
+        jobs = _jobs(complexes)
+        if not jobs:
+            return pd.DataFrame(columns=_COLUMNS)
+
+        smiles_list = [smi for _, _, smi in jobs if smi]
+        if self.n_workers <= 1:
+            calc = BindingEnergyCalculator()
+            calc.register_ligands(smiles_list)
+            results = [_minimize(calc, path, smi, self.max_iterations) for _, path, smi in jobs]
+        else:
+            # 워커들이 파라미터 캐시를 읽기만 하도록 부모에서 먼저 채운다.
+            BindingEnergyCalculator().warm_ligand_cache(smiles_list)
+            threads = self.threads_per_worker or max(1, (os.cpu_count() or 1) // self.n_workers)
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(smiles_list, threads),
+            ) as executor:
+                results = list(
+                    executor.map(
+                        _minimize_in_worker,
+                        [path for _, path, _ in jobs],
+                        [smi for _, _, smi in jobs],
+                        [self.max_iterations] * len(jobs),
+                    )
+                )
+
+        rows = []
+        for (ligand_id, path, _), result in zip(jobs, results):
+            row = {"ligand_id": ligand_id, "complex_file": path, **result}
+            row["passed"], row["reason"] = self._verdict(row)
+            rows.append(row)
+
+        table = pd.DataFrame(rows, columns=_COLUMNS)
+        print(f"[MinimizationTriage] {int(table['passed'].sum())}/{len(table)} poses survive minimization")
+        return table
+
+    @staticmethod
+    def survivors(table: pd.DataFrame) -> list[str]:
+        """Complex files that passed triage, in input order."""
+
+        return table.loc[table["passed"], "complex_file"].tolist()
+
+    # ------------------------------------------------------------------
+    def _verdict(self, row: dict) -> tuple[bool, str]:
+        if row.get("error"):
+            return False, f"failed: {row['error']}"
+        if row["lig_displacement"] > self.max_displacement:
+            return False, "displaced"
+        if row["e_int_after"] > self.max_interaction_energy:
+            return False, "unfavourable"
+        return True, "ok"
+
+
+_COLUMNS = [
+    "ligand_id",
+    "complex_file",
+    "lig_displacement",
+    "e_int_before",
+    "e_int_after",
+    "delta_e_int",
+    "passed",
+    "reason",
+]
+
+
+def _jobs(complexes) -> list[tuple[str, str, str | None]]:
+    if isinstance(complexes, pd.DataFrame):
+        paths = complexes["complex_file"].astype(str).tolist()
+        ids = complexes["ligand_id"].astype(str).tolist() if "ligand_id" in complexes else [Path(p).stem for p in paths]
+        smiles = [s if isinstance(s, str) else None for s in complexes["smiles"]] if "smiles" in complexes else [None] * len(paths)
+        return list(zip(ids, paths, smiles))
+    return [(Path(p).stem, str(p), None) for p in complexes]
+
+
+def _minimize(calc: BindingEnergyCalculator, path: str, smiles: str | None, max_iterations: int) -> dict:
+    try:
+        result = calc.minimize_complex(path, smiles, max_iterations=max_iterations)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"[MinimizationTriage] minimization failed for {Path(path).name}. Reason: {exc}")
+        return {"lig_displacement": float("nan"), "e_int_before": float("nan"), "e_int_after": float("nan"),
+                "delta_e_int": float("nan"), "error": str(exc)}
+    result["delta_e_int"] = round(result["e_int_after"] - result["e_int_before"], 2)
+    return result
+
+
+# -----------------------------------------------------------------------------
+# Process-pool worker state
+# -----------------------------------------------------------------------------
+
+_WORKER_CALC: BindingEnergyCalculator | None = None
+
+
+def _init_worker(smiles_list: list[str], threads: int) -> None:
+    global _WORKER_CALC
+
+    os.environ["OPENMM_CPU_THREADS"] = str(threads)
+    _WORKER_CALC = BindingEnergyCalculator()
+    _WORKER_CALC.register_ligands(smiles_list)
+
+
+def _minimize_in_worker(path: str, smiles: str | None, max_iterations: int) -> dict:
+    assert _WORKER_CALC is not None, "worker not initialised"
+    return _minimize(_WORKER_CALC, path, smiles, max_iterations)
@@ -0,0 +1,22 @@
+"""리간드 파라미터(AM1-BCC 전하 포함) 영구 캐시 경로 관리.
+
+`openmmforcefields` 의 SMIRNOFF/System 생성기는 ``cache=`` 로 지정한 TinyDB(JSON) 파일에
+분자별 residue template 을 저장하고 재사용한다. 캐시 파일을 small-molecule force field
+버전별로 분리하여 (분자 identity, force field 버전) 쌍으로 결과가 식별되도록 하고,
+`BindingEnergyCalculator` 와 `MDRunner` 가 같은 파일을 공유해 화합물당 전하 계산이
+한 번만 일어나게 한다.
+"""
+
+from __future__ import annotations
+
+import os
+
+from auto_hypothesis_agent.config import LIGAND_PARAM_CACHE_DIR, SMALL_MOLECULE_FORCEFIELD
+
+
+def ligand_param_cache(forcefield: str = SMALL_MOLECULE_FORCEFIELD, cache_dir: str | None = None) -> str:
+    """Return the cache file shared by all generators using *forcefield*."""
+
+    cache_dir = cache_dir or LIGAND_PARAM_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{forcefield}.json")
@@ -0,0 +1,249 @@
+"""Pareto ranking – 다목적 비지배 정렬(non-dominated sort) + crowding distance.
+
+도킹 점수 하나로 정렬하거나 z-score 평균(composite)을 쓰면 도킹·ΔG·합성 용이성·ADMET
+경고 사이의 trade-off 가 가려진다. 이 모듈은 NSGA-II 방식의 순위를 NumPy 로 계산한다.
+
+• `non_dominated_sort` – 중복 행을 합친 뒤 지배 관계와 모순되지 않는 순서(열별 순위 합)로
+  블록 단위 처리하는 ENS-BS(Efficient Non-dominated Sort, binary search). 각 블록은 이미
+  순위가 정해진 front 들에 대해 이진 탐색으로 하한 순위를 구하고(같은 front 를 보는 점들은
+  한 번의 벡터 비교), 블록 내부 지배 관계는 (B × B) 마스크로 해결한다. 비교 비용은
+  O(N · log F · |front|) 로, 전체 쌍 비교 O(N²) 를 피한다.
+• `crowding_distance` – front 별 목적 함수 축마다 이웃 간격 합 (경계점은 inf).
+• `pareto_rank` – DataFrame 에 ``pareto_rank`` (1 = 최전선), ``crowding_distance`` 를 붙여
+  (rank 오름차순, crowding 내림차순) 으로 정렬해 돌려준다.
+
+사용 예시::
+
+    ranked = pareto_rank(results_df)                       # 기본 목적: DEFAULT_OBJECTIVES
+    ranked = pareto_rank(results_df, {"docking_score": "min", "logS": "max"})
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# 열 이름 → "min" | "max". 데이터에 없는 열은 건너뛴다.
+DEFAULT_OBJECTIVES = {
+    "docking_score": "min",
+    "delta_g": "min",
+    "sa_score": "min",
+    "admet_flags": "min",
+}
+
+HERG_IC50_FLAG_NM = 10.0  # ADMETPredictor 의 hERG 경고 플래그는 herg_ic50 = 5 nM 로 표기된다.
+
+_MAX_PAIRS = 4_000_000
+
+
+def admet_flag_count(df: pd.DataFrame) -> pd.Series:
+    """Number of ADMET warning flags per row (hERG, CYP inhibition)."""
+
+    flags = pd.Series(0, index=df.index, dtype=np.int64)
+    if "herg_ic50" in df:
+        flags += (pd.to_numeric(df["herg_ic50"], errors="coerce") < HERG_IC50_FLAG_NM).astype(np.int64)
+    if "cyp_inhibition" in df:
+        flags += df["cyp_inhibition"].fillna(False).astype(bool).astype(np.int64)
+    return flags
+
+
+# -----------------------------------------------------------------------------
+# Non-dominated sorting
+# -----------------------------------------------------------------------------
+
+
+def non_dominated_sort(objectives: np.ndarray, block_size: int = 256) -> np.ndarray:
+    """0-based Pareto front index of each row of *objectives* ``(N, M)`` (all minimised).
+
+    NaN 은 해당 목적에서 가장 나쁜 값(+inf)으로 취급한다. 동일한 행은 같은 front 에 속한다.
+    """
+
+    values = np.asarray(objectives, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    values = np.where(np.isnan(values), np.inf, values)
+
+    points, inverse = np.unique(values, axis=0, return_inverse=True)
+    # 열별 dense rank 의 합으로 정렬한다. q 가 p 를 지배하면 합이 엄격히 작으므로 지배자는
+    # 항상 앞에 오고, 비슷한 front 의 점들이 같은 블록에 모여 이진 탐색이 함께 진행된다.
+    key = np.zeros(len(points), dtype=np.int64)
+    for m in range(points.shape[1]):
+        key += np.unique(points[:, m], return_inverse=True)[1].reshape(-1)
+    order = np.argsort(key, kind="stable")
+    points = points[order]
+    ranks = np.empty(len(points), dtype=np.int64)
+
+    fronts = _Fronts()
+    for start in range(0, len(points), block_size):
+        block = points[start:start + block_size]
+        block_ranks = _resolve_block(block, fronts.lower_bound(block))
+        ranks[start:start + len(block)] = block_ranks
+        fronts.add(block, block_ranks)
+
+    unsorted = np.empty_like(ranks)
+    unsorted[order] = ranks
+    return unsorted[inverse.reshape(-1)]
+
+
+class _Fronts:
+    """Coordinates of already ranked points, grouped by front (chunks merged lazily)."""
+
+    def __init__(self):
+        self._chunks: list[list[np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def add(self, block: np.ndarray, block_ranks: np.ndarray) -> None:
+        for r in np.unique(block_ranks):
+            while len(self._chunks) <= r:
+                self._chunks.append([])
+            self._chunks[r].append(np.ascontiguousarray(block[block_ranks == r].T))
+
+    def members(self, k: int) -> np.ndarray:
+        """Members of front *k* as a column-major ``(M, F)`` array."""
+
+        chunks = self._chunks[k]
+        if len(chunks) > 1:
+            chunks[:] = [np.concatenate(chunks, axis=1)]
+        return chunks[0]
+
+    def lower_bound(self, block: np.ndarray) -> np.ndarray:
+        """First front that does not dominate each point of *block*.
+
+        front k 의 어떤 점이 p 를 지배하면 k 보다 앞선 모든 front 에도 p 의 지배자가 있으므로
+        "front k 가 p 를 지배" 는 k 에 대해 단조 → 점마다 이진 탐색. 같은 front 를 보는 점들은
+        한 번의 (점 × 멤버) 비교로 묶는다.
+        """
+
+        lo = np.zeros(len(block), dtype=np.int64)
+        hi = np.full(len(block), len(self), dtype=np.int64)
+        while True:
+            active = np.nonzero(lo < hi)[0]
+            if active.size == 0:
+                return lo
+            mid = (lo[active] + hi[active]) // 2
+            dominated = np.empty(active.size, dtype=bool)
+            order = np.argsort(mid, kind="stable")
+            bounds = np.nonzero(np.r_[True, mid[order][1:] != mid[order][:-1], True])[0]
+            for g0, g1 in zip(bounds[:-1], bounds[1:]):
+                group = order[g0:g1]
+                dominated[group] = _any_dominates(self.members(mid[group[0]]), block[active[group]])
+            lo[active] = np.where(dominated, mid + 1, lo[active])
+            hi[active] = np.where(dominated, hi[active], mid)
+
+
+def _any_dominates(front: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """For each query row, whether some (earlier ranked, distinct) *front* member dominates it.
+
+    *front* 는 열 우선 ``(M, F)`` 배열, *queries* 는 ``(Q, M)``.
+    """
+
+    step = max(1, _MAX_PAIRS // max(1, front.shape[1]))
+    if len(queries) > step:
+        return np.concatenate([_any_dominates(front, queries[i:i + step]) for i in range(0, len(queries), step)])
+    return _dominance_mask(front, queries).any(axis=1)
+
+
+def _dominance_mask(front: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """``(Q, F)`` mask: front member ≤ query in every objective (column-major *front*)."""
+
+    # 서로 다른 행이므로 "모든 목적에서 ≤" 이면 지배한다. 축마다 비교해 작은 마지막 축에 대한
+    # 축소 연산을 피한다.
+    mask = front[0][None, :] <= queries[:, 0, None]
+    for m in range(1, len(front)):
+        mask &= front[m][None, :] <= queries[:, m, None]
+    return mask
+
+
+def _resolve_block(block_points: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """Raise *lower* so that every point ranks after its in-block dominators."""
+
+    # dominator[i, j] : j 가 i 를 지배 (정렬 순서상 j < i 인 경우만 가능).
+    dominator = _dominance_mask(np.ascontiguousarray(block_points.T), block_points)
+    np.fill_diagonal(dominator, False)
+    ranks = lower.copy()
+    pending = dominator.any(axis=1)
+    # 지배자가 모두 확정된 점부터 층(layer) 단위로 확정한다. 반복 횟수 = 블록 내 최장 지배 사슬.
+    while pending.any():
+        ready = pending & ~(dominator & pending[None, :]).any(axis=1)
+        ranks[ready] = np.maximum(ranks[ready], np.where(dominator[ready], ranks[None, :] + 1, 0).max(axis=1))
+        pending &= ~ready
+    return ranks
+
+
+# -----------------------------------------------------------------------------
+# Crowding distance
+# -----------------------------------------------------------------------------
+
+
+def crowding_distance(objectives: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance of each row within its front (boundary points = inf)."""
+
+    values = np.asarray(objectives, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    values = np.where(np.isnan(values), np.inf, values)
+    n = len(values)
+    distance = np.zeros(n)
+    if n == 0:
+        return distance
+
+    for m in range(values.shape[1]):
+        order = np.lexsort((values[:, m], ranks))
+        v = values[order, m]
+        r = ranks[order]
+        first = np.r_[True, r[1:] != r[:-1]]
+        last = np.r_[r[1:] != r[:-1], True]
+
+        # front 별 값 범위 (정렬되어 있으므로 마지막 − 첫 값).
+        group = np.cumsum(first) - 1
+        gap = np.zeros(n)
+        interior = ~(first | last)
+        with np.errstate(invalid="ignore"):
+            span = (v[last] - v[first])[group]
+            gap[interior] = (v[2:] - v[:-2])[interior[1:-1]]
+            scaled = np.where(span > 0, gap / np.where(span > 0, span, 1.0), 0.0)
+        scaled = np.where(np.isfinite(scaled), scaled, 0.0)
+        scaled[first | last] = np.inf
+
+        contribution = np.empty(n)
+        contribution[order] = scaled
+        distance += contribution
+    return distance
+
+
+# -----------------------------------------------------------------------------
+# DataFrame interface
+# -----------------------------------------------------------------------------
+
+
+def pareto_rank(df: pd.DataFrame, objectives: dict[str, str] | None = None) -> pd.DataFrame:
+    """Return *df* with ``pareto_rank`` (1-based) and ``crowding_distance``, best first.
+
+    *objectives* 는 ``{column: "min" | "max"}``. ``admet_flags`` 가 목적에 있고 열이 없으면
+    `admet_flag_count` 로 만든다. 데이터에 없는 목적 열은 무시한다.
+    """
+
+    objectives = dict(objectives or DEFAULT_OBJECTIVES)
+    out = df.copy()
+    if "admet_flags" in objectives and "admet_flags" not in out:
+        if "herg_ic50" in out or "cyp_inhibition" in out:
+            out["admet_flags"] = admet_flag_count(out)
+
+    columns = [c for c in objectives if c in out.columns]
+    if not columns:
+        raise ValueError(f"None of the objective columns {list(objectives)} are present.")
+    for c in columns:
+        if objectives[c] not in ("min", "max"):
+            raise ValueError(f"Objective direction for '{c}' must be 'min' or 'max', got {objectives[c]!r}.")
+
+    values = out[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    values = values * np.array([1.0 if objectives[c] == "min" else -1.0 for c in columns])
+
+    ranks = non_dominated_sort(values)
+    out["pareto_rank"] = ranks + 1
+    out["crowding_distance"] = crowding_distance(values, ranks)
+    return out.sort_values(["pareto_rank", "crowding_distance"], ascending=[True, False], kind="stable")
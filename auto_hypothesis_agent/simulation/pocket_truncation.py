@@ -0,0 +1,355 @@
+"""Pocket truncation – MM/GBSA 용 수용체 포켓 절단 유틸리티.
+
+리간드로부터 *cutoff* Å 이내에 원자가 하나라도 있는 수용체 잔기만 남기고,
+잘린 지점의 backbone 은 ACE/NME 캡으로 막아 amber 템플릿이 그대로 매칭되도록 한다.
+
+• 거리 질의는 `scipy.spatial.cKDTree` (없으면 NumPy 청크 brute-force) 로 수행.
+• 2 잔기 이하의 간격은 채워서 캡 원자끼리 겹치지 않게 한다.
+• 선택된 CYX 의 이황화 결합 상대 잔기는 함께 포함한다.
+• 캡은 인접 잔기의 원자 좌표를 재사용한다 (ACE ← 이전 잔기 CA/C/O, NME ← 다음 잔기 N/H/CA).
+
+정확도/속도 벤치마크::
+
+    python -m auto_hypothesis_agent.simulation.pocket_truncation complex1.pdb complex2.pdb \
+        --smiles "<ligand1 SMILES>" "<ligand2 SMILES>" \
+        --cutoffs 6 8 10 12 --out outputs/reports/truncation_benchmark.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+try:
+    from openmm import Vec3, unit
+    from openmm.app import Topology, element
+
+    _OPENMM_OK = True
+except ImportError:  # pragma: no cover
+    _OPENMM_OK = False
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover
+    cKDTree = None  # type: ignore
+
+STANDARD_AA = {
+    "ALA", "ARG", "ASN", "ASP", "CYS", "CYX", "GLN", "GLU", "GLY", "HIS", "HID", "HIE", "HIP",
+    "ILE", "LEU", "LYS", "MET", "PHE", "PRO", "SER", "THR", "TRP", "TYR", "VAL",
+}
+
+_FILL_GAP = 2  # 이 길이 이하의 미선택 구간은 채운다 (ACE/NME 캡이 같은 잔기에서 나오는 것을 방지)
+
+
+def select_pocket_residues(topology, positions_nm: np.ndarray, ligand_atoms: list[int], cutoff: float = 8.0) -> set[int]:
+    """Return indices of protein residues with any atom within *cutoff* Å of the ligand."""
+
+    lig_xyz = positions_nm[ligand_atoms]
+    prot_atoms = np.array([a.index for a in topology.atoms() if a.residue.name in STANDARD_AA])
+    if prot_atoms.size == 0:
+        return set()
+
+    prot_xyz = positions_nm[prot_atoms]
+    cutoff_nm = cutoff / 10.0
+    if cKDTree is not None:
+        tree = cKDTree(lig_xyz)
+        dist, _ = tree.query(prot_xyz, k=1, distance_upper_bound=cutoff_nm)
+        close = prot_atoms[np.isfinite(dist)]
+    else:
+        close_mask = np.zeros(prot_atoms.size, dtype=bool)
+        for start in range(0, prot_atoms.size, 4096):
+            block = prot_xyz[start:start + 4096]
+            d2 = ((block[:, None, :] - lig_xyz[None, :, :]) ** 2).sum(axis=2)
+            close_mask[start:start + 4096] = (d2 <= cutoff_nm ** 2).any(axis=1)
+        close = prot_atoms[close_mask]
+
+    atoms = list(topology.atoms())
+    return {atoms[i].residue.index for i in close}
+
+
+def truncate_complex(topology, positions, ligand_atoms: list[int], cutoff: float = 8.0):
+    """Build a capped pocket-only complex.
+
+    Returns ``(topology, positions, receptor_atoms, ligand_atoms)`` for the reduced
+    system, with indices referring to the new topology.
+    """
+
+    pos_nm = np.array(positions.value_in_unit(unit.nanometer), dtype=float)
+
+    selected = select_pocket_residues(topology, pos_nm, ligand_atoms, cutoff)
+    selected |= _disulfide_partners(topology, selected)
+
+    residues = list(topology.residues())
+    lig_residues = {list(topology.atoms())[i].residue.index for i in ligand_atoms}
+
+    new_top = Topology()
+    new_pos: list[np.ndarray] = []
+    old_to_new: dict[int, object] = {}
+
+    def _add_atom(residue, name, elem, xyz, src_index=None):
+        atom = new_top.addAtom(name, elem, residue)
+        new_pos.append(np.asarray(xyz, dtype=float))
+        if src_index is not None:
+            old_to_new[src_index] = atom
+        return atom
+
+    for chain in topology.chains():
+        chain_res = [r for r in chain.residues() if r.name in STANDARD_AA]
+        for segment in _segments(chain_res, selected):
+            new_chain = new_top.addChain(chain.id)
+            first, last = segment[0], segment[-1]
+            prev_res = _neighbour(chain_res, first, -1)
+            next_res = _neighbour(chain_res, last, +1)
+
+            ace = _build_ace(new_top, new_chain, prev_res, pos_nm, _add_atom) if prev_res is not None else None
+            for res in segment:
+                new_res = new_top.addResidue(res.name, new_chain, res.id, res.insertionCode)
+                for atom in res.atoms():
+                    _add_atom(new_res, atom.name, atom.element, pos_nm[atom.index], atom.index)
+            if ace is not None:
+                new_top.addBond(ace, old_to_new[_atom_index(first, "N")])
+            if next_res is not None:
+                nme_n = _build_nme(new_top, new_chain, next_res, pos_nm, _add_atom)
+                new_top.addBond(old_to_new[_atom_index(last, "C")], nme_n)
+
+    n_receptor = len(new_pos)
+
+    # Ligand residue(s) – 원본 그대로 복사
+    lig_chain = new_top.addChain("L")
+    for res in residues:
+        if res.index not in lig_residues:
+            continue
+        new_res = new_top.addResidue(res.name, lig_chain, res.id, res.insertionCode)
+        for atom in res.atoms():
+            _add_atom(new_res, atom.name, atom.element, pos_nm[atom.index], atom.index)
+
+    # 원본 결합 중 양 끝이 모두 남은 것을 복사 (캡 결합은 위에서 추가)
+    for bond in topology.bonds():
+        a, b = old_to_new.get(bond[0].index), old_to_new.get(bond[1].index)
+        if a is not None and b is not None:
+            new_top.addBond(a, b)
+
+    positions_out = [Vec3(*xyz) for xyz in new_pos] * unit.nanometer
+    return new_top, positions_out, list(range(n_receptor)), list(range(n_receptor, len(new_pos)))
+
+
+# -----------------------------------------------------------------------------
+# Segment / cap helpers
+# -----------------------------------------------------------------------------
+
+
+def _segments(chain_res: list, selected: set[int]) -> list[list]:
+    """Split selected residues of a chain into contiguous runs, filling short gaps."""
+
+    flags = [r.index in selected for r in chain_res]
+    idx = [i for i, f in enumerate(flags) if f]
+    for a, b in zip(idx, idx[1:]):
+        if 1 < b - a <= _FILL_GAP + 1:
+            for k in range(a + 1, b):
+                flags[k] = True
+
+    segments, current = [], []
+    for res, keep in zip(chain_res, flags):
+        if keep:
+            current.append(res)
+        elif current:
+            segments.append(current)
+            current = []
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _neighbour(chain_res: list, res, step: int):
+    pos = chain_res.index(res) + step
+    if 0 <= pos < len(chain_res):
+        return chain_res[pos]
+    return None
+
+
+def _disulfide_partners(topology, selected: set[int]) -> set[int]:
+    partners = set()
+    for a, b in topology.bonds():
+        if a.name == "SG" and b.name == "SG":
+            ra, rb = a.residue.index, b.residue.index
+            if ra in selected and rb not in selected:
+                partners.add(rb)
+            elif rb in selected and ra not in selected:
+                partners.add(ra)
+    return partners
+
+
+def _atom_index(res, name: str) -> int:
+    for atom in res.atoms():
+        if atom.name == name:
+            return atom.index
+    raise ValueError(f"Residue {res.name}{res.id} has no atom {name}")
+
+
+def _alpha_hydrogen(res) -> int:
+    for name in ("HA", "HA2", "HA3"):
+        try:
+            return _atom_index(res, name)
+        except ValueError:
+            continue
+    raise ValueError(f"Residue {res.name}{res.id} has no alpha hydrogen")
+
+
+def _methyl_hydrogens(center: np.ndarray, anchor: np.ndarray, h1: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Place two more methyl H by rotating *h1* ±120° about the anchor→center axis."""
+
+    axis = center - anchor
+    axis /= np.linalg.norm(axis)
+    v = h1 - center
+    out = []
+    for angle in (2 * np.pi / 3, -2 * np.pi / 3):
+        c, s = np.cos(angle), np.sin(angle)
+        rotated = v * c + np.cross(axis, v) * s + axis * np.dot(axis, v) * (1 - c)
+        out.append(center + rotated)
+    return out[0], out[1]
+
+
+def _build_ace(top, chain, prev_res, pos_nm: np.ndarray, add_atom):
+    """ACE cap from the preceding residue's CA(→CH3), HA(→HH31), C and O."""
+
+    res = top.addResidue("ACE", chain)
+    ch3 = pos_nm[_atom_index(prev_res, "CA")]
+    c = pos_nm[_atom_index(prev_res, "C")]
+    h1 = pos_nm[_alpha_hydrogen(prev_res)]
+    h2, h3 = _methyl_hydrogens(ch3, c, h1)
+
+    a_h1 = add_atom(res, "HH31", element.hydrogen, h1)
+    a_ch3 = add_atom(res, "CH3", element.carbon, ch3)
+    a_h2 = add_atom(res, "HH32", element.hydrogen, h2)
+    a_h3 = add_atom(res, "HH33", element.hydrogen, h3)
+    a_c = add_atom(res, "C", element.carbon, c)
+    a_o = add_atom(res, "O", element.oxygen, pos_nm[_atom_index(prev_res, "O")])
+    for a, b in ((a_h1, a_ch3), (a_ch3, a_h2), (a_ch3, a_h3), (a_ch3, a_c), (a_c, a_o)):
+        top.addBond(a, b)
+    return a_c
+
+
+def _build_nme(top, chain, next_res, pos_nm: np.ndarray, add_atom):
+    """NME cap from the following residue's N, H, CA(→CH3) and HA(→HH31)."""
+
+    res = top.addResidue("NME", chain)
+    n = pos_nm[_atom_index(next_res, "N")]
+    ch3 = pos_nm[_atom_index(next_res, "CA")]
+    h1 = pos_nm[_alpha_hydrogen(next_res)]
+    h2, h3 = _methyl_hydrogens(ch3, n, h1)
+    try:
+        h = pos_nm[_atom_index(next_res, "H")]
+    except ValueError:
+        # PRO 에는 amide H 가 없으므로 N–CD 방향에 1.01 Å 로 배치
+        cd = pos_nm[_atom_index(next_res, "CD")]
+        direction = (cd - n) / np.linalg.norm(cd - n)
+        h = n + direction * 0.101
+
+    a_n = add_atom(res, "N", element.nitrogen, n)
+    a_h = add_atom(res, "H", element.hydrogen, h)
+    a_ch3 = add_atom(res, "CH3", element.carbon, ch3)
+    a_h1 = add_atom(res, "HH31", element.hydrogen, h1)
+    a_h2 = add_atom(res, "HH32", element.hydrogen, h2)
+    a_h3 = add_atom(res, "HH33", element.hydrogen, h3)
+    for a, b in ((a_n, a_h), (a_n, a_ch3), (a_ch3, a_h1), (a_ch3, a_h2), (a_ch3, a_h3)):
+        top.addBond(a, b)
+    return a_n
+
+
+# -----------------------------------------------------------------------------
+# Accuracy vs. speed benchmark
+# -----------------------------------------------------------------------------
+
+
+def benchmark(
+    complexes: Iterable[tuple[str, str | None]],
+    cutoffs: tuple[float, ...] = (6.0, 8.0, 10.0, 12.0),
+    calculator=None,
+) -> pd.DataFrame:
+    """Compare truncated ΔG against full-receptor ΔG on a reference set of complexes.
+
+    *complexes* 는 ``(complex_pdb, ligand_smiles)`` 쌍이며, SMILES 는 리간드 파라미터화에 쓰인다
+    (SMILES 가 None 이면 ForceField 에 이미 템플릿이 있어야 한다).
+    Returns DataFrame[complex, cutoff, delta_g, delta_g_full, abs_error, seconds, speedup, error].
+    계산에 실패한 행은 ΔG 를 NaN 으로 두고 ``error`` 에 이유를 남긴다 (fallback 난수를 쓰지 않는다).
+    수용체 캐시가 결과를 왜곡하지 않도록 복합체·cutoff 마다 캐시를 비운다.
+    """
+
+    from .binding_energy import BindingEnergyCalculator
+
+    complexes = [(str(path), smiles) for path, smiles in complexes]
+    calc = calculator or BindingEnergyCalculator()
+    calc.register_ligands([smiles for _, smiles in complexes if smiles])
+
+    rows = []
+    for path, _ in complexes:
+        # 파싱은 복합체당 한 번 – 시간은 GB 에너지 계산만 잰다.
+        try:
+            parsed = calc._read_complex(Path(path))
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"[PocketTruncation] {Path(path).name} could not be read. Reason: {exc}")
+            parsed, full, t_full, full_error = None, float("nan"), float("nan"), f"read: {exc}"
+        else:
+            full, t_full, full_error = _timed_delta_g(calc, path, parsed, None)
+        for cutoff in cutoffs:
+            if full_error:
+                dg, elapsed = float("nan"), float("nan")
+                error = full_error if parsed is None else f"full receptor: {full_error}"
+            else:
+                dg, elapsed, error = _timed_delta_g(calc, path, parsed, cutoff)
+            rows.append({
+                "complex": Path(path).name,
+                "cutoff": cutoff,
+                "delta_g": dg,
+                "delta_g_full": full,
+                "abs_error": round(abs(dg - full), 2),
+                "seconds": round(elapsed, 2),
+                "speedup": round(t_full / elapsed, 2) if elapsed > 0 else float("nan"),
+                "error": error,
+            })
+    calc.pocket_cutoff = None
+    return pd.DataFrame(rows)
+
+
+def _timed_delta_g(calc, path: str, parsed: tuple, cutoff: float | None) -> tuple[float, float, str | None]:
+    calc._receptor_cache.clear()
+    calc.pocket_cutoff = cutoff
+    t0 = time.perf_counter()
+    try:
+        dg = calc._mmgbsa_topology(*parsed)
+    except Exception as exc:  # pylint: disable=broad-except
+        label = f"cutoff {cutoff}" if cutoff else "full receptor"
+        print(f"[PocketTruncation] {Path(path).name} ({label}) failed. Reason: {exc}")
+        return float("nan"), float("nan"), str(exc)
+    return dg, time.perf_counter() - t0, None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pocket-truncated MM/GBSA accuracy/speed benchmark")
+    parser.add_argument("complexes", nargs="+", help="참조 복합체 PDB 파일들")
+    parser.add_argument("--smiles", nargs="+", required=True, help="복합체와 같은 순서의 리간드 SMILES")
+    parser.add_argument("--cutoffs", nargs="+", type=float, default=[6.0, 8.0, 10.0, 12.0])
+    parser.add_argument("--out", default="outputs/reports/truncation_benchmark.csv")
+    args = parser.parse_args()
+    if len(args.smiles) != len(args.complexes):
+        parser.error(f"got {len(args.complexes)} complexes but {len(args.smiles)} SMILES")
+
+    df = benchmark(zip(args.complexes, args.smiles), tuple(args.cutoffs))
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(args.out, index=False)
+
+    ok = df[df["error"].isna()]
+    summary = ok.groupby("cutoff").agg(mae=("abs_error", "mean"), speedup=("speedup", "median"))
+    print(summary.to_string())
+    if len(ok) < len(df):
+        print(f"{len(df) - len(ok)}/{len(df)} calculations failed – see the 'error' column.")
+    print(f"Benchmark saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""ReceptorPrepCache – 수용체 PDB→PDBQT 변환과 fpocket 결과를 내용 해시로 캐시.
+
+수용체 PDBQT 를 PDB 옆에 만들고 "파일이 있으면 재사용" 하면 구조가 바뀌어도 낡은 PDBQT 가
+계속 쓰이고, 동시에 도는 스크리닝이 같은 경로에 쓰다 충돌한다. 이 모듈은
+
+• 키 = 구조 파일 내용의 SHA-256 + 준비 옵션(JSON) → ``<cache_dir>/<kind>/<key>/``
+• 결과는 같은 디렉터리의 임시 경로에 만든 뒤 ``os.replace`` 로 원자적으로 옮기고,
+• 키별 잠금 파일(``fcntl.flock``)로 같은 수용체를 여러 프로세스/스레드가 동시에 준비하지
+  않게 한다(먼저 잡은 쪽이 만들고 나머지는 결과를 재사용).
+
+`compound_screen_pipeline` 의 receptor_prep / pocket_detection 단계와 `DockingRunner` 의
+fpocket 격자 계산이 같은 캐시를 공유한다.
+
+사용 예시::
+
+    cache = ReceptorPrepCache()
+    pdbqt = cache.pdbqt("outputs/KRAS_G12C.pdb")           # obabel (gasteiger, -xr)
+    pocket = cache.best_pocket("outputs/KRAS_G12C.pdb")    # fpocket pocket1_atm.pdb 또는 None
+
+직접 준비한 PDBQT 는 그 내용 해시도 키에 들어가고, 예전 방식으로 PDB 옆에 남은 fpocket 결과
+(``<stem>_out``)는 그 안의 수용체 좌표가 현재 PDB 와 같을 때만 `legacy_pocket` 으로 쓴다.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from auto_hypothesis_agent.config import FPOCKET_BIN, RECEPTOR_CACHE_DIR
+
+try:
+    import fcntl
+
+    _FCNTL_OK = True
+except ImportError:  # pragma: no cover – Windows
+    _FCNTL_OK = False
+
+
+class ReceptorPrepCache:
+    """Content-addressed cache of receptor PDBQT files and fpocket runs."""
+
+    def __init__(self, cache_dir: str = RECEPTOR_CACHE_DIR, partial_charge: str = "gasteiger", rigid: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.partial_charge = partial_charge
+        self.rigid = rigid
+
+    # ------------------------------------------------------------------
+    # PDB → PDBQT
+    # ------------------------------------------------------------------
+
+    def pdbqt(self, receptor_pdb: str, prepared_pdbqt: str | None = None) -> str:
+        """Cached PDBQT of *receptor_pdb* (OpenBabel, *partial_charge* charges, ``-xr``).
+
+        *prepared_pdbqt* 는 직접 준비한 PDBQT 로, 변환 대신 그대로 캐시에 넣는다. 그 내용 해시가
+        키에 들어가므로 PDBQT 나 PDB 중 하나만 바뀌어도 새 항목이 된다 (둘이 같은 구조인지는
+        호출자가 보장한다).
+        """
+        if prepared_pdbqt:
+            options = {"tool": "prepared", "sha256": _sha256(prepared_pdbqt)}
+        else:
+            options = {"tool": "obabel", "partial_charge": self.partial_charge, "rigid": self.rigid}
+        target = self._entry("pdbqt", receptor_pdb, options) / "receptor.pdbqt"
+        if target.exists():
+            return target.as_posix()
+
+        with file_lock(target.parent.with_suffix(".lock")):
+            if target.exists():  # 잠금을 기다리는 동안 다른 작업이 만들었다
+                return target.as_posix()
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".receptor.{os.getpid()}.pdbqt")
+            if prepared_pdbqt:
+                print(f"[ReceptorPrepCache] Using prepared PDBQT {prepared_pdbqt}")
+                shutil.copyfile(prepared_pdbqt, tmp)
+            else:
+                print(f"[ReceptorPrepCache] Preparing PDBQT for {receptor_pdb}")
+                cmd = ["obabel", "-ipdb", str(receptor_pdb), "-opdbqt", "-O", str(tmp), "--partialcharge", self.partial_charge]
+                if self.rigid:
+                    cmd.append("-xr")
+                try:
+                    subprocess.run(cmd, check=True)
+                except BaseException:
+                    tmp.unlink(missing_ok=True)
+                    raise
+            os.replace(tmp, target)
+        return target.as_posix()
+
+    # ------------------------------------------------------------------
+    # fpocket
+    # ------------------------------------------------------------------
+
+    def fpocket(self, structure: str) -> Path | None:
+        """Cached fpocket output directory for *structure* (PDB or PDBQT); None without fpocket."""
+
+        if not (FPOCKET_BIN and shutil.which(FPOCKET_BIN)):
+            return None
+        target = self._entry("fpocket", structure, {"tool": FPOCKET_BIN}) / "out"
+        if target.exists():
+            return target
+
+        with file_lock(target.parent.with_suffix(".lock")):
+            if target.exists():
+                return target
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.TemporaryDirectory(dir=target.parent) as tmp:
+                receptor = Path(tmp) / "receptor.pdb"
+                if Path(structure).suffix.lower() == ".pdbqt":
+                    _pdbqt_to_pdb(structure, receptor)  # fpocket 은 PDB 만 읽는다
+                else:
+                    shutil.copyfile(structure, receptor)
+                subprocess.run([FPOCKET_BIN, "-f", str(receptor)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+                out = Path(tmp) / "receptor_out"
+                if not out.is_dir():
+                    print(f"[ReceptorPrepCache] fpocket produced no output for {structure}")
+                    return None
+                os.replace(out, target)
+        return target
+
+    def best_pocket(self, structure: str) -> str | None:
+        """Best-ranked ``pocketN_atm.pdb`` of the cached fpocket run (None if unavailable)."""
+
+        out = self.fpocket(structure)
+        return first_pocket(out) if out is not None else None
+
+    # ------------------------------------------------------------------
+    def key(self, structure: str, options: dict) -> str:
+        h = hashlib.sha256()
+        h.update(_sha256(structure).encode())
+        h.update(json.dumps(options, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def _entry(self, kind: str, structure: str, options: dict) -> Path:
+        return self.cache_dir / kind / self.key(structure, options)
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+
+
+def first_pocket(fpocket_out: str | Path) -> str | None:
+    """Best-ranked ``pocketN_atm.pdb`` in an fpocket output directory."""
+    pockets = glob.glob(os.path.join(str(fpocket_out), "pockets", "*_atm.pdb"))
+    if not pockets:
+        return None
+    return min(pockets, key=lambda p: int(re.sub(r"\D", "", Path(p).name.split("_")[0]) or 0))
+
+
+def legacy_pocket(fpocket_out: str | Path, structure: str) -> str | None:
+    """Best pocket of an existing fpocket run, only if it was run on *structure*.
+
+    fpocket 은 입력 수용체 원자를 ``<name>_out.pdb`` 에 다시 쓰므로, 그 ATOM 좌표가 현재 구조와
+    같을 때만 포켓을 믿는다. 구조가 바뀌었거나 확인할 수 없으면 None (→ 캐시된 fpocket 사용).
+    """
+    out = Path(fpocket_out)
+    pocket = first_pocket(out)
+    if pocket is None:
+        return None
+    written = out / f"{out.name}.pdb"  # X.pdb → X_out/X_out.pdb
+    if not written.is_file() or _atom_coords(written) != _atom_coords(structure):
+        print(f"[ReceptorPrepCache] Ignoring {out}: it was not computed from the current {structure}")
+        return None
+    return pocket
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """Exclusive inter-process lock on *lock_path* (no-op where ``fcntl`` is unavailable)."""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as f:
+        if _FCNTL_OK:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if _FCNTL_OK:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _sha256(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _atom_coords(pdb: str | Path) -> list[str]:
+    # 좌표 컬럼(31–54)만 비교 – fpocket 은 헤더·B-factor 등을 다시 쓴다.
+    with open(pdb) as f:
+        return [ln[30:54] for ln in f if ln.startswith("ATOM")]
+
+
+def _pdbqt_to_pdb(pdbqt: str, pdb: Path) -> None:
+    # 전하·원자 타입 컬럼(67 열 이후)을 잘라 PDB 로 쓴다.
+    with open(pdbqt) as inp, open(pdb, "w") as out:
+        for ln in inp:
+            if ln.startswith(("ATOM", "HETATM", "TER")):
+                out.write(ln[:66] + "\n")
@@ -0,0 +1,214 @@
+"""Trajectory analysis – Kabsch 정렬 기반 벡터화 RMSD 유틸리티.
+
+수용체 backbone(N, CA, C) 으로 각 프레임을 기준 구조에 최적 중첩한 뒤 리간드
+중원자 RMSD 를 계산한다. 단백질 전체의 병진·회전(drift)이 리간드 RMSD 에 섞이지
+않으므로 "리간드가 포켓 안에서 얼마나 움직였나" 만 측정된다.
+
+• 모든 함수는 ``(frames, atoms, 3)`` 배열을 받아 프레임 축으로 일괄 처리한다
+  (공분산 einsum + batched SVD; Python 루프 없음).
+• 원자 선택(`select_atoms`)은 topology 객체별로 캐시된다.
+• `trajectory_ligand_rmsd` 는 MDAnalysis 로 선택 원자만 청크 단위로 읽어
+  긴 궤적도 메모리에 올리지 않는다.
+
+사용 예시::
+
+    sel = select_atoms(pdb.topology)
+    rmsd = ligand_rmsd(coords, reference, sel)          # coords: (F, N, 3) Å
+
+    df = trajectory_ligand_rmsd("complex.pdb", "outputs/md/complex_traj.xtc")
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from auto_hypothesis_agent.simulation.pocket_truncation import STANDARD_AA
+
+try:
+    import MDAnalysis as mda
+
+    _MDA_OK = True
+except ImportError:  # pragma: no cover
+    _MDA_OK = False
+
+BACKBONE_NAMES = ("N", "CA", "C")
+LIGAND_RESNAME = "LIG"
+
+
+class AtomSelection(NamedTuple):
+    """Index arrays used for superposition (*fit*) and RMSD (*ligand*)."""
+
+    fit: np.ndarray
+    ligand: np.ndarray
+
+
+_SELECTION_CACHE: "weakref.WeakKeyDictionary[object, dict[str, AtomSelection]]" = weakref.WeakKeyDictionary()
+
+
+def select_atoms(topology, ligand_resname: str = LIGAND_RESNAME) -> AtomSelection:
+    """Receptor backbone and ligand heavy-atom indices of an OpenMM *topology* (cached)."""
+
+    per_topology = _SELECTION_CACHE.setdefault(topology, {})
+    selection = per_topology.get(ligand_resname)
+    if selection is None:
+        fit, ligand = [], []
+        for atom in topology.atoms():
+            resname = atom.residue.name
+            if resname == ligand_resname:
+                if atom.element is None or atom.element.symbol != "H":
+                    ligand.append(atom.index)
+            elif resname in STANDARD_AA and atom.name in BACKBONE_NAMES:
+                fit.append(atom.index)
+        selection = AtomSelection(np.asarray(fit, dtype=np.int64), np.asarray(ligand, dtype=np.int64))
+        per_topology[ligand_resname] = selection
+    return selection
+
+
+# -----------------------------------------------------------------------------
+# Superposition
+# -----------------------------------------------------------------------------
+
+
+def kabsch(mobile: np.ndarray, target: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Optimal rotations mapping each frame of *mobile* onto *target*.
+
+    *mobile* ``(F, N, 3)``, *target* ``(N, 3)``. Returns ``(R, mobile_centroid, target_centroid)``
+    with ``R`` of shape ``(F, 3, 3)`` such that ``(x − mobile_centroid) @ R + target_centroid``
+    is the superposed coordinate.
+    """
+
+    mobile = np.asarray(mobile, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+    mobile_c = mobile.mean(axis=1, keepdims=True)
+    target_c = target.mean(axis=0)
+
+    h = np.einsum("fni,nj->fij", mobile - mobile_c, target - target_c)
+    u, _, vt = np.linalg.svd(h)
+    # 반사(det = −1) 가 나오면 최소 특이값 축을 뒤집어 고유 회전으로 만든다.
+    d = np.sign(np.linalg.det(u @ vt))
+    u[:, :, 2] *= d[:, None]
+    return u @ vt, mobile_c, target_c
+
+
+def superpose(coords: np.ndarray, reference: np.ndarray, fit_atoms: np.ndarray) -> np.ndarray:
+    """Return *coords* ``(F, N, 3)`` superposed onto *reference* ``(N, 3)`` using *fit_atoms*."""
+
+    coords = np.asarray(coords, dtype=np.float64)
+    r, mobile_c, target_c = kabsch(coords[:, fit_atoms], np.asarray(reference)[fit_atoms])
+    return (coords - mobile_c) @ r + target_c
+
+
+def ligand_rmsd(coords: np.ndarray, reference: np.ndarray, selection: AtomSelection) -> np.ndarray:
+    """Ligand heavy-atom RMSD per frame after backbone superposition.
+
+    *coords* ``(F, N, 3)`` 또는 ``(N, 3)``, *reference* ``(N, 3)`` (같은 단위).
+    backbone 원자가 없으면 정렬 없이 계산한다. 리간드 원자만 변환하므로 비용은
+    O(F × (fit + ligand)) 이다.
+    """
+
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.ndim == 2:
+        coords = coords[None]
+    reference = np.asarray(reference, dtype=np.float64)
+    if selection.ligand.size == 0:
+        return np.full(len(coords), np.nan)
+
+    lig = coords[:, selection.ligand]
+    if selection.fit.size >= 3:
+        r, mobile_c, target_c = kabsch(coords[:, selection.fit], reference[selection.fit])
+        lig = (lig - mobile_c) @ r + target_c
+
+    diff = lig - reference[selection.ligand]
+    return np.sqrt(np.einsum("fni,fni->f", diff, diff) / selection.ligand.size)
+
+
+# -----------------------------------------------------------------------------
+# Pocket contacts
+# -----------------------------------------------------------------------------
+
+
+def receptor_heavy_atoms(topology) -> np.ndarray:
+    """Indices of non-hydrogen atoms in standard protein residues."""
+
+    return np.asarray(
+        [
+            a.index
+            for a in topology.atoms()
+            if a.residue.name in STANDARD_AA and (a.element is None or a.element.symbol != "H")
+        ],
+        dtype=np.int64,
+    )
+
+
+def native_contacts(reference: np.ndarray, ligand_atoms: np.ndarray, receptor_atoms: np.ndarray, cutoff: float = 4.5) -> np.ndarray:
+    """Ligand–receptor heavy-atom pairs closer than *cutoff* (Å) in *reference*, shape ``(P, 2)``."""
+
+    reference = np.asarray(reference, dtype=np.float64)
+    diff = reference[ligand_atoms][:, None, :] - reference[receptor_atoms][None, :, :]
+    li, ri = np.nonzero(np.einsum("lri,lri->lr", diff, diff) < cutoff * cutoff)
+    return np.stack([ligand_atoms[li], receptor_atoms[ri]], axis=1)
+
+
+def contact_fraction(coords: np.ndarray, pairs: np.ndarray, cutoff: float = 4.5) -> np.ndarray:
+    """Fraction of *pairs* still within *cutoff* (Å) per frame (no superposition needed)."""
+
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.ndim == 2:
+        coords = coords[None]
+    if len(pairs) == 0:
+        return np.full(len(coords), np.nan)
+    diff = coords[:, pairs[:, 0]] - coords[:, pairs[:, 1]]
+    return (np.einsum("fpi,fpi->fp", diff, diff) < cutoff * cutoff).mean(axis=1)
+
+
+# -----------------------------------------------------------------------------
+# Trajectory files
+# -----------------------------------------------------------------------------
+
+
+def trajectory_ligand_rmsd(
+    topology_pdb: str,
+    trajectory: str,
+    ligand_resname: str = LIGAND_RESNAME,
+    start: int = 0,
+    stop: int | None = None,
+    stride: int = 1,
+    chunk_size: int = 1000,
+) -> pd.DataFrame:
+    """Backbone-aligned ligand RMSD (Å) for every selected frame of *trajectory*.
+
+    기준 구조는 *topology_pdb* 의 좌표이며, 선택 원자(backbone + 리간드)만
+    *chunk_size* 프레임씩 읽는다. 반환: ``DataFrame[frame, time_ps, lig_rmsd]``.
+    """
+
+    if not _MDA_OK:
+        raise ImportError("Install MDAnalysis: pip install mdanalysis")
+
+    from openmm import unit
+    from openmm.app import PDBFile
+
+    pdb = PDBFile(str(topology_pdb))
+    full = select_atoms(pdb.topology, ligand_resname)
+    atoms = np.concatenate([full.fit, full.ligand])
+    # 읽어 온 부분 배열 기준으로 인덱스를 다시 매긴다.
+    sub = AtomSelection(np.arange(full.fit.size), np.arange(full.fit.size, atoms.size))
+    reference = np.asarray(pdb.getPositions(asNumpy=True).value_in_unit(unit.angstrom))[atoms]
+
+    universe = mda.Universe(str(topology_pdb), str(trajectory))
+    group = universe.atoms[atoms]
+    frames = np.arange(len(universe.trajectory))[start:stop:stride]
+
+    rmsd = np.empty(len(frames))
+    for i in range(0, len(frames), chunk_size):
+        block = frames[i:i + chunk_size]
+        coords = universe.trajectory.timeseries(
+            group, start=int(block[0]), stop=int(block[-1]) + 1, step=stride, order="fac"
+        )
+        rmsd[i:i + len(block)] = ligand_rmsd(coords, reference, sub)
+
+    t0, dt = universe.trajectory[0].time, universe.trajectory.dt
+    return pd.DataFrame({"frame": frames, "time_ps": t0 + frames * dt, "lig_rmsd": np.round(rmsd, 3)})